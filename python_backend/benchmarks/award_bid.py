@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark: award latency as the number of bids on a consignment grows
+
+Seeds scratch consignments with 5 ... N pending bids each and awards one
+bid per consignment through utils.bidding.apply_award, the same writes as
+POST /api/bids/{bid_id}/award. Also re-awards each bid to check that a
+retry is a no-op and that a second bid can't be awarded. Needs the MongoDB
+configured in MONGODB_URI.
+
+Usage (from python_backend/):
+    python benchmarks/award_bid.py [max_bids]
+"""
+
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import HTTPException
+import db
+from utils.bidding import apply_award
+
+CONSIGNMENTS = "bench_award_consignments"
+BIDS = "bench_award_bids"
+JOBS = "bench_award_jobs"
+COMPANY_ID = "company1"
+
+
+async def seed_consignment(consignments, bids, bid_count: int) -> list:
+    result = await consignments.insert_one({
+        "title": f"Load with {bid_count} bids", "status": "open", "budget": 100000,
+        "deadline": "2030-01-01", "companyId": COMPANY_ID, "companyName": "Bench Co",
+        "origin": "Mumbai, Maharashtra", "destination": "Pune, Maharashtra", "bidCount": bid_count
+    })
+    consignment_id = str(result.inserted_id)
+    now = datetime.now().isoformat()
+    documents = [
+        {"consignmentId": consignment_id, "bidderId": f"msme{i}", "bidderName": f"MSME {i}",
+         "bidAmount": 50000 + i, "status": "pending", "createdAt": now}
+        for i in range(bid_count)
+    ]
+    await bids.insert_many(documents)
+    return documents
+
+
+async def main(max_bids: int):
+    await db.connect_to_mongo(ensure_indexes=False)
+    consignments, bids, jobs = db.database[CONSIGNMENTS], db.database[BIDS], db.database[JOBS]
+    try:
+        for collection in (consignments, bids, jobs):
+            await collection.drop()
+        await bids.create_index([("consignmentId", 1), ("bidderId", 1)], unique=True)
+        await jobs.create_index([("consignmentId", 1), ("transporterId", 1)])
+
+        bid_count = 5
+        while bid_count <= max_bids:
+            documents = await seed_consignment(consignments, bids, bid_count)
+            winner, loser = documents[0], documents[-1]
+
+            started = time.perf_counter()
+            await db.run_in_transaction(
+                lambda session: apply_award(consignments, bids, jobs, winner, COMPANY_ID, session=session)
+            )
+            elapsed = time.perf_counter() - started
+
+            # Retrying the same award is a no-op; awarding another bid must fail
+            await apply_award(consignments, bids, jobs, winner, COMPANY_ID)
+            try:
+                await apply_award(consignments, bids, jobs, loser, COMPANY_ID)
+                double_award = True
+            except HTTPException:
+                double_award = False
+
+            rejected = await bids.count_documents({"consignmentId": winner["consignmentId"], "status": "rejected"})
+            job_count = await jobs.count_documents({"consignmentId": winner["consignmentId"]})
+            print(f"{bid_count:6} bids  award {elapsed * 1000:7.1f} ms  rejected {rejected:6}  "
+                  f"jobs {job_count}  double award blocked: {not double_award}")
+            bid_count *= 10
+    finally:
+        for collection in (consignments, bids, jobs):
+            await collection.drop()
+        await db.close_mongo_connection()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
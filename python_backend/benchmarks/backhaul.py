@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: batch backhaul matching vs a per-job scan
+
+Builds random active jobs and open consignments, narrows candidates the way
+the (originCell, deadline) index query does, then matches every job in one
+distance-matrix pass.
+
+Usage (from python_backend/):
+    python benchmarks/backhaul.py [jobs] [consignments]
+"""
+
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.backhaul import backhaul_query, match_backhauls, origin_cell_key
+from utils.distances import haversine_km
+
+RADIUS_KM = 100
+LIMIT = 5
+
+
+def random_day() -> str:
+    return (date(2026, 1, 1) + timedelta(days=random.randint(0, 60))).isoformat()
+
+
+def make_data(job_count: int, consignment_count: int):
+    random.seed(11)
+    legs = [
+        {"latitude": random.uniform(8, 32), "longitude": random.uniform(70, 90), "deadline": random_day()}
+        for _ in range(job_count)
+    ]
+    consignments = []
+    for i in range(consignment_count):
+        latitude, longitude = random.uniform(8, 32), random.uniform(70, 90)
+        consignments.append({
+            "_id": i,
+            "originGeo": {"type": "Point", "coordinates": [longitude, latitude]},
+            "originCell": origin_cell_key(latitude, longitude),
+            "deadline": random_day()
+        })
+    return legs, consignments
+
+
+def scan(legs, consignments):
+    results = []
+    for leg in legs:
+        found = []
+        for consignment in consignments:
+            longitude, latitude = consignment["originGeo"]["coordinates"]
+            distance = haversine_km(leg["latitude"], leg["longitude"], latitude, longitude)
+            if distance <= RADIUS_KM and consignment["deadline"] > leg["deadline"]:
+                found.append((distance, consignment["_id"]))
+        results.append([consignment_id for _, consignment_id in sorted(found)[:LIMIT]])
+    return results
+
+
+def batch(legs, consignments):
+    query = backhaul_query(legs, RADIUS_KM)
+    cells = set(query["originCell"]["$in"])
+    candidates = [
+        consignment for consignment in consignments
+        if consignment["originCell"] in cells and consignment["deadline"] > query["deadline"]["$gt"]
+    ]
+    matches = match_backhauls(legs, candidates, RADIUS_KM, LIMIT)
+    return [[consignment["_id"] for consignment, _ in leg_matches] for leg_matches in matches]
+
+
+if __name__ == "__main__":
+    job_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    consignment_count = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    legs, consignments = make_data(job_count, consignment_count)
+
+    started = time.perf_counter()
+    expected = scan(legs, consignments)
+    slow = time.perf_counter() - started
+    print(f"per-job scan  {job_count} jobs x {consignment_count} consignments in {slow * 1000:8.1f} ms")
+
+    started = time.perf_counter()
+    actual = batch(legs, consignments)
+    fast = time.perf_counter() - started
+    print(f"batch match   {job_count} jobs x {consignment_count} consignments in {fast * 1000:8.1f} ms")
+    print(f"speedup       {slow / fast:.0f}x  same suggestions: {expected == actual}")
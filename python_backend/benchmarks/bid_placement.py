@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Stress test: concurrent bid placement on one consignment
+
+Fires N concurrent bids (a tenth of them repeats from the same bidder) at a
+scratch consignment through utils.bidding.place_bid, the same pipeline as
+POST /api/bids/create, then checks that bidCount equals the number of bids
+stored and that every repeat was rejected. Needs the MongoDB configured in
+MONGODB_URI; uses a transaction when it is a replica set.
+
+Usage (from python_backend/):
+    python benchmarks/bid_placement.py [bids]
+"""
+
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import HTTPException
+import db
+from utils.bidding import parse_timestamp, place_bid
+
+CONSIGNMENTS = "bench_bid_consignments"
+BIDS = "bench_bids"
+
+
+async def main(count: int):
+    await db.connect_to_mongo(ensure_indexes=False)
+    consignments = db.database[CONSIGNMENTS]
+    bids = db.database[BIDS]
+    try:
+        await bids.drop()
+        await consignments.drop()
+        await bids.create_index([("consignmentId", 1), ("bidderId", 1)], unique=True)
+        result = await consignments.insert_one({
+            "title": "Stress test load", "status": "open", "budget": 100000,
+            "deadline": "2030-01-01", "bidCount": 0
+        })
+        consignment_id = str(result.inserted_id)
+        estimated = parse_timestamp("2029-12-01")
+
+        async def bid(bidder: int):
+            document = {
+                "consignmentId": consignment_id, "bidderId": f"msme{bidder}", "bidAmount": 50000 + bidder,
+                "estimatedDelivery": "2029-12-01", "status": "pending", "createdAt": datetime.now().isoformat()
+            }
+            started = time.perf_counter()
+            try:
+                await db.run_in_transaction(
+                    lambda session: place_bid(consignments, bids, document, estimated, session=session)
+                )
+                return True, time.perf_counter() - started
+            except HTTPException:
+                return False, time.perf_counter() - started
+
+        bidders = list(range(count - count // 10)) + list(range(count // 10))
+        started = time.perf_counter()
+        outcomes = await asyncio.gather(*(bid(bidder) for bidder in bidders))
+        elapsed = time.perf_counter() - started
+
+        placed = sum(1 for ok, _ in outcomes if ok)
+        latencies = sorted(latency for _, latency in outcomes)
+        stored = await bids.count_documents({})
+        counted = (await consignments.find_one({}, {"bidCount": 1}))["bidCount"]
+        print(f"{len(bidders)} bids ({count // 10} repeats) in {elapsed:.2f} s, "
+              f"p50 {latencies[len(latencies) // 2] * 1000:.1f} ms, p99 {latencies[int(len(latencies) * 0.99)] * 1000:.1f} ms")
+        print(f"placed {placed}, stored {stored}, bidCount {counted}, "
+              f"consistent: {placed == stored == counted == count - count // 10}")
+    finally:
+        await bids.drop()
+        await consignments.drop()
+        await db.close_mongo_connection()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000))
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: consolidation planning over many open consignments
+
+Usage (from python_backend/):
+    python benchmarks/consolidation.py [consignments] [corridors]
+"""
+
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.gazetteer import get_places, name_key
+from utils.consolidation import plan_bundles
+
+
+def make_consignments(count: int, corridor_count: int) -> list:
+    random.seed(5)
+    places = get_places()
+    corridors = [tuple(random.sample(places, 2)) for _ in range(corridor_count)]
+    consignments = []
+    for i in range(count):
+        origin, destination = random.choice(corridors)
+        consignments.append({
+            "_id": i,
+            "title": f"Load {i}",
+            "origin": origin.label,
+            "destination": destination.label,
+            "originCity": name_key(origin.name), "originState": name_key(origin.state),
+            "destCity": name_key(destination.name), "destState": name_key(destination.state),
+            "weight": random.choice([200, 350, 500, 800, 1000, 1500, 2500, 4000]),
+            "budget": random.randint(5, 80) * 1000,
+            "deadline": (date(2026, 1, 1) + timedelta(days=random.randint(0, 30))).isoformat()
+        })
+    return consignments
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    corridor_count = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    consignments = make_consignments(count, corridor_count)
+
+    for vehicle_types in (["tempo"], ["truck", "tempo"], ["trailer"]):
+        started = time.perf_counter()
+        bundles = plan_bundles(consignments, vehicle_types)
+        elapsed = time.perf_counter() - started
+        packed = sum(len(bundle["consignments"]) for bundle in bundles)
+        utilization = sum(bundle["utilization"] for bundle in bundles) / max(1, len(bundles))
+        print(f"{'+'.join(vehicle_types):<12} {count} consignments -> {len(bundles):>6} bundles "
+              f"({packed} loads, avg utilization {utilization:.0%}) in {elapsed:6.2f}s")
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: scalar vs vectorized haversine, and city matrix lookups
+
+Usage (from python_backend/):
+    python benchmarks/distances.py [points]
+"""
+
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.gazetteer import get_places
+from utils.location_matcher import calculate_distance, city_distances
+from utils.distances import distances_from, distance_matrix
+
+
+def timed(label: str, fn) -> float:
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {elapsed * 1000:9.2f} ms")
+    return elapsed
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    random.seed(3)
+    latitudes = np.random.uniform(8, 35, count)
+    longitudes = np.random.uniform(68, 97, count)
+    lat_list, lon_list = latitudes.tolist(), longitudes.tolist()
+
+    scalar = timed(f"scalar 1 -> {count}", lambda: [
+        calculate_distance(19.07, 72.88, lat, lon) for lat, lon in zip(lat_list, lon_list)
+    ])
+    vector = timed(f"vectorized 1 -> {count}", lambda: distances_from(19.07, 72.88, latitudes, longitudes))
+    print(f"{'speedup':<28} {scalar / vector:9.1f}x")
+
+    timed("matrix 1000 x 1000", lambda: distance_matrix(latitudes[:1000], longitudes[:1000]))
+
+    labels = [place.label for place in get_places()]
+    city_distances(labels[0], labels[:1])  # compile/map the matrix outside the timing
+    destinations = [random.choice(labels) for _ in range(5000)]
+    timed("city row 1 -> 5000 (matrix)", lambda: city_distances(labels[0], destinations))
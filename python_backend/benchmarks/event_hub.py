@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: idle event stream subscribers and publish fan-out
+
+Parks N subscribers (spread over companies and consignments) on the same
+heartbeat wait as GET /api/events/stream, then times publishing events
+that each reach a handful of them, and one slow subscriber overflowing
+its bounded queue.
+
+Usage (from python_backend/):
+    python benchmarks/event_hub.py [subscribers] [events]
+"""
+
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.events import EventHub, BID_PLACED, SUBSCRIBER_QUEUE_SIZE
+
+COMPANIES = 1000
+
+
+async def main(subscribers: int, events: int):
+    hub = EventHub()
+
+    async def idle(subscription):
+        # Same loop as the SSE generator, with a heartbeat long enough to stay parked
+        while await subscription.next(3600) is not None:
+            pass
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    subscriptions = []
+    for i in range(subscribers):
+        if i % 2:
+            subscriptions.append(hub.subscribe(company_id=f"company{i % COMPANIES}"))
+        else:
+            subscriptions.append(hub.subscribe(consignment_id=f"consignment{i}", private=False))
+    tasks = [asyncio.create_task(idle(subscription)) for subscription in subscriptions]
+    await asyncio.sleep(0)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{subscribers} idle subscribers in {time.perf_counter() - started:.2f} s, "
+          f"{memory / subscribers / 1024:.1f} KiB each ({hub.stats()})")
+
+    started = time.perf_counter()
+    delivered = 0
+    for i in range(events):
+        delivered += hub.publish(
+            BID_PLACED, f"company{i % COMPANIES}", f"consignment{(i * 2) % subscribers}",
+            data={"bidAmount": i}, public={"bidCount": i}
+        )
+    elapsed = time.perf_counter() - started
+    await asyncio.sleep(0)
+    print(f"{events} events to {delivered} streams in {elapsed * 1000:.1f} ms "
+          f"({elapsed / events * 1e6:.1f} us per publish)")
+
+    slow = hub.subscribe(company_id="slow")
+    for i in range(SUBSCRIBER_QUEUE_SIZE * 2):
+        hub.publish(BID_PLACED, "slow", "consignment-slow", data={"bidAmount": i})
+    drained = [await slow.next(0.01) for _ in range(SUBSCRIBER_QUEUE_SIZE + 1)]
+    print(f"slow subscriber: {slow.queue.maxsize} queued, {slow.dropped} dropped, "
+          f"then {drained[-1]['type']}")
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 10000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    ))
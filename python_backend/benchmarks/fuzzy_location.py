@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: fuzzy place-name lookups against a large trigram index
+
+Pads the bundled gazetteer with synthetic place names up to the requested
+size and times misspelled lookups (uncached) against the index.
+
+Usage (from python_backend/):
+    python benchmarks/fuzzy_location.py [place_count] [queries]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.gazetteer import Place, get_places, name_key
+from utils.fuzzy_location import TrigramIndex
+
+CONSONANTS = ["b", "bh", "ch", "d", "dh", "g", "h", "j", "k", "kh", "l", "m", "n", "p", "r", "s", "sh", "t", "v", "y"]
+VOWELS = ["a", "a", "i", "u", "e", "o", "aa"]
+SUFFIXES = ["", "", "pur", "nagar", "abad", "garh", "kot", "ganj", "palli", "wadi"]
+
+
+def synthetic_places(count: int, states: list) -> list:
+    random.seed(42)
+    places = []
+    for i in range(count):
+        syllables = [random.choice(CONSONANTS) + random.choice(VOWELS) for _ in range(random.randint(2, 3))]
+        name = ("".join(syllables) + random.choice(SUFFIXES)).title()
+        places.append(Place(name, random.choice(states), "", "town", 20.0, 78.0, i % 500, ()))
+    return places
+
+
+def misspell(name: str) -> str:
+    chars = list(name_key(name))
+    if len(chars) > 3:
+        del chars[random.randrange(1, len(chars) - 1)]
+    return "".join(chars)
+
+
+if __name__ == "__main__":
+    place_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    query_count = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+    bundled = get_places()
+    places = bundled + synthetic_places(max(0, place_count - len(bundled)), sorted({p.state for p in bundled}))
+
+    started = time.perf_counter()
+    index = TrigramIndex(places)
+    print(f"index      {len(index):>8} keys built in {time.perf_counter() - started:7.3f}s")
+
+    queries = [misspell(random.choice(places).name) for _ in range(query_count)]
+    started = time.perf_counter()
+    found = sum(1 for query in queries if index.search(query, limit=1))
+    elapsed = time.perf_counter() - started
+    print(f"search     {query_count:>8} lookups in {elapsed:7.3f}s  ->  {elapsed / query_count * 1e6:8.1f} µs/lookup")
+    print(f"matched    {found / query_count:.1%}")
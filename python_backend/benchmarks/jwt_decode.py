@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: cached vs uncached JWT decode throughput
+
+Usage (from python_backend/):
+    python benchmarks/jwt_decode.py [iterations] [distinct_tokens]
+"""
+
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from jose import jwt
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.token_cache import VerifiedTokenCache
+
+SECRET_KEY = "benchmark-secret"
+ALGORITHM = "HS256"
+
+
+def verify(token: str) -> dict:
+    return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+
+
+def make_tokens(count: int) -> list:
+    expire = datetime.utcnow() + timedelta(minutes=30)
+    return [
+        jwt.encode({"sub": f"user-{i}", "exp": expire}, SECRET_KEY, algorithm=ALGORITHM)
+        for i in range(count)
+    ]
+
+
+def run(label: str, decode, tokens: list, iterations: int) -> float:
+    started = time.perf_counter()
+    for i in range(iterations):
+        decode(tokens[i % len(tokens)])
+    elapsed = time.perf_counter() - started
+    rate = iterations / elapsed
+    print(f"{label:<10} {iterations:>8} decodes in {elapsed:7.3f}s  ->  {rate:>12,.0f} ops/s")
+    return rate
+
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    distinct = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+
+    tokens = make_tokens(distinct)
+    cache = VerifiedTokenCache(verify, max_size=distinct * 2)
+
+    uncached = run("uncached", verify, tokens, iterations)
+    cached = run("cached", cache.decode, tokens, iterations)
+
+    print(f"speedup    {cached / uncached:.1f}x")
+    print(f"stats      {cache.stats()}")
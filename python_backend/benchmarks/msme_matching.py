@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: MSME radius / nearest-partner lookups, list scan vs GeoGrid
+
+The scan mirrors the previous find_matching_msmes, which called
+locations_match on every MSME in a user list.
+
+Usage (from python_backend/):
+    python benchmarks/msme_matching.py [msme_count] [queries]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.gazetteer import get_places
+from utils.location_matcher import locations_match, find_matching_msmes, get_location_recommendations
+from utils.spatial_index import GeoGrid, index_user
+from utils.distances import haversine_km
+
+
+def make_msmes(count: int) -> list:
+    random.seed(7)
+    places = get_places()
+    users = []
+    for i in range(count):
+        place = random.choice(places)
+        latitude = place.latitude + random.uniform(-0.3, 0.3)
+        longitude = place.longitude + random.uniform(-0.3, 0.3)
+        users.append({
+            "id": f"msme-{i}",
+            "userType": "msme",
+            "name": f"Transporter {i}",
+            "location": {
+                "city": place.name,
+                "state": place.state,
+                "coordinates": {"latitude": latitude, "longitude": longitude}
+            },
+            "locationGeo": {"type": "Point", "coordinates": [longitude, latitude]}
+        })
+    return users
+
+
+def scan(origin: dict, users: list, max_distance: float) -> list:
+    return [
+        user for user in users
+        if user.get("userType") == "msme" and locations_match(origin, user["location"], max_distance)
+    ]
+
+
+def timed(label: str, fn, queries: list) -> float:
+    started = time.perf_counter()
+    for query in queries:
+        fn(query)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<18} {len(queries):>6} queries in {elapsed:7.3f}s  ->  {elapsed / len(queries) * 1000:8.3f} ms/query")
+    return elapsed
+
+
+if __name__ == "__main__":
+    msme_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    query_count = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    users = make_msmes(msme_count)
+    index = GeoGrid()
+    started = time.perf_counter()
+    for user in users:
+        index_user(user, index)
+    print(f"index build        {msme_count:>6} MSMEs in {time.perf_counter() - started:7.3f}s  {index.stats()}")
+
+    origins = [random.choice(users)["location"] for _ in range(query_count)]
+    slow = timed("scan (50 km)", lambda origin: scan(origin, users, 50), origins)
+    fast = timed("grid (50 km)", lambda origin: find_matching_msmes(origin, index, 50), origins)
+    print(f"speedup            {slow / fast:.0f}x")
+
+    partner_ids = [random.choice(users)["id"] for _ in range(query_count * 10)]
+    timed("grid 5-nearest", lambda msme_id: get_location_recommendations(msme_id, index, 100, 5), partner_ids)
+
+    # Incremental updates (registration / location change)
+    started = time.perf_counter()
+    for user in users[:10000]:
+        index.upsert(user["id"], user["location"]["coordinates"]["latitude"] + 0.01,
+                     user["location"]["coordinates"]["longitude"], None)
+    print(f"upsert             {10000:>6} moves in {time.perf_counter() - started:7.3f}s")
+
+    # Same MSMEs as an exhaustive distance check (the scan also accepted
+    # same-city matches beyond the radius; the grid is strictly radius based)
+    origin = origins[0]["coordinates"]
+    index = GeoGrid()
+    for user in users:
+        index_user(user, index)
+    expected = {
+        user["id"] for user in users
+        if haversine_km(origin["latitude"], origin["longitude"],
+                        user["location"]["coordinates"]["latitude"],
+                        user["location"]["coordinates"]["longitude"]) <= 50
+    }
+    actual = {match["id"] for match in find_matching_msmes({"coordinates": origin}, index, 50)}
+    print(f"exact radius match {expected == actual} ({len(actual)} MSMEs)")
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark: /consignments/search against a MongoDB text index
+
+Seeds a scratch collection with synthetic consignments (reused across runs
+if it already holds enough), builds the same text index as INDEX_SPECS and
+times first pages of the search pipeline plus highlighting. Needs the
+MongoDB configured in MONGODB_URI.
+
+Usage (from python_backend/):
+    python benchmarks/text_search.py [consignments] [--drop]
+"""
+
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo import IndexModel
+import db
+from indexes import INDEX_SPECS
+from utils.text_search import search_terms, search_highlights, text_search_pipeline
+
+COLLECTION = "bench_consignment_search"
+INSERT_BATCH = 10000
+PAGE_SIZE = 20
+
+ADJECTIVES = ["fragile", "bulk", "refrigerated", "hazardous", "palletised", "urgent", "heavy", "packed"]
+GOODS = ["electronics", "textile", "pharma", "furniture", "steel", "grain", "auto parts", "ceramics", "paper"]
+FILLER = "shipment from the warehouse to the distribution centre with standard handling and unloading".split()
+QUERIES = ["fragile electronics", "textile bulk", "refrigerated pharma", "\"auto parts\" urgent", "ceramics -steel"]
+
+
+def make_consignment(i: int) -> dict:
+    goods = random.choice(GOODS)
+    words = random.sample(FILLER, 8) + random.sample(ADJECTIVES, 2) + [goods]
+    random.shuffle(words)
+    return {
+        "title": f"{random.choice(ADJECTIVES).title()} {goods} load {i}",
+        "description": " ".join(words).capitalize() + ".",
+        "status": random.choice(["open", "open", "awarded", "completed"]),
+        "companyId": f"company{i % 500}",
+        "createdAt": f"2026-01-{i % 28 + 1:02d}T00:00:00"
+    }
+
+
+async def seed(collection, count: int) -> None:
+    existing = await collection.estimated_document_count()
+    if existing >= count:
+        return
+    random.seed(existing)
+    started = time.perf_counter()
+    for start in range(existing, count, INSERT_BATCH):
+        await collection.insert_many([make_consignment(i) for i in range(start, min(count, start + INSERT_BATCH))])
+    print(f"seeded {count - existing} consignments in {time.perf_counter() - started:.1f} s")
+
+    spec = next(spec for spec in INDEX_SPECS[db.CONSIGNMENTS_COLLECTION] if spec["name"] == "consignment_text")
+    await collection.create_indexes([IndexModel(spec["keys"], name=spec["name"], **spec["options"])])
+
+
+async def main(count: int, drop: bool):
+    await db.connect_to_mongo(ensure_indexes=False)
+    collection = db.database[COLLECTION]
+    try:
+        await seed(collection, count)
+        for scope_name, scope in [("open", {"status": "open"}), ("company", {"companyId": "company7"})]:
+            for query in QUERIES:
+                timings = []
+                for _ in range(5):
+                    started = time.perf_counter()
+                    documents = await collection.aggregate(
+                        text_search_pipeline(query, scope, PAGE_SIZE)
+                    ).to_list(length=PAGE_SIZE + 1)
+                    roots = search_terms(query)
+                    for document in documents:
+                        search_highlights(document, roots)
+                    timings.append(time.perf_counter() - started)
+                print(f"{scope_name:8} {query:24} median {statistics.median(timings) * 1000:7.1f} ms  "
+                      f"max {max(timings) * 1000:7.1f} ms  ({len(documents)} on page)")
+    finally:
+        if drop:
+            await collection.drop()
+        await db.close_mongo_connection()
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    asyncio.run(main(int(args[0]) if args else 100000, "--drop" in sys.argv))
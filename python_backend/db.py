@@ -1,5 +1,5 @@
 import os
-from typing import Dict
+from typing import Any, Awaitable, Callable, Dict, TypeVar
 from motor.motor_asyncio import AsyncIOMotorClient
 from dotenv import load_dotenv
 
@@ -14,30 +14,59 @@ DATABASE_NAME = "logiledger"
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key-here")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
+
+# Password hashing settings (bcrypt work factor and concurrent hashes per worker)
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_MAX_CONCURRENCY = int(os.getenv("PASSWORD_HASH_MAX_CONCURRENCY", "4"))
+
+# Verified token cache size (entries expire at each token's exp)
+TOKEN_CACHE_MAX_SIZE = int(os.getenv("TOKEN_CACHE_MAX_SIZE", "10000"))
+
+# Seconds a cached /api/consignments/public page may be served between invalidations
+PUBLIC_CACHE_TTL_SECONDS = int(os.getenv("PUBLIC_CACHE_TTL_SECONDS", "30"))
+
+# Principal cache settings (authenticated user lookups)
+PRINCIPAL_CACHE_TTL_SECONDS = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+PRINCIPAL_CACHE_MAX_SIZE = int(os.getenv("PRINCIPAL_CACHE_MAX_SIZE", "10000"))
+
+# How often each worker pulls MSME registrations/moves from other workers into its spatial index
+MSME_INDEX_SYNC_SECONDS = int(os.getenv("MSME_INDEX_SYNC_SECONDS", "60"))
+
+# How often each worker verifies open consignments' bid stats against their bids (0 disables)
+BID_STATS_VERIFY_SECONDS = int(os.getenv("BID_STATS_VERIFY_SECONDS", "3600"))
+
+T = TypeVar("T")
 
 # MongoDB client
 client: AsyncIOMotorClient = None
 database = None
 
+# Multi-document transactions need a replica set or sharded cluster
+transactions_supported = False
+
 # Collection names
 USERS_COLLECTION = "users"
 CONSIGNMENTS_COLLECTION = "consignments"
 BIDS_COLLECTION = "bids"
 JOBS_COLLECTION = "jobs"
+SESSIONS_COLLECTION = "sessions"
 
-async def connect_to_mongo():
+async def connect_to_mongo(ensure_indexes: bool = True):
     """Connect to MongoDB"""
-    global client, database
+    global client, database, transactions_supported
     try:
         client = AsyncIOMotorClient(MONGODB_URI)
         database = client[DATABASE_NAME]
         
         # Test the connection
-        await client.admin.command('ping')
-        print("✅ Successfully connected to MongoDB")
+        hello = await client.admin.command('hello')
+        transactions_supported = bool(hello.get("setName") or hello.get("msg") == "isdbgrid")
+        print(f"✅ Successfully connected to MongoDB (transactions: {'on' if transactions_supported else 'off'})")
         
         # Create indexes for better performance
-        await create_indexes()
+        if ensure_indexes:
+            await create_indexes()
         
     except Exception as e:
         print(f"❌ Failed to connect to MongoDB: {e}")
@@ -51,31 +80,37 @@ async def close_mongo_connection():
         print("🔌 MongoDB connection closed")
 
 async def create_indexes():
-    """Create database indexes for better performance"""
+    """Create missing database indexes from the declarative specs in indexes.py"""
+    # Imported here because indexes.py depends on the collection names above
+    from indexes import sync_indexes, print_sync_report
+    
     try:
-        # Users collection indexes
-        await database[USERS_COLLECTION].create_index("email", unique=True)
-        
-        # Consignments collection indexes
-        await database[CONSIGNMENTS_COLLECTION].create_index("companyId")
-        await database[CONSIGNMENTS_COLLECTION].create_index("status")
-        await database[CONSIGNMENTS_COLLECTION].create_index("origin")
-        await database[CONSIGNMENTS_COLLECTION].create_index("destination")
-        
-        # Bids collection indexes
-        await database[BIDS_COLLECTION].create_index("consignmentId")
-        await database[BIDS_COLLECTION].create_index("bidderId")
-        await database[BIDS_COLLECTION].create_index([("consignmentId", 1), ("bidderId", 1)], unique=True)
+        report = await sync_indexes(database)
+        print_sync_report(report)
         
-        # Jobs collection indexes
-        await database[JOBS_COLLECTION].create_index("consignmentId")
-        await database[JOBS_COLLECTION].create_index("transporterId")
-        await database[JOBS_COLLECTION].create_index("companyId")
-        
-        print("✅ Database indexes created successfully")
+        failed = sum(len(result["failed"]) for result in report.values())
+        if failed:
+            print(f"⚠️ Warning: {failed} index(es) could not be created")
+        else:
+            print("✅ Database indexes are in sync")
     except Exception as e:
         print(f"⚠️ Warning: Could not create indexes: {e}")
 
+async def run_in_transaction(operation: Callable[[Any], Awaitable[T]]) -> T:
+    """
+    Run operation(session) in a MongoDB transaction when the deployment supports one
+    Args:
+        operation: Coroutine function taking the session to pass to every call;
+            it may run more than once, since transient write conflicts are retried
+    Returns:
+        The operation's result. On a standalone server operation(None) runs
+        without a transaction and must undo its own partial writes.
+    """
+    if not transactions_supported:
+        return await operation(None)
+    async with await client.start_session() as session:
+        return await session.with_transaction(operation)
+
 # Collection getters
 def get_users_collection():
     """Get users collection"""
@@ -93,6 +128,10 @@ def get_jobs_collection():
     """Get jobs collection"""
     return database[JOBS_COLLECTION]
 
+def get_sessions_collection():
+    """Get sessions collection"""
+    return database[SESSIONS_COLLECTION]
+
 # Legacy getter functions for backward compatibility (will be removed after migration)
 def get_users_db():
     """Legacy function - returns empty dict for compatibility"""
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Declarative index specs and sync/verification tooling
+
+INDEX_SPECS lists every index each collection should have. sync_indexes()
+creates the missing ones and reports (or drops) indexes that are no longer
+in the spec. QUERY_REGISTRY mirrors the routers' real queries;
+explain_queries() runs explain() on each one and flags any COLLSCAN.
+
+Usage (from python_backend/):
+    python indexes.py                # create missing indexes, report stale ones
+    python indexes.py --drop-stale   # also drop indexes not in the spec
+    python indexes.py --explain      # also explain every registered query
+                                     # (exits 1 if any of them is a COLLSCAN)
+"""
+
+import argparse
+import asyncio
+from datetime import datetime
+import sys
+from typing import Any, Dict, List, Optional
+from pymongo import IndexModel
+import db
+from utils.bidding import BID_SORTS
+from utils.consignment_filters import filter_combinations
+from utils.text_search import TEXT_LANGUAGE, TEXT_WEIGHTS
+from db import (
+    USERS_COLLECTION,
+    CONSIGNMENTS_COLLECTION,
+    BIDS_COLLECTION,
+    JOBS_COLLECTION,
+    SESSIONS_COLLECTION
+)
+
+# Keyset pagination order shared by all list endpoints
+CREATED_DESC = [("createdAt", -1), ("_id", -1)]
+
+OPEN_ONLY = {"status": "open"}
+
+
+def index(keys: List[tuple], **options) -> Dict[str, Any]:
+    """
+    Declare an index
+    Args:
+        keys: List of (field, direction) pairs
+        options: create_index options (unique, partialFilterExpression, expireAfterSeconds, ...)
+    Returns:
+        Index spec with a deterministic name
+    """
+    name = options.pop("name", None) or "_".join(f"{field}_{direction}" for field, direction in keys)
+    return {"keys": keys, "name": name, "options": options}
+
+
+INDEX_SPECS: Dict[str, List[Dict[str, Any]]] = {
+    USERS_COLLECTION: [
+        index([("email", 1)], unique=True),
+        index([("userType", 1), ("locationState", 1), ("locationCity", 1)]),
+        # Incremental MSME spatial index sync
+        index([("userType", 1), ("updatedAt", 1)]),
+        index(
+            [("telegramUserId", 1)],
+            partialFilterExpression={"telegramUserId": {"$exists": True}}
+        ),
+    ],
+    CONSIGNMENTS_COLLECTION: [
+        # /my-consignments
+        index([("companyId", 1)] + CREATED_DESC),
+        # /public and the unfiltered /available page; weight trails the sort
+        # keys (equality, sort, range) so the capacity filter runs on index keys
+        index([("status", 1)] + CREATED_DESC + [("weight", 1)]),
+        # /available location branches, only open consignments are ever matched
+        index([("originCity", 1)] + CREATED_DESC + [("weight", 1)], partialFilterExpression=OPEN_ONLY),
+        index([("originState", 1)] + CREATED_DESC + [("weight", 1)], partialFilterExpression=OPEN_ONLY),
+        index([("destCity", 1)] + CREATED_DESC + [("weight", 1)], partialFilterExpression=OPEN_ONLY),
+        index([("destState", 1)] + CREATED_DESC + [("weight", 1)], partialFilterExpression=OPEN_ONLY),
+        # /available?goods_type=
+        index([("goodsType", 1)] + CREATED_DESC + [("weight", 1)], partialFilterExpression=OPEN_ONLY),
+        # /jobs/backhaul and /consolidation-plan: open consignments by pickup cell and deadline
+        index([("originCell", 1), ("deadline", 1)], partialFilterExpression=OPEN_ONLY),
+        # /available?sort=distance ($geoNear; its query always carries status "open")
+        index([("originGeo", "2dsphere")], partialFilterExpression=OPEN_ONLY),
+        # /available?sort=budget|deadline without a location match (scanned either way)
+        index([("budget", -1), ("_id", -1)], partialFilterExpression=OPEN_ONLY),
+        index([("deadline", -1), ("_id", -1)], partialFilterExpression=OPEN_ONLY),
+        # /search (MongoDB allows one text index per collection)
+        index(
+            [("title", "text"), ("description", "text")],
+            name="consignment_text",
+            weights=TEXT_WEIGHTS,
+            default_language=TEXT_LANGUAGE
+        ),
+    ],
+    BIDS_COLLECTION: [
+        index([("consignmentId", 1), ("bidderId", 1)], unique=True),
+        # /bids/consignment/{id}?sort=amount|delivery
+        index([("consignmentId", 1), ("bidAmount", 1), ("_id", 1)]),
+        index([("consignmentId", 1), ("estimatedDelivery", 1), ("_id", 1)]),
+        # /my-bids
+        index([("bidderId", 1)] + CREATED_DESC),
+        # get_awarded_jobs
+        index([("bidderId", 1), ("status", 1)]),
+    ],
+    JOBS_COLLECTION: [
+        # One job per awarded bid; award_bid and /jobs/awarded upsert on it
+        index([("consignmentId", 1), ("transporterId", 1)], unique=True),
+        index([("transporterId", 1)] + CREATED_DESC),
+        # /jobs/company
+        index([("companyId", 1)] + CREATED_DESC),
+    ],
+    SESSIONS_COLLECTION: [
+        index([("tokenHash", 1)], unique=True),
+        index([("previousTokenHash", 1)]),
+        index([("userId", 1)]),
+        index([("expiresAt", 1)], expireAfterSeconds=0),
+    ],
+}
+
+
+# Placeholder values only need the right type for the planner
+_ID = "000000000000000000000000"
+
+QUERY_REGISTRY: List[Dict[str, Any]] = [
+    {"name": "auth.login", "collection": USERS_COLLECTION, "filter": {"email": "user@example.com"}},
+    {"name": "telegram.user", "collection": USERS_COLLECTION, "filter": {"telegramUserId": "123"}},
+    {"name": "partners.msme_sync", "collection": USERS_COLLECTION,
+     "filter": {"userType": "msme", "updatedAt": {"$gte": "2000-01-01T00:00:00"}}},
+    {"name": "consignments.my", "collection": CONSIGNMENTS_COLLECTION,
+     "filter": {"companyId": _ID}, "sort": CREATED_DESC},
+    {"name": "consignments.public", "collection": CONSIGNMENTS_COLLECTION,
+     "filter": OPEN_ONLY, "sort": CREATED_DESC},
+    {"name": "consignments.search_company", "collection": CONSIGNMENTS_COLLECTION,
+     "filter": {"$text": {"$search": "fragile electronics"}, "companyId": _ID}},
+    {"name": "consignments.search_open", "collection": CONSIGNMENTS_COLLECTION,
+     "filter": {"$text": {"$search": "textile bulk"}, "status": "open"}},
+    {"name": "jobs.active", "collection": JOBS_COLLECTION,
+     "filter": {"transporterId": _ID, "status": {"$in": ["awarded", "in_progress"]}}},
+    {"name": "jobs.backhaul", "collection": CONSIGNMENTS_COLLECTION,
+     "filter": {"status": "open", "originCell": {"$in": ["37:145", "37:146"]},
+                "deadline": {"$gt": "2000-01-01"}}},
+    {"name": "consignments.consolidation", "collection": CONSIGNMENTS_COLLECTION,
+     "filter": {"status": "open", "originCell": {"$in": ["37:145", "37:146"]}}},
+    {"name": "bids.my", "collection": BIDS_COLLECTION,
+     "filter": {"bidderId": _ID}, "sort": CREATED_DESC},
+    *[{"name": f"bids.consignment[{name}]", "collection": BIDS_COLLECTION,
+       "filter": {"consignmentId": _ID}, "sort": sort} for name, sort in BID_SORTS.items()],
+    {"name": "bids.stats", "collection": BIDS_COLLECTION,
+     "filter": {"consignmentId": {"$in": [_ID]}, "status": {"$in": ["pending", "awarded"]}}},
+    {"name": "bids.award_reject", "collection": BIDS_COLLECTION,
+     "filter": {"consignmentId": _ID, "_id": {"$ne": _ID}, "status": {"$ne": "rejected"}}},
+    {"name": "jobs.awarded_bids", "collection": BIDS_COLLECTION,
+     "filter": {"bidderId": _ID, "status": "awarded"}},
+    {"name": "jobs.existing", "collection": JOBS_COLLECTION,
+     "filter": {"consignmentId": _ID, "transporterId": _ID}},
+    {"name": "jobs.company", "collection": JOBS_COLLECTION,
+     "filter": {"companyId": _ID}, "sort": CREATED_DESC},
+    {"name": "jobs.transporter", "collection": JOBS_COLLECTION,
+     "filter": {"transporterId": _ID}, "sort": CREATED_DESC},
+    {"name": "sessions.refresh", "collection": SESSIONS_COLLECTION,
+     "filter": {"tokenHash": "x", "expiresAt": {"$gt": datetime(2000, 1, 1)}}},
+]
+
+# Every /available filter, scope and sort combination, compiled by the same
+# code as the router so the registry can't drift from the real queries
+QUERY_REGISTRY += [
+    {"name": f"consignments.{name}", "collection": CONSIGNMENTS_COLLECTION, "filter": query, "sort": sort}
+    for name, query, sort in filter_combinations()
+]
+
+
+def _same_options(existing: Dict[str, Any], spec: Dict[str, Any]) -> bool:
+    """Compare the options of an existing index with its spec"""
+    for option in ["unique", "partialFilterExpression", "expireAfterSeconds", "sparse"]:
+        if existing.get(option) != spec["options"].get(option):
+            return False
+    text_fields = {field: 1 for field, direction in spec["keys"] if direction == "text"}
+    if text_fields:
+        # Text indexes are stored under _fts/_ftsx keys, so compare the weighted fields instead
+        return (existing.get("weights") == spec["options"].get("weights", text_fields) and
+                existing.get("default_language", "english") == spec["options"].get("default_language", "english"))
+    return [tuple(key) for key in existing["key"]] == [tuple(key) for key in spec["keys"]]
+
+
+async def sync_indexes(database, drop_stale: bool = False) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Bring every collection's indexes in line with INDEX_SPECS
+    Args:
+        database: Motor database
+        drop_stale: Drop indexes that are not in the spec
+    Returns:
+        Per-collection report of created, existing, changed, stale, dropped and failed indexes
+    """
+    report = {}
+    for collection_name, specs in INDEX_SPECS.items():
+        collection = database[collection_name]
+        existing = await collection.index_information()
+        result = {"created": [], "existing": [], "changed": [], "stale": [], "dropped": [], "failed": []}
+
+        missing = []
+        for spec in specs:
+            current = existing.get(spec["name"])
+            if current is None:
+                missing.append(spec)
+            elif _same_options(current, spec):
+                result["existing"].append(spec["name"])
+            else:
+                # Options can't be altered in place; needs a manual drop and re-sync
+                result["changed"].append(spec["name"])
+
+        for spec in missing:
+            try:
+                await collection.create_indexes([IndexModel(spec["keys"], name=spec["name"], **spec["options"])])
+                result["created"].append(spec["name"])
+            except Exception as e:
+                result["failed"].append(f"{spec['name']}: {e}")
+
+        wanted = {spec["name"] for spec in specs}
+        for name in existing:
+            if name == "_id_" or name in wanted:
+                continue
+            result["stale"].append(name)
+            if drop_stale:
+                try:
+                    await collection.drop_index(name)
+                    result["dropped"].append(name)
+                except Exception as e:
+                    result["failed"].append(f"{name}: {e}")
+
+        report[collection_name] = result
+    return report
+
+
+def _find_stages(plan: Any, stage: str) -> bool:
+    """Check whether an explain plan tree contains the given stage"""
+    if isinstance(plan, dict):
+        if plan.get("stage") == stage:
+            return True
+        return any(_find_stages(value, stage) for value in plan.values())
+    if isinstance(plan, list):
+        return any(_find_stages(item, stage) for item in plan)
+    return False
+
+
+async def explain_query(database, query: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Explain a single registered query
+    Args:
+        database: Motor database
+        query: Entry from QUERY_REGISTRY
+    Returns:
+        Query name and whether its winning plan scans the whole collection
+    """
+    cursor = database[query["collection"]].find(query["filter"])
+    if query.get("sort"):
+        cursor = cursor.sort(query["sort"])
+    explanation = await cursor.explain()
+    winning_plan = explanation.get("queryPlanner", {}).get("winningPlan", {})
+    return {
+        "name": query["name"],
+        "collection": query["collection"],
+        "collscan": _find_stages(winning_plan, "COLLSCAN"),
+        "blockingSort": _find_stages(winning_plan, "SORT")
+    }
+
+
+async def explain_queries(database, queries: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """
+    Explain every registered query
+    Args:
+        database: Motor database
+        queries: Queries to explain (defaults to QUERY_REGISTRY)
+    Returns:
+        One result per query
+    """
+    return [await explain_query(database, query) for query in (queries or QUERY_REGISTRY)]
+
+
+def print_sync_report(report: Dict[str, Dict[str, List[str]]]) -> None:
+    """Print a sync report in the startup log style"""
+    for collection_name, result in report.items():
+        for name in result["created"]:
+            print(f"✅ [{collection_name}] created index {name}")
+        for name in result["changed"]:
+            print(f"⚠️ [{collection_name}] index {name} differs from spec (drop it and re-sync)")
+        for name in result["dropped"]:
+            print(f"🗑️ [{collection_name}] dropped stale index {name}")
+        for name in result["stale"]:
+            if name not in result["dropped"]:
+                print(f"ℹ️ [{collection_name}] stale index {name} (run with --drop-stale to remove)")
+        for failure in result["failed"]:
+            print(f"❌ [{collection_name}] {failure}")
+
+
+async def main(drop_stale: bool, explain: bool) -> int:
+    await db.connect_to_mongo(ensure_indexes=False)
+    try:
+        report = await sync_indexes(db.database, drop_stale=drop_stale)
+        print_sync_report(report)
+
+        if explain:
+            results = await explain_queries(db.database)
+            for result in results:
+                if result["collscan"]:
+                    print(f"❌ {result['name']}: COLLSCAN on {result['collection']}")
+                elif result["blockingSort"]:
+                    print(f"⚠️ {result['name']}: in-memory SORT")
+                else:
+                    print(f"✅ {result['name']}: index scan")
+            collscans = sum(1 for result in results if result["collscan"])
+            print(f"{len(results)} queries explained, {collscans} collection scans")
+            # Non-zero exit so CI can gate on it
+            return 1 if collscans else 0
+        return 0
+    finally:
+        await db.close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sync MongoDB indexes with INDEX_SPECS")
+    parser.add_argument("--drop-stale", action="store_true", help="drop indexes not in the spec")
+    parser.add_argument("--explain", action="store_true", help="explain every registered query")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.drop_stale, args.explain)))
@@ -11,8 +11,14 @@ import os
 from dotenv import load_dotenv
 
 # Import routers
-from routers import auth, consignments, bids, jobs, telegram
+from routers import auth, consignments, bids, jobs, telegram, exports, partners, events
 # Import shared DBs and config
+from utils.location_matcher import consignment_location_fields, user_location_fields
+from utils.autocomplete import get_autocomplete
+from utils.spatial_index import msme_index, sync_msme_index
+from utils.events import event_hub
+from utils.bid_stats import verify_bid_stats
+import asyncio
 from db import (
     connect_to_mongo, 
     close_mongo_connection, 
@@ -22,7 +28,9 @@ from db import (
     get_jobs_collection,
     SECRET_KEY, 
     ALGORITHM, 
-    ACCESS_TOKEN_EXPIRE_MINUTES
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    MSME_INDEX_SYNC_SECONDS,
+    BID_STATS_VERIFY_SECONDS
 )
 
 # Load environment variables
@@ -31,6 +39,26 @@ load_dotenv()
 # Security
 security = HTTPBearer()
 
+async def keep_msme_index_synced(since: Optional[str]):
+    """Periodically pick up MSMEs registered or moved through other workers"""
+    while True:
+        await asyncio.sleep(MSME_INDEX_SYNC_SECONDS)
+        try:
+            since = await sync_msme_index(get_users_collection(), since) or since
+        except Exception as e:
+            print(f"⚠️ MSME index sync failed: {e}")
+
+async def keep_bid_stats_verified():
+    """Periodically compare open consignments' bidStats with their bids and repair drift"""
+    while True:
+        await asyncio.sleep(BID_STATS_VERIFY_SECONDS)
+        try:
+            checked, drifted = await verify_bid_stats(get_consignments_collection(), get_bids_collection())
+            if drifted:
+                print(f"⚠️ Repaired bid stats on {drifted} of {checked} open consignments")
+        except Exception as e:
+            print(f"⚠️ Bid stats verification failed: {e}")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
@@ -43,10 +71,25 @@ async def lifespan(app: FastAPI):
     # Seed some sample data
     await seed_sample_data()
     
+    # Build the location autocomplete index in the background
+    asyncio.get_running_loop().run_in_executor(None, get_autocomplete)
+    
+    # Load MSME home bases into the spatial index, then keep it in sync
+    since = await sync_msme_index(get_users_collection())
+    print(f"📍 Indexed {len(msme_index)} MSME locations")
+    msme_sync_task = asyncio.create_task(keep_msme_index_synced(since))
+    
+    # Bid stats are maintained incrementally; this only catches drift
+    bid_stats_task = asyncio.create_task(keep_bid_stats_verified()) if BID_STATS_VERIFY_SECONDS > 0 else None
+    
     yield
     
     # Shutdown
     print("🛑 Shutting down LogiLedger AI Backend...")
+    msme_sync_task.cancel()
+    if bid_stats_task:
+        bid_stats_task.cancel()
+    auth.password_hasher.shutdown()
     await close_mongo_connection()
 
 # Create FastAPI app
@@ -66,40 +109,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Dependency to get current user
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    try:
-        token = credentials.credentials
-        payload = auth.decode_token(token)
-        user_id = payload.get("sub")
-        users_collection = get_users_collection()
-        if user_id is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authentication credentials",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        user = await users_collection.find_one({"id": user_id})
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authentication credentials",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        return user
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(consignments.router, prefix="/api/consignments", tags=["Consignments"])
 app.include_router(bids.router, prefix="/api/bids", tags=["Bidding"])
 app.include_router(jobs.router, prefix="/api/jobs", tags=["Jobs"])
 app.include_router(telegram.router, prefix="/api/telegram", tags=["Telegram"])
+app.include_router(exports.router, prefix="/api/exports", tags=["Exports"])
+app.include_router(partners.router, prefix="/api/partners", tags=["Partners"])
+app.include_router(events.router, prefix="/api/events", tags=["Events"])
 
 # Health check endpoint
 @app.get("/health")
@@ -125,7 +143,15 @@ async def health_check():
             "consignments": consignments_count,
             "bids": bids_count,
             "jobs": jobs_count
-        }
+        },
+        "caches": {
+            "principals": auth.principal_cache.stats(),
+            "tokens": auth.token_cache.stats(),
+            "publicConsignments": consignments.public_consignments_cache.stats()
+        },
+        "passwordHasher": auth.password_hasher.stats(),
+        "msmeIndex": msme_index.stats(),
+        "eventStream": event_hub.stats()
     }
 
 # Seed sample data
@@ -224,6 +250,12 @@ async def seed_sample_data():
         }
     ]
     
+    # Pre-normalized location keys (same as written by register/create)
+    for user in sample_users:
+        user.update(user_location_fields(user["location"]))
+    for consignment in sample_consignments:
+        consignment.update(consignment_location_fields(consignment["origin"], consignment["destination"]))
+    
     # Add sample data to MongoDB
     for user in sample_users:
         # Check if user already exists
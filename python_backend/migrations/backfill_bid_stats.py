@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Backfill the bidStats field on existing consignments
+
+bidStats (see utils/bid_stats.py) is maintained at bid-write time with
+$inc/$min. Consignments that received bids before it existed, or whose
+stats drifted, get it recomputed from their bids. Safe to re-run: only
+consignments whose stats differ from the aggregation are written.
+
+Usage (from python_backend/):
+    python migrations/backfill_bid_stats.py [batch_size]
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db
+from utils.bid_stats import verify_bid_stats
+
+
+async def main(batch_size: int):
+    await db.connect_to_mongo()
+    try:
+        checked, repaired = await verify_bid_stats(
+            db.get_consignments_collection(),
+            db.get_bids_collection(),
+            open_only=False,
+            batch_size=batch_size
+        )
+        print(f"✅ Checked bidStats on {checked} consignments, backfilled {repaired}")
+    finally:
+        await db.close_mongo_connection()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 500))
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Backfill pre-normalized location keys on existing documents
+
+Adds originCity/originState/destCity/destState (+ originGeo/destGeo/originCell) to
+consignments and locationCity/locationState (+ locationGeo) to users created
+before these fields existed. Safe to re-run: only documents missing the keys
+are touched.
+
+Usage (from python_backend/):
+    python migrations/backfill_location_keys.py [batch_size]
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo import UpdateOne
+import db
+from utils.location_matcher import format_location, consignment_location_fields, user_location_fields
+
+
+async def flush(collection, operations: list) -> int:
+    if not operations:
+        return 0
+    result = await collection.bulk_write(operations, ordered=False)
+    operations.clear()
+    return result.modified_count
+
+
+async def backfill_consignments(batch_size: int) -> int:
+    collection = db.get_consignments_collection()
+    operations = []
+    updated = 0
+
+    cursor = collection.find(
+        {"$or": [
+            {"originState": {"$exists": False}},
+            {"originGeo": {"$exists": False}},
+            {"originCell": {"$exists": False}}
+        ]},
+        {"origin": 1, "destination": 1}
+    ).batch_size(batch_size)
+
+    async for consignment in cursor:
+        fields = consignment_location_fields(
+            format_location(consignment.get("origin") or ""),
+            format_location(consignment.get("destination") or "")
+        )
+        operations.append(UpdateOne({"_id": consignment["_id"]}, {"$set": fields}))
+        if len(operations) >= batch_size:
+            updated += await flush(collection, operations)
+
+    updated += await flush(collection, operations)
+    return updated
+
+
+async def backfill_users(batch_size: int) -> int:
+    collection = db.get_users_collection()
+    operations = []
+    updated = 0
+
+    cursor = collection.find(
+        {
+            "$or": [{"locationState": {"$exists": False}}, {"locationGeo": {"$exists": False}}],
+            "location": {"$nin": [None, ""]}
+        },
+        {"location": 1}
+    ).batch_size(batch_size)
+
+    async for user in cursor:
+        fields = user_location_fields(format_location(user["location"]))
+        operations.append(UpdateOne({"_id": user["_id"]}, {"$set": fields}))
+        if len(operations) >= batch_size:
+            updated += await flush(collection, operations)
+
+    updated += await flush(collection, operations)
+    return updated
+
+
+async def main(batch_size: int):
+    await db.connect_to_mongo()
+    try:
+        consignments = await backfill_consignments(batch_size)
+        print(f"✅ Backfilled location keys on {consignments} consignments")
+        users = await backfill_users(batch_size)
+        print(f"✅ Backfilled location keys on {users} users")
+    finally:
+        await db.close_mongo_connection()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000))
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Backfill the derived maxPayload field on existing MSMEs
+
+maxPayload (see utils/vehicles.py) is computed from fleetSize and
+vehicleTypes at registration and used by the capacity filter in
+/api/consignments/available. Safe to re-run: only MSMEs missing the field
+are touched.
+
+Usage (from python_backend/):
+    python migrations/backfill_max_payload.py [batch_size]
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo import UpdateOne
+import db
+from utils.vehicles import user_capacity_fields
+
+
+async def backfill_msmes(batch_size: int) -> int:
+    collection = db.get_users_collection()
+    operations = []
+    updated = 0
+
+    cursor = collection.find(
+        {"userType": "msme", "maxPayload": {"$exists": False}},
+        {"fleetSize": 1, "vehicleTypes": 1}
+    ).batch_size(batch_size)
+
+    async for user in cursor:
+        operations.append(UpdateOne({"_id": user["_id"]}, {"$set": user_capacity_fields(user)}))
+        if len(operations) >= batch_size:
+            result = await collection.bulk_write(operations, ordered=False)
+            updated += result.modified_count
+            operations = []
+
+    if operations:
+        result = await collection.bulk_write(operations, ordered=False)
+        updated += result.modified_count
+    return updated
+
+
+async def main(batch_size: int):
+    await db.connect_to_mongo()
+    try:
+        users = await backfill_msmes(batch_size)
+        print(f"✅ Backfilled maxPayload on {users} MSMEs")
+    finally:
+        await db.close_mongo_connection()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000))
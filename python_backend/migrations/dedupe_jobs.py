@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Remove duplicate jobs and make the (consignmentId, transporterId) index unique
+
+Concurrent awards and /jobs/awarded requests could insert more than one job
+for the same awarded bid while that index was not unique. For each
+duplicate group this keeps the job that has progressed furthest (any
+status other than "awarded", or an uploaded invoice), else the oldest one,
+and deletes the rest. The old non-unique index is then replaced. Safe to
+re-run.
+
+Usage (from python_backend/):
+    python migrations/dedupe_jobs.py
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo import IndexModel
+import db
+from indexes import INDEX_SPECS
+
+JOB_KEY_INDEX = "consignmentId_1_transporterId_1"
+
+
+def keep_order(job: dict) -> tuple:
+    """Sort key putting the job to keep first"""
+    return (job.get("status") == "awarded" and not job.get("invoiceUploaded"), job["_id"])
+
+
+async def dedupe_jobs() -> int:
+    collection = db.get_jobs_collection()
+    removed = 0
+
+    groups = collection.aggregate([
+        {"$group": {
+            "_id": {"consignmentId": "$consignmentId", "transporterId": "$transporterId"},
+            "jobs": {"$push": {"_id": "$_id", "status": "$status", "invoiceUploaded": "$invoiceUploaded"}},
+            "count": {"$sum": 1}
+        }},
+        {"$match": {"count": {"$gt": 1}}}
+    ], allowDiskUse=True)
+
+    async for group in groups:
+        duplicates = sorted(group["jobs"], key=keep_order)[1:]
+        result = await collection.delete_many({"_id": {"$in": [job["_id"] for job in duplicates]}})
+        removed += result.deleted_count
+    return removed
+
+
+async def make_index_unique():
+    collection = db.get_jobs_collection()
+    spec = next(spec for spec in INDEX_SPECS[db.JOBS_COLLECTION] if spec["name"] == JOB_KEY_INDEX)
+    existing = (await collection.index_information()).get(JOB_KEY_INDEX)
+    if existing and existing.get("unique"):
+        return False
+    # Options can't be changed in place
+    if existing:
+        await collection.drop_index(JOB_KEY_INDEX)
+    await collection.create_indexes([IndexModel(spec["keys"], name=spec["name"], **spec["options"])])
+    return True
+
+
+async def main():
+    await db.connect_to_mongo()
+    try:
+        removed = await dedupe_jobs()
+        print(f"✅ Removed {removed} duplicate jobs")
+        if await make_index_unique():
+            print(f"✅ Rebuilt {JOB_KEY_INDEX} as a unique index")
+        else:
+            print(f"ℹ️ {JOB_KEY_INDEX} is already unique")
+    finally:
+        await db.close_mongo_connection()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
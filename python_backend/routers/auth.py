@@ -2,17 +2,49 @@ from fastapi import APIRouter, HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, EmailStr
 from typing import Optional, Dict
-import bcrypt
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
 import uuid
 import os
+import hashlib
+import secrets
 from bson import ObjectId
-from db import get_users_collection, SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
+from db import (
+    get_users_collection,
+    get_sessions_collection,
+    SECRET_KEY,
+    ALGORITHM,
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    REFRESH_TOKEN_EXPIRE_DAYS,
+    PRINCIPAL_CACHE_TTL_SECONDS,
+    PRINCIPAL_CACHE_MAX_SIZE,
+    BCRYPT_ROUNDS,
+    PASSWORD_HASH_MAX_CONCURRENCY,
+    TOKEN_CACHE_MAX_SIZE
+)
+from utils.cache import TTLCache
+from utils.password_hasher import PasswordHasher
+from utils.token_cache import VerifiedTokenCache
+from utils.location_matcher import format_location, user_location_fields
+from utils.spatial_index import index_user
+from utils.vehicles import user_capacity_fields
 
 router = APIRouter()
 security = HTTPBearer()
 
+# Authenticated users keyed by user id, so polling endpoints skip the users lookup
+principal_cache = TTLCache(
+    max_size=PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=PRINCIPAL_CACHE_TTL_SECONDS,
+    name="principals"
+)
+
+# bcrypt runs on a bounded thread pool so logins don't stall the event loop
+password_hasher = PasswordHasher(
+    rounds=BCRYPT_ROUNDS,
+    max_concurrency=PASSWORD_HASH_MAX_CONCURRENCY
+)
+
 # Pydantic models
 class UserLogin(BaseModel):
     email: str
@@ -39,27 +71,39 @@ class UserResponse(BaseModel):
     phone: Optional[str] = None
     fleetSize: Optional[int] = None
     vehicleTypes: Optional[list] = None
+    maxPayload: Optional[float] = None
     createdAt: str
 
 class LoginResponse(BaseModel):
     token: str
+    refreshToken: Optional[str] = None
     user: UserResponse
     message: str
 
 class RegisterResponse(BaseModel):
     token: str
+    refreshToken: Optional[str] = None
     user: UserResponse
     message: str
 
-def hash_password(password: str) -> str:
-    """Hash a password using bcrypt"""
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-    return hashed.decode('utf-8')
+class LocationUpdate(BaseModel):
+    location: str
+
+class RefreshRequest(BaseModel):
+    refreshToken: str
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash"""
-    return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+class RefreshResponse(BaseModel):
+    token: str
+    refreshToken: str
+    message: str
+
+async def hash_password(password: str) -> str:
+    """Hash a password using bcrypt on the password executor"""
+    return await password_hasher.hash(password)
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash on the password executor"""
+    return await password_hasher.verify(plain_password, hashed_password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create a JWT access token"""
@@ -72,11 +116,38 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def hash_refresh_token(refresh_token: str) -> str:
+    """Hash a refresh token for storage (only the digest is kept in the database)"""
+    return hashlib.sha256(refresh_token.encode('utf-8')).hexdigest()
+
+async def create_session(user_id: str) -> str:
+    """Create a refresh session for a user and return the raw refresh token"""
+    sessions_collection = get_sessions_collection()
+    refresh_token = secrets.token_urlsafe(32)
+    now = datetime.utcnow()
+    
+    await sessions_collection.insert_one({
+        "userId": user_id,
+        "tokenHash": hash_refresh_token(refresh_token),
+        "previousTokenHash": None,
+        "createdAt": now,
+        "rotatedAt": now,
+        "expiresAt": now + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    })
+    
+    return refresh_token
+
+def verify_token(token: str) -> dict:
+    """Fully verify a JWT token (signature and claims)"""
+    return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+
+# Payloads of already verified tokens, shared by every router through decode_token
+token_cache = VerifiedTokenCache(verify_token, max_size=TOKEN_CACHE_MAX_SIZE)
+
 def decode_token(token: str) -> dict:
-    """Decode a JWT token"""
+    """Decode a JWT token, reusing the payload if it was already verified"""
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
+        return token_cache.decode(token)
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -84,6 +155,45 @@ def decode_token(token: str) -> dict:
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+def invalidate_user(user_id: str) -> None:
+    """Drop a user from the principal cache after their document changes"""
+    principal_cache.invalidate(str(user_id))
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Get current user from token (shared dependency for all routers)"""
+    try:
+        token = credentials.credentials
+        payload = decode_token(token)
+        user_id = payload.get("sub")
+        if user_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid authentication credentials"
+            )
+        
+        user = principal_cache.get(user_id)
+        if user is None:
+            users_collection = get_users_collection()
+            user = await users_collection.find_one({"_id": ObjectId(user_id)}, {"password": 0})
+            
+            if not user:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="User not found"
+                )
+            
+            user["id"] = str(user["_id"])
+            principal_cache.set(user_id, user)
+        
+        # Hand out a copy so handlers can't mutate the cached principal
+        return dict(user)
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials"
+        )
+
 @router.post("/login", response_model=LoginResponse)
 async def login(user_credentials: UserLogin):
     """User login endpoint"""
@@ -100,19 +210,30 @@ async def login(user_credentials: UserLogin):
         )
     
     # Verify password
-    if not verify_password(user_credentials.password, user["password"]):
+    if not await verify_password(user_credentials.password, user["password"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Upgrade the stored hash if the configured work factor has changed
+    if password_hasher.needs_rehash(user["password"]):
+        new_hash = await hash_password(user_credentials.password)
+        await users_collection.update_one(
+            {"_id": user["_id"], "password": user["password"]},
+            {"$set": {"password": new_hash}}
+        )
+        password_hasher.rehashed += 1
+    
     # Create access token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": str(user["_id"])}, expires_delta=access_token_expires
     )
     
+    refresh_token = await create_session(str(user["_id"]))
+    
     # Remove password and MongoDB _id from response
     user_response_data = {k: v for k, v in user.items() if k not in ["password", "_id"]}
     user_response_data["id"] = str(user["_id"])
@@ -120,6 +241,7 @@ async def login(user_credentials: UserLogin):
     
     return LoginResponse(
         token=access_token,
+        refreshToken=refresh_token,
         user=user_response,
         message="Login successful"
     )
@@ -164,7 +286,7 @@ async def register(user_data: UserRegister):
             )
     
     # Create new user
-    hashed_password = hash_password(user_data.password)
+    hashed_password = await hash_password(user_data.password)
     
     new_user = {
         "name": user_data.name,
@@ -178,10 +300,19 @@ async def register(user_data: UserRegister):
         "vehicleTypes": user_data.vehicleTypes or [],
         "createdAt": datetime.now().isoformat()
     }
+    new_user["updatedAt"] = new_user["createdAt"]
+    if user_data.userType == "msme":
+        # Payload limit used by the indexed capacity filter in /available
+        new_user.update(user_capacity_fields(new_user))
+    if user_data.location:
+        # Pre-normalized keys used by the indexed /available query
+        new_user.update(user_location_fields(format_location(user_data.location)))
     
     # Add user to database
     result = await users_collection.insert_one(new_user)
     user_id = str(result.inserted_id)
+    invalidate_user(user_id)
+    index_user(new_user)
     
     # Create access token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -189,46 +320,97 @@ async def register(user_data: UserRegister):
         data={"sub": user_id}, expires_delta=access_token_expires
     )
     
+    refresh_token = await create_session(user_id)
+    
     # Remove password from response
-    user_response_data = {k: v for k, v in new_user.items() if k != "password"}
+    user_response_data = {k: v for k, v in new_user.items() if k not in ["password", "_id"]}
     user_response_data["id"] = user_id
     user_response = UserResponse(**user_response_data)
     
     return RegisterResponse(
         token=access_token,
+        refreshToken=refresh_token,
         user=user_response,
         message="Registration successful"
     )
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_info(credentials: HTTPAuthorizationCredentials = Depends(security)):
+async def get_current_user_info(current_user: dict = Depends(get_current_user)):
     """Get current user information"""
-    try:
-        token = credentials.credentials
-        payload = decode_token(token)
-        user_id = payload.get("sub")
-        
-        users_collection = get_users_collection()
-        user = await users_collection.find_one({"_id": ObjectId(user_id)})
-        
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User not found"
-            )
-        
-        # Remove password and MongoDB _id from response
-        user_response_data = {k: v for k, v in user.items() if k not in ["password", "_id"]}
-        user_response_data["id"] = str(user["_id"])
-        return UserResponse(**user_response_data)
-        
-    except Exception as e:
+    # Remove password and MongoDB _id from response
+    user_response_data = {k: v for k, v in current_user.items() if k not in ["password", "_id"]}
+    return UserResponse(**user_response_data)
+
+@router.put("/me/location", response_model=UserResponse)
+async def update_location(location_update: LocationUpdate, current_user: dict = Depends(get_current_user)):
+    """Change the current user's location (re-derives location keys and coordinates)"""
+    users_collection = get_users_collection()
+    location = location_update.location.strip()
+    if not location:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Location is required"
+        )
+    
+    updates = {
+        "location": location,
+        "updatedAt": datetime.now().isoformat()
+    }
+    updates.update(user_location_fields(format_location(location)))
+    
+    await users_collection.update_one({"_id": ObjectId(current_user["id"])}, {"$set": updates})
+    invalidate_user(current_user["id"])
+    
+    updated_user = dict(current_user, **updates)
+    index_user(updated_user)
+    
+    user_response_data = {k: v for k, v in updated_user.items() if k not in ["password", "_id"]}
+    return UserResponse(**user_response_data)
+
+@router.post("/refresh", response_model=RefreshResponse)
+async def refresh_access_token(refresh_request: RefreshRequest):
+    """Exchange a refresh token for a new access token (rotates the refresh token)"""
+    sessions_collection = get_sessions_collection()
+    token_hash = hash_refresh_token(refresh_request.refreshToken)
+    new_refresh_token = secrets.token_urlsafe(32)
+    now = datetime.utcnow()
+    
+    # Single indexed lookup that also rotates the token, so a refresh token works once
+    session = await sessions_collection.find_one_and_update(
+        {"tokenHash": token_hash, "expiresAt": {"$gt": now}},
+        {
+            "$set": {
+                "tokenHash": hash_refresh_token(new_refresh_token),
+                "previousTokenHash": token_hash,
+                "rotatedAt": now
+            }
+        }
+    )
+    
+    if not session:
+        # A rotated-out token being replayed means it leaked; revoke that session
+        await sessions_collection.delete_one({"previousTokenHash": token_hash})
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials"
+            detail="Invalid or expired refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
         )
+    
+    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = create_access_token(
+        data={"sub": session["userId"]}, expires_delta=access_token_expires
+    )
+    
+    return RefreshResponse(
+        token=access_token,
+        refreshToken=new_refresh_token,
+        message="Token refreshed successfully"
+    )
 
 @router.post("/logout")
-async def logout():
-    """User logout endpoint (client-side token removal)"""
+async def logout(refresh_request: Optional[RefreshRequest] = None):
+    """User logout endpoint (client-side token removal, revokes the refresh session if given)"""
+    if refresh_request:
+        sessions_collection = get_sessions_collection()
+        await sessions_collection.delete_one({"tokenHash": hash_refresh_token(refresh_request.refreshToken)})
     return {"message": "Logout successful"} 
\ No newline at end of file
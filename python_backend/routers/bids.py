@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Query
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel
 from typing import Optional, List, Dict
@@ -6,8 +6,27 @@ from datetime import datetime, timedelta
 import uuid
 import os
 from bson import ObjectId
-from db import get_bids_collection, get_consignments_collection, get_users_collection
-from routers.auth import decode_token
+from pymongo import ReturnDocument
+from db import (
+    get_bids_collection,
+    get_consignments_collection,
+    get_jobs_collection,
+    get_users_collection,
+    run_in_transaction
+)
+from routers.auth import get_current_user
+from routers.consignments import invalidate_public_consignments
+from utils.events import event_hub, BID_PLACED, BID_AWARDED
+from utils.pagination import paginate, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from utils.bid_stats import LIVE_BID_STATUSES, recompute_bid_stats
+from utils.bidding import (
+    BID_SORTS,
+    BID_SORT_PATTERN,
+    parse_timestamp,
+    place_bid,
+    find_bid,
+    apply_award
+)
 
 router = APIRouter()
 security = HTTPBearer()
@@ -40,6 +59,8 @@ class BidResponse(BaseModel):
 class BidListResponse(BaseModel):
     success: bool
     bids: List[BidResponse]
+    next: Optional[str] = None
+    totalEstimate: Optional[int] = None
     message: Optional[str] = None
 
 class BidCreateResponse(BaseModel):
@@ -47,48 +68,11 @@ class BidCreateResponse(BaseModel):
     bid: BidResponse
     message: str
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Get current user from token"""
-    try:
-        token = credentials.credentials
-        payload = decode_token(token)
-        user_id = payload.get("sub")
-        
-        users_collection = get_users_collection()
-        user = await users_collection.find_one({"_id": ObjectId(user_id)})
-        
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User not found"
-            )
-        
-        user["id"] = str(user["_id"])
-        return user
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials"
-        )
-
-async def increment_bid_count(consignment_id: str):
-    """Increment bid count for a consignment"""
-    consignments_collection = get_consignments_collection()
-    consignment = await consignments_collection.find_one({"_id": ObjectId(consignment_id)})
-    if consignment:
-        old_count = consignment.get("bidCount", 0)
-        new_count = old_count + 1
-        await consignments_collection.update_one(
-            {"_id": ObjectId(consignment_id)},
-            {
-                "$set": {
-                    "bidCount": new_count,
-                    "updatedAt": datetime.now().isoformat()
-                }
-            }
-        )
-        print(f"[incrementBidCount] Updated bid count from {old_count} to {new_count}")
+def bid_response_data(bid: dict) -> dict:
+    """BidResponse fields from a stored bid"""
+    bid_data = {k: v for k, v in bid.items() if k != "_id"}
+    bid_data["id"] = str(bid["_id"])
+    return bid_data
 
 @router.post("/create", response_model=BidCreateResponse)
 async def create_bid(
@@ -105,60 +89,21 @@ async def create_bid(
             detail="Only MSMEs can place bids"
         )
     
-    consignments_collection = get_consignments_collection()
-    bids_collection = get_bids_collection()
-    
-    # Check if consignment exists and is open
-    consignment = await consignments_collection.find_one({"_id": ObjectId(bid_data.consignmentId)})
-    if not consignment:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Consignment not found"
-        )
-    if consignment["status"] != "open":
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="This consignment is no longer accepting bids"
-        )
-    
-    # Check if user already bid on this consignment
-    existing_bid = await bids_collection.find_one({
-        "consignmentId": bid_data.consignmentId,
-        "bidderId": current_user["id"]
-    })
-    
-    if existing_bid:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="You have already placed a bid on this consignment"
-        )
-    
-    # Validate bid amount
-    if bid_data.bidAmount > consignment["budget"]:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Bid amount cannot exceed the maximum budget"
-        )
-    
-    # Validate estimated delivery
+    # Validate estimated delivery before touching the database
     try:
-        estimated_date = datetime.fromisoformat(bid_data.estimatedDelivery.replace('Z', '+00:00'))
-        deadline = datetime.fromisoformat(consignment["deadline"].replace('Z', '+00:00'))
-        if estimated_date > deadline:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Estimated delivery cannot be after the deadline"
-            )
+        estimated_date = parse_timestamp(bid_data.estimatedDelivery)
     except ValueError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid date format"
         )
     
+    consignments_collection = get_consignments_collection()
+    bids_collection = get_bids_collection()
+    
     # Create bid
     bid = {
         "consignmentId": bid_data.consignmentId,
-        "consignmentTitle": consignment["title"],
         "bidderId": current_user["id"],
         "bidderName": current_user["name"],
         "bidderCompany": current_user.get("companyName") or current_user["name"],
@@ -169,15 +114,31 @@ async def create_bid(
         "createdAt": datetime.now().isoformat()
     }
     
-    result = await bids_collection.insert_one(bid)
-    bid["id"] = str(result.inserted_id)
+    # Conditional $inc of bidCount plus an insert guarded by the unique
+    # (consignmentId, bidderId) index, in one transaction where available
+    async def place(session):
+        return await place_bid(
+            consignments_collection, bids_collection, bid, estimated_date, session=session
+        )
     
-    # Increment bid count on consignment
-    await increment_bid_count(bid_data.consignmentId)
+    consignment, bid = await run_in_transaction(place)
+    invalidate_public_consignments()
+    
+    bid_count = consignment.get("bidCount", 0) + 1
+    event_hub.publish(
+        BID_PLACED, consignment["companyId"], bid["consignmentId"],
+        data={
+            "bidId": bid["id"],
+            "bidderCompany": bid["bidderCompany"],
+            "bidAmount": bid["bidAmount"],
+            "estimatedDelivery": bid["estimatedDelivery"],
+            "bidCount": bid_count
+        },
+        public={"bidCount": bid_count}
+    )
     
     print(f"[CreateBid] Bid created: {bid}")
-    print(f"[CreateBid] Updated consignment bid count")
-    print(f"[CreateBid] Total bids in database")
+    print(f"[CreateBid] Consignment bid count now {bid_count}")
     
     return BidCreateResponse(
         success=True,
@@ -186,7 +147,11 @@ async def create_bid(
     )
 
 @router.get("/my-bids", response_model=BidListResponse)
-async def get_my_bids(current_user: dict = Depends(get_current_user)):
+async def get_my_bids(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
     """Get bids placed by the current user"""
     if current_user["userType"] != "msme":
         raise HTTPException(
@@ -196,9 +161,13 @@ async def get_my_bids(current_user: dict = Depends(get_current_user)):
     
     bids_collection = get_bids_collection()
     
-    # Get user's bids
-    cursor = bids_collection.find({"bidderId": current_user["id"]})
-    bids = await cursor.to_list(length=None)
+    # Get one page of the user's bids
+    bids, next_cursor, total_estimate = await paginate(
+        bids_collection,
+        {"bidderId": current_user["id"]},
+        limit=limit,
+        cursor=cursor
+    )
     
     # Convert MongoDB documents to response format
     user_bids = []
@@ -209,59 +178,66 @@ async def get_my_bids(current_user: dict = Depends(get_current_user)):
     
     return BidListResponse(
         success=True,
-        bids=user_bids
+        bids=user_bids,
+        next=next_cursor,
+        totalEstimate=total_estimate
     )
 
 @router.get("/consignment/{consignment_id}", response_model=BidListResponse)
 async def get_consignment_bids(
     consignment_id: str,
+    sort: str = Query("amount", pattern=BID_SORT_PATTERN),
+    top: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     current_user: dict = Depends(get_current_user)
 ):
-    """Get all bids for a specific consignment"""
-    print(f"[GetConsignmentBids] User ID: {current_user.get('id')}")
-    print(f"[GetConsignmentBids] User Type: {current_user.get('userType')}")
-    print(f"[GetConsignmentBids] Consignment ID: {consignment_id}")
-    consignments_db = get_consignments_db()
-    bids_db = get_bids_db()
-
-    # Check if consignment exists and belongs to the user
-    if consignment_id not in consignments_db:
-        print(f"[GetConsignmentBids] Consignment not found: {consignment_id}")
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Consignment not found"
-        )
-
-    consignment = consignments_db[consignment_id]
-    print(f"[GetConsignmentBids] Consignment companyId: {consignment.get('companyId')}")
-
+    """Get bids for a specific consignment, lowest amount first by default (top=N for just the best N)"""
     if current_user["userType"] != "company":
-        print(f"[GetConsignmentBids] Forbidden: user is not a company")
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only companies can view bids for their consignments"
         )
-
+    
+    consignments_collection = get_consignments_collection()
+    bids_collection = get_bids_collection()
+    
+    # Check if consignment exists and belongs to the user
+    consignment = None
+    if ObjectId.is_valid(consignment_id):
+        consignment = await consignments_collection.find_one(
+            {"_id": ObjectId(consignment_id)}, {"companyId": 1}
+        )
+    if not consignment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Consignment not found"
+        )
+    
     if consignment["companyId"] != current_user["id"]:
-        print(f"[GetConsignmentBids] Forbidden: consignment does not belong to user")
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Access denied"
         )
-
-    # Get all bids for this consignment
-    consignment_bids = [
-        BidResponse(**bid)
-        for bid in bids_db.values()
-        if bid["consignmentId"] == consignment_id
-    ]
-
-    print(f"[GetConsignmentBids] Found bids for consignment: {len(consignment_bids)}")
-    print(f"[GetConsignmentBids] Bids: {consignment_bids}")
-
+    
+    # Range scan of (consignmentId, bidAmount|estimatedDelivery, _id)
+    bids, next_cursor, total_estimate = await paginate(
+        bids_collection,
+        {"consignmentId": consignment_id},
+        limit=top or limit,
+        cursor=None if top else cursor,
+        sort=BID_SORTS[sort]
+    )
+    
+    consignment_bids = [BidResponse(**bid_response_data(bid)) for bid in bids]
+    
+    print(f"[GetConsignmentBids] Consignment {consignment_id}: {len(consignment_bids)} bids on page (estimate {total_estimate})")
+    
     return BidListResponse(
         success=True,
-        bids=consignment_bids
+        bids=consignment_bids,
+        next=None if top else next_cursor,
+        totalEstimate=total_estimate
     )
 
 @router.post("/{bid_id}/award", response_model=BidCreateResponse)
@@ -276,60 +252,38 @@ async def award_bid(
             detail="Only companies can award bids"
         )
     
-    bids_db = get_bids_db()
-    consignments_db = get_consignments_db()
-    
-    # Find bid
-    if bid_id not in bids_db:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Bid not found"
-        )
-    
-    bid = bids_db[bid_id]
-    
-    # Check if consignment belongs to the user
-    if bid["consignmentId"] not in consignments_db:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Consignment not found"
-        )
+    consignments_collection = get_consignments_collection()
+    bids_collection = get_bids_collection()
+    jobs_collection = get_jobs_collection()
     
-    consignment = consignments_db[bid["consignmentId"]]
-    if consignment["companyId"] != current_user["id"]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied"
-        )
+    bid = await find_bid(bids_collection, bid_id)
     
-    # Check if consignment is still open
-    if consignment["status"] != "open":
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="This consignment is no longer accepting awards"
+    # Conditional open -> awarded transition, bulk rejection of the other bids
+    # and an upserted job, in one transaction where available
+    async def award(session):
+        return await apply_award(
+            consignments_collection, bids_collection, jobs_collection, bid, current_user["id"], session=session
         )
     
-    # Award the bid
-    bid["status"] = "awarded"
-    bid["awardedAt"] = datetime.now().isoformat()
-    bid["updatedAt"] = datetime.now().isoformat()
-    
-    # Update consignment status
-    consignment["status"] = "awarded"
-    consignment["awardedBidderId"] = bid["bidderId"]
-    consignment["finalAmount"] = bid["bidAmount"]
-    consignment["updatedAt"] = datetime.now().isoformat()
+    awarded_bid = await run_in_transaction(award)
+    invalidate_public_consignments()
+    
+    event_hub.publish(
+        BID_AWARDED, current_user["id"], bid["consignmentId"],
+        data={
+            "bidId": bid_id,
+            "bidderId": bid["bidderId"],
+            "bidderCompany": bid["bidderCompany"],
+            "finalAmount": bid["bidAmount"]
+        },
+        public={"bidId": bid_id, "status": "awarded"}
+    )
     
-    # Reject all other bids for this consignment
-    for other_bid in bids_db.values():
-        if (other_bid["consignmentId"] == bid["consignmentId"] and 
-            other_bid["id"] != bid_id):
-            other_bid["status"] = "rejected"
-            other_bid["updatedAt"] = datetime.now().isoformat()
+    print(f"[AwardBid] Bid {bid_id} awarded on consignment {bid['consignmentId']}")
     
     return BidCreateResponse(
         success=True,
-        bid=BidResponse(**bid),
+        bid=BidResponse(**bid_response_data(awarded_bid)),
         message="Bid awarded successfully"
     )
 
@@ -340,22 +294,17 @@ async def update_bid_status(
     current_user: dict = Depends(get_current_user)
 ):
     """Update bid status"""
-    bids_db = get_bids_db()
-    consignments_db = get_consignments_db()
-    
-    if bid_id not in bids_db:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Bid not found"
-        )
+    consignments_collection = get_consignments_collection()
+    bids_collection = get_bids_collection()
     
-    bid = bids_db[bid_id]
+    bid = await find_bid(bids_collection, bid_id)
     
     # Check permissions
-    if bid["consignmentId"] in consignments_db:
-        consignment = consignments_db[bid["consignmentId"]]
-        if (current_user["userType"] == "company" and 
-            consignment["companyId"] != current_user["id"]):
+    if current_user["userType"] == "company":
+        consignment = await consignments_collection.find_one(
+            {"_id": ObjectId(bid["consignmentId"])}, {"companyId": 1}
+        )
+        if consignment and consignment["companyId"] != current_user["id"]:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Access denied"
@@ -369,18 +318,42 @@ async def update_bid_status(
         )
     
     # Validate status
-    valid_statuses = ["pending", "awarded", "rejected"]
+    valid_statuses = ["pending", "awarded", "rejected", "withdrawn"]
     if status_update.status not in valid_statuses:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid status"
         )
     
-    bid["status"] = status_update.status
-    bid["updatedAt"] = datetime.now().isoformat()
+    if status_update.status == "withdrawn" and bid["bidderId"] != current_user["id"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only the bidder can withdraw a bid"
+        )
+    
+    # Awarding goes through the guarded award path so it can't bypass the consignment transition
+    if status_update.status == "awarded":
+        return await award_bid(bid_id, current_user)
+    
+    updated_bid = await bids_collection.find_one_and_update(
+        {"_id": bid["_id"]},
+        {"$set": {"status": status_update.status, "updatedAt": datetime.now().isoformat()}},
+        return_document=ReturnDocument.AFTER
+    )
+    if not updated_bid:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Bid not found"
+        )
+    
+    # A bid entering or leaving the live set changes the consignment's stats;
+    # $min can't be undone, so they are rebuilt from that consignment's bids
+    if (bid["status"] in LIVE_BID_STATUSES) != (updated_bid["status"] in LIVE_BID_STATUSES):
+        await recompute_bid_stats(consignments_collection, bids_collection, [bid["consignmentId"]])
+        invalidate_public_consignments()
     
     return BidCreateResponse(
         success=True,
-        bid=BidResponse(**bid),
+        bid=BidResponse(**bid_response_data(updated_bid)),
         message="Bid status updated successfully"
-    ) 
\ No newline at end of file
+    )
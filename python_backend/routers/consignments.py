@@ -1,16 +1,71 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Header, Response, UploadFile, File
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from pydantic import BaseModel
-from typing import Optional, List, Dict
+from pydantic import BaseModel, ValidationError, field_validator
+from typing import Optional, List, Dict, Any, Iterator, Tuple
 from datetime import datetime, timedelta
+from functools import lru_cache
+import asyncio
 import uuid
 import os
+import io
+import csv
+import itertools
+import json
 from bson import ObjectId
-from db import get_consignments_collection, get_users_collection
-from routers.auth import decode_token
+from pymongo.errors import BulkWriteError
+from db import get_consignments_collection, get_users_collection, PUBLIC_CACHE_TTL_SECONDS
+from routers.auth import get_current_user
+from utils.pagination import (
+    paginate,
+    encode_cursor,
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    TOTAL_ESTIMATE_CAP
+)
+from utils.response_cache import ResponseCache, etag_matches
+from utils.autocomplete import get_autocomplete
+from utils.location_resolver import suggest_locations
+from utils.backhaul import origin_cells_near
+from utils.consolidation import plan_bundles, DEFAULT_WINDOW_DAYS, MIN_BUNDLE_SIZE
+from utils.bid_stats import bid_stats_summary
+from utils.consignment_filters import (
+    SORTS,
+    SORT_PATTERN,
+    DISTANCE_SORT,
+    DISTANCE_ORDER,
+    parse_goods_types,
+    compile_constraints,
+    route_clause,
+    compile_available_query,
+    within_distance,
+    distance_pipeline
+)
+from utils.distances import distances_from
+from utils.events import event_hub, CONSIGNMENT_STATUS
+from utils.spatial_index import user_point
+from utils.text_search import SEARCH_ORDER, search_terms, search_highlights, text_search_pipeline
+from utils.vehicles import user_capacity_fields
+from utils.location_matcher import (
+    format_location,
+    location_keys,
+    consignment_location_fields,
+    user_location_fields,
+    location_match_query
+)
 
 router = APIRouter()
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
+
+# Serialized /public pages, invalidated whenever an open consignment changes
+public_consignments_cache = ResponseCache(ttl=PUBLIC_CACHE_TTL_SECONDS, name="publicConsignments")
+
+def invalidate_public_consignments():
+    """Drop cached /public responses after a consignment write"""
+    public_consignments_cache.invalidate()
+
+# Seconds clients may cache location suggestions
+LOCATION_SUGGESTIONS_MAX_AGE = 3600
 
 # Pydantic models
 class ConsignmentCreate(BaseModel):
@@ -26,6 +81,13 @@ class ConsignmentCreate(BaseModel):
 class ConsignmentUpdate(BaseModel):
     status: str
 
+class BidStats(BaseModel):
+    count: int
+    lowestBid: Optional[float] = None
+    averageBid: Optional[float] = None
+    earliestDelivery: Optional[str] = None
+    bidsPerHour: Dict[str, int] = {}
+
 class ConsignmentResponse(BaseModel):
     id: str
     title: str
@@ -42,35 +104,123 @@ class ConsignmentResponse(BaseModel):
     bidCount: int
     createdAt: str
     updatedAt: str
+    # Pickup distance from the MSME's base (/available?sort=distance only)
+    distanceKm: Optional[float] = None
+
+class OwnerConsignmentResponse(ConsignmentResponse):
+    # Live auction stats maintained at bid-write time (see utils/bid_stats.py).
+    # Bid amounts are sealed, so only the owning company ever gets these.
+    bidStats: Optional[BidStats] = None
+    
+    @field_validator("bidStats", mode="before")
+    @classmethod
+    def summarize_bid_stats(cls, value):
+        """Stored counters (amountSum, hourly) -> public stats (averageBid, bidsPerHour)"""
+        return bid_stats_summary(value) if isinstance(value, dict) and "amountSum" in value else value
+
+class BulkImportError(BaseModel):
+    row: int
+    errors: List[str]
+
+class BulkImportResponse(BaseModel):
+    success: bool
+    inserted: int
+    failed: int
+    errors: List[BulkImportError]
+    errorsTruncated: bool = False
+    message: str
 
 class ConsignmentListResponse(BaseModel):
     success: bool
     consignments: List[ConsignmentResponse]
+    next: Optional[str] = None
+    totalEstimate: Optional[int] = None
     message: Optional[str] = None
 
-def normalize_location(location: str) -> str:
-    """Normalize location format to 'City, State'"""
-    # Simple normalization - in production, use a proper geocoding service
-    location = location.strip()
-    if ',' not in location:
-        # Try to add state if not present
-        common_cities = {
-            "Mumbai": "Mumbai, Maharashtra",
-            "Delhi": "Delhi, Delhi",
-            "Bangalore": "Bangalore, Karnataka",
-            "Chennai": "Chennai, Tamil Nadu",
-            "Kolkata": "Kolkata, West Bengal",
-            "Hyderabad": "Hyderabad, Telangana",
-            "Pune": "Pune, Maharashtra",
-            "Ahmedabad": "Ahmedabad, Gujarat",
-            "Jaipur": "Jaipur, Rajasthan",
-            "Lucknow": "Lucknow, Uttar Pradesh"
-        }
-        for city, full_location in common_cities.items():
-            if city.lower() in location.lower():
-                return full_location
-        return f"{location}, India"
-    return location
+class OwnerConsignmentListResponse(ConsignmentListResponse):
+    consignments: List[OwnerConsignmentResponse]
+
+class ConsignmentSearchResult(ConsignmentResponse):
+    score: float
+    # Field name -> HTML fragments with matched words wrapped in <mark>
+    highlights: Dict[str, List[str]]
+
+class ConsignmentSearchResponse(BaseModel):
+    success: bool
+    results: List[ConsignmentSearchResult]
+    next: Optional[str] = None
+    totalEstimate: Optional[int] = None
+
+class BundleConsignment(BaseModel):
+    id: str
+    title: str
+    weight: float
+    budget: float
+    deadline: str
+    companyName: Optional[str] = None
+
+class ConsolidationBundle(BaseModel):
+    origin: str
+    destination: str
+    consignments: List[BundleConsignment]
+    totalWeight: float
+    totalBudget: float
+    deadline: str
+    vehicleType: str
+    capacityKg: float
+    utilization: float
+
+class ConsolidationResponse(BaseModel):
+    success: bool
+    bundles: List[ConsolidationBundle]
+    candidates: int
+    message: Optional[str] = None
+
+SEARCH_DEFAULT_PAGE_SIZE = 20
+SEARCH_MAX_QUERY_LENGTH = 200
+
+# Upper bound on open consignments considered for one consolidation plan
+# (earliest deadlines first, read off the (originCell, deadline) index)
+CONSOLIDATION_MAX_CANDIDATES = 5000
+
+CONSOLIDATION_PROJECTION = {
+    "title": 1, "origin": 1, "destination": 1, "weight": 1, "budget": 1, "deadline": 1,
+    "companyName": 1, "originCity": 1, "originState": 1, "destCity": 1, "destState": 1,
+    "originGeo": 1
+}
+
+@lru_cache(maxsize=4096)
+def normalize_location_cached(location: str) -> str:
+    """Memoized format_location for bulk imports (rows repeat the same cities)"""
+    return format_location(location)
+
+def build_consignment(
+    consignment_data: ConsignmentCreate,
+    normalized_origin: str,
+    normalized_destination: str,
+    current_user: dict
+) -> dict:
+    """Build a new consignment document"""
+    now = datetime.now().isoformat()
+    consignment = {
+        "title": consignment_data.title,
+        "origin": normalized_origin,
+        "destination": normalized_destination,
+        "goodsType": consignment_data.goodsType or "other",
+        "weight": consignment_data.weight,
+        "deadline": consignment_data.deadline,
+        "budget": consignment_data.budget,
+        "description": consignment_data.description or "No description provided",
+        "status": "open",
+        "companyId": current_user["id"],
+        "companyName": current_user.get("companyName") or current_user["name"],
+        "bidCount": 0,
+        "createdAt": now,
+        "updatedAt": now
+    }
+    # Pre-normalized keys used by the indexed /available query
+    consignment.update(consignment_location_fields(normalized_origin, normalized_destination))
+    return consignment
 
 def locations_match(location1: str, location2: str) -> bool:
     """Check if two locations match (simple implementation)"""
@@ -87,31 +237,6 @@ def locations_match(location1: str, location2: str) -> bool:
     
     return bool(cities1.intersection(cities2))
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Get current user from token"""
-    try:
-        token = credentials.credentials
-        payload = decode_token(token)
-        user_id = payload.get("sub")
-        
-        users_collection = get_users_collection()
-        user = await users_collection.find_one({"_id": ObjectId(user_id)})
-        
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User not found"
-            )
-        
-        user["id"] = str(user["_id"])
-        return user
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials"
-        )
-
 @router.post("/create", response_model=ConsignmentResponse)
 async def create_consignment(
     consignment_data: ConsignmentCreate,
@@ -129,8 +254,8 @@ async def create_consignment(
             )
         
         # Normalize locations
-        normalized_origin = normalize_location(consignment_data.origin)
-        normalized_destination = normalize_location(consignment_data.destination)
+        normalized_origin = format_location(consignment_data.origin)
+        normalized_destination = format_location(consignment_data.destination)
         
         print(f"[CreateConsignment] Normalized origin: {normalized_origin}")
         print(f"[CreateConsignment] Normalized destination: {normalized_destination}")
@@ -144,25 +269,13 @@ async def create_consignment(
         consignments_collection = get_consignments_collection()
         
         # Create consignment
-        consignment = {
-            "title": consignment_data.title,
-            "origin": normalized_origin,
-            "destination": normalized_destination,
-            "goodsType": consignment_data.goodsType or "other",
-            "weight": consignment_data.weight,
-            "deadline": consignment_data.deadline,
-            "budget": consignment_data.budget,
-            "description": consignment_data.description or "No description provided",
-            "status": "open",
-            "companyId": current_user["id"],
-            "companyName": current_user.get("companyName") or current_user["name"],
-            "bidCount": 0,
-            "createdAt": datetime.now().isoformat(),
-            "updatedAt": datetime.now().isoformat()
-        }
+        consignment = build_consignment(
+            consignment_data, normalized_origin, normalized_destination, current_user
+        )
         
         result = await consignments_collection.insert_one(consignment)
         consignment["id"] = str(result.inserted_id)
+        invalidate_public_consignments()
         
         print(f"[CreateConsignment] Consignment created successfully: {consignment}")
         
@@ -178,8 +291,169 @@ async def create_consignment(
             detail=f"Failed to create consignment: {str(e)}"
         )
 
-@router.get("/my-consignments", response_model=ConsignmentListResponse)
-async def get_my_consignments(current_user: dict = Depends(get_current_user)):
+BULK_IMPORT_DEFAULT_BATCH = 500
+BULK_IMPORT_MAX_BATCH = 5000
+# Per-row errors kept in the response; beyond this only the count grows
+BULK_IMPORT_MAX_ERRORS = 1000
+
+class ImportFileError(ValueError):
+    """The rest of the upload can't be read (e.g. it isn't UTF-8)"""
+
+def iter_import_rows(upload: UploadFile, file_format: str) -> Iterator[Tuple[int, Any]]:
+    """
+    Lazily yield (row number, row) from an uploaded CSV or NDJSON file
+    (reads the spooled upload line by line, never the whole file).
+    Row numbers are 1-based data rows; the CSV header and blank lines
+    are not counted.
+    """
+    text = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+    row_number = 0
+    try:
+        if file_format == "csv":
+            for row in csv.DictReader(text):
+                row_number += 1
+                yield row_number, {k.strip(): (v.strip() if isinstance(v, str) else v) for k, v in row.items() if k}
+        else:
+            for line in text:
+                line = line.strip()
+                if not line:
+                    continue
+                row_number += 1
+                try:
+                    yield row_number, json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield row_number, ValueError(f"Invalid JSON: {e.msg}")
+    except UnicodeDecodeError:
+        yield row_number + 1, ImportFileError("File is not valid UTF-8 text")
+    finally:
+        text.detach()
+
+def next_import_rows(rows: Iterator[Tuple[int, Any]], count: int) -> List[Tuple[int, Any]]:
+    """Read the next chunk of rows (blocking; run off the event loop)"""
+    return list(itertools.islice(rows, count))
+
+@router.post("/bulk-import", response_model=BulkImportResponse)
+async def bulk_import_consignments(
+    file: UploadFile = File(...),
+    file_format: Optional[str] = Query(None, alias="format", pattern="^(csv|ndjson)$"),
+    batch_size: int = Query(BULK_IMPORT_DEFAULT_BATCH, ge=1, le=BULK_IMPORT_MAX_BATCH),
+    current_user: dict = Depends(get_current_user)
+):
+    """Bulk import consignments from a CSV or NDJSON upload"""
+    if current_user["userType"] != "company":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only companies can create consignments"
+        )
+    
+    if not file_format:
+        filename = (file.filename or "").lower()
+        file_format = "csv" if filename.endswith(".csv") or "csv" in (file.content_type or "") else "ndjson"
+    
+    consignments_collection = get_consignments_collection()
+    inserted = 0
+    failed = 0
+    errors: List[BulkImportError] = []
+    batch: List[dict] = []
+    batch_rows: List[int] = []
+    
+    def record_error(row_number: int, messages: List[str]):
+        nonlocal failed
+        failed += 1
+        if len(errors) < BULK_IMPORT_MAX_ERRORS:
+            errors.append(BulkImportError(row=row_number, errors=messages))
+    
+    async def flush_batch():
+        nonlocal inserted
+        if not batch:
+            return
+        try:
+            result = await consignments_collection.insert_many(batch, ordered=False)
+            inserted += len(result.inserted_ids)
+        except BulkWriteError as e:
+            write_errors = e.details.get("writeErrors", [])
+            inserted += len(batch) - len(write_errors)
+            for write_error in write_errors:
+                record_error(batch_rows[write_error["index"]], [write_error.get("errmsg", "Write failed")])
+        batch.clear()
+        batch_rows.clear()
+    
+    # File reads and parsing run in the default executor, one chunk at a time,
+    # so a large upload doesn't block the event loop
+    loop = asyncio.get_running_loop()
+    rows = iter_import_rows(file, file_format)
+    file_error = None
+    while file_error is None:
+        chunk = await loop.run_in_executor(None, next_import_rows, rows, batch_size)
+        if not chunk:
+            break
+        for row_number, row in chunk:
+            if isinstance(row, ImportFileError):
+                file_error = (row_number, str(row))
+                break
+            if isinstance(row, Exception):
+                record_error(row_number, [str(row)])
+                continue
+            if not isinstance(row, dict):
+                record_error(row_number, ["Row must be an object"])
+                continue
+            
+            if not row.get("description"):
+                row["description"] = None
+            try:
+                consignment_data = ConsignmentCreate(**row)
+            except ValidationError as e:
+                record_error(row_number, [
+                    f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+                    for error in e.errors()
+                ])
+                continue
+            
+            normalized_origin = normalize_location_cached(consignment_data.origin)
+            normalized_destination = normalize_location_cached(consignment_data.destination)
+            if not normalized_origin or not normalized_destination:
+                record_error(row_number, ["Invalid location format. Please use 'City, State' format"])
+                continue
+            
+            batch.append(build_consignment(
+                consignment_data, normalized_origin, normalized_destination, current_user
+            ))
+            batch_rows.append(row_number)
+            if len(batch) >= batch_size:
+                await flush_batch()
+    
+    await flush_batch()
+    
+    if inserted:
+        invalidate_public_consignments()
+    
+    if file_error:
+        error_row, message = file_error
+        if not inserted:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Row {error_row}: {message}"
+            )
+        # Earlier batches are already stored; report where reading stopped
+        record_error(error_row, [f"{message}; import stopped at this row"])
+    
+    print(f"[BulkImport] User {current_user['id']}: inserted {inserted}, failed {failed}")
+    
+    return BulkImportResponse(
+        success=failed == 0,
+        inserted=inserted,
+        failed=failed,
+        errors=errors,
+        errorsTruncated=failed > len(errors),
+        message=f"Imported {inserted} consignment(s), {failed} row(s) failed"
+    )
+
+@router.get("/my-consignments", response_model=OwnerConsignmentListResponse)
+async def get_my_consignments(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
     """Get consignments created by the current user"""
     if current_user["userType"] != "company":
         raise HTTPException(
@@ -189,27 +463,101 @@ async def get_my_consignments(current_user: dict = Depends(get_current_user)):
     
     consignments_collection = get_consignments_collection()
     
-    # Get user's consignments
-    cursor = consignments_collection.find({"companyId": current_user["id"]})
-    consignments = await cursor.to_list(length=None)
+    # Get one page of the user's consignments
+    consignments, next_cursor, total_estimate = await paginate(
+        consignments_collection,
+        {"companyId": current_user["id"]},
+        limit=limit,
+        cursor=cursor
+    )
     
     # Convert MongoDB documents to response format
     user_consignments = []
     for consignment in consignments:
         consignment_data = {k: v for k, v in consignment.items() if k != "_id"}
         consignment_data["id"] = str(consignment["_id"])
-        user_consignments.append(ConsignmentResponse(**consignment_data))
+        user_consignments.append(OwnerConsignmentResponse(**consignment_data))
     
     print(f"[GetMyConsignments] Found {len(user_consignments)} consignments for user {current_user['id']}")
     
+    return OwnerConsignmentListResponse(
+        success=True,
+        consignments=user_consignments,
+        next=next_cursor,
+        totalEstimate=total_estimate
+    )
+
+# Pickup radius around the MSME's base for sort=distance
+AVAILABLE_DISTANCE_DEFAULT_KM = 300
+AVAILABLE_DISTANCE_MAX_KM = 2000
+
+async def available_by_distance(
+    consignments_collection,
+    current_user: dict,
+    constraints: Dict[str, Any],
+    route: Dict[str, str],
+    max_distance: float,
+    limit: int,
+    cursor: Optional[str]
+) -> ConsignmentListResponse:
+    """One page of /available ordered by pickup distance from the MSME's base"""
+    home = user_point(current_user)
+    if not home:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Set a location on your profile to sort by distance"
+        )
+    
+    # $geoNear on the originGeo 2dsphere index returns pages in distance order
+    query = compile_available_query(constraints, route=route)
+    documents = await consignments_collection.aggregate(
+        distance_pipeline(query, home[0], home[1], max_distance, limit, cursor)
+    ).to_list(length=limit + 1)
+    
+    has_more = len(documents) > limit
+    documents = documents[:limit]
+    next_cursor = encode_cursor(documents[-1], DISTANCE_ORDER) if has_more and documents else None
+    
+    total_estimate = None
+    if cursor is None:
+        total_estimate = await consignments_collection.count_documents(
+            within_distance(query, home[0], home[1], max_distance), limit=TOTAL_ESTIMATE_CAP
+        )
+    
+    response_consignments = []
+    for consignment in documents:
+        consignment_data = {k: v for k, v in consignment.items() if k != "_id"}
+        consignment_data["id"] = str(consignment["_id"])
+        consignment_data["distanceKm"] = round(consignment["distanceKm"], 1)
+        response_consignments.append(ConsignmentResponse(**consignment_data))
+    
+    print(f"[GetAvailableConsignments] By distance (estimate): {total_estimate}, On page: {len(response_consignments)}")
+    
     return ConsignmentListResponse(
         success=True,
-        consignments=user_consignments
+        consignments=response_consignments,
+        next=next_cursor,
+        totalEstimate=total_estimate
     )
 
 @router.get("/available", response_model=ConsignmentListResponse)
-async def get_available_consignments(current_user: dict = Depends(get_current_user)):
-    """Get available consignments for MSMEs"""
+async def get_available_consignments(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    goods_type: Optional[List[str]] = Query(None),
+    min_budget: Optional[float] = Query(None, ge=0),
+    max_budget: Optional[float] = Query(None, ge=0),
+    min_weight: Optional[float] = Query(None, ge=0),
+    max_weight: Optional[float] = Query(None, ge=0),
+    deadline_from: Optional[str] = None,
+    deadline_to: Optional[str] = None,
+    origin: Optional[str] = None,
+    destination: Optional[str] = None,
+    sort: str = Query("newest", pattern=SORT_PATTERN),
+    max_distance: float = Query(AVAILABLE_DISTANCE_DEFAULT_KM, gt=0, le=AVAILABLE_DISTANCE_MAX_KM),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get available consignments for MSMEs (filter by budget, weight, goods types, deadline and route)"""
     if current_user["userType"] != "msme":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -218,21 +566,56 @@ async def get_available_consignments(current_user: dict = Depends(get_current_us
     
     consignments_collection = get_consignments_collection()
     
-    # Get all open consignments
-    cursor = consignments_collection.find({"status": "open"})
-    all_consignments = await cursor.to_list(length=None)
+    # Only loads the MSME's fleet can carry (users registered before maxPayload
+    # was stored get it derived from fleetSize/vehicleTypes on the fly)
+    max_payload = current_user.get("maxPayload")
+    if max_payload is None and (current_user.get("fleetSize") or current_user.get("vehicleTypes")):
+        max_payload = user_capacity_fields(current_user)["maxPayload"]
+    constraints = compile_constraints(
+        min_budget=min_budget,
+        max_budget=max_budget,
+        min_weight=min_weight,
+        max_weight=max_weight,
+        goods_types=parse_goods_types(goods_type),
+        deadline_from=deadline_from,
+        deadline_to=deadline_to,
+        max_payload=max_payload
+    )
+    
+    # An explicit route replaces the loose home-location match
+    route = route_clause(
+        location_keys(format_location(origin)) if origin else None,
+        location_keys(format_location(destination)) if destination else None
+    )
+    
+    if sort == DISTANCE_SORT:
+        return await available_by_distance(
+            consignments_collection, current_user, constraints, route, max_distance, limit, cursor
+        )
     
-    # Filter by location if user has location
+    # Filter by location if user has location (indexed city/state keys)
+    location_clauses = None
     user_location = current_user.get("location")
-    if user_location:
-        user_location_normalized = normalize_location(user_location)
-        matching_consignments = [
-            consignment for consignment in all_consignments
-            if (locations_match(user_location_normalized, consignment["origin"]) or
-                locations_match(user_location_normalized, consignment["destination"]))
-        ]
-    else:
-        matching_consignments = all_consignments
+    if user_location and not route:
+        if current_user.get("locationState"):
+            user_keys = {
+                "locationCity": current_user.get("locationCity", ""),
+                "locationState": current_user["locationState"]
+            }
+        else:
+            # Users created before the location backfill
+            user_keys = user_location_fields(format_location(user_location))
+        location_clauses = location_match_query(user_keys["locationCity"], user_keys["locationState"])
+    query = compile_available_query(constraints, location_clauses=location_clauses, route=route)
+    
+    # Get one page of matching open consignments
+    matching_consignments, next_cursor, total_estimate = await paginate(
+        consignments_collection,
+        query,
+        limit=limit,
+        cursor=cursor,
+        sort=SORTS[sort]
+    )
     
     # Convert MongoDB documents to response format
     response_consignments = []
@@ -241,40 +624,242 @@ async def get_available_consignments(current_user: dict = Depends(get_current_us
         consignment_data["id"] = str(consignment["_id"])
         response_consignments.append(ConsignmentResponse(**consignment_data))
     
-    print(f"[GetAvailableConsignments] Total: {len(all_consignments)}, Matching: {len(matching_consignments)}")
+    print(f"[GetAvailableConsignments] Matching (estimate): {total_estimate}, On page: {len(matching_consignments)}")
     
     return ConsignmentListResponse(
         success=True,
-        consignments=response_consignments
+        consignments=response_consignments,
+        next=next_cursor,
+        totalEstimate=total_estimate
     )
 
 @router.get("/public", response_model=ConsignmentListResponse)
-async def get_public_consignments():
+async def get_public_consignments(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None)
+):
     """Get public consignments (no authentication required)"""
+    cache_key = (limit, cursor)
+    cached = public_consignments_cache.get(cache_key)
+    
+    if cached is None:
+        generation = public_consignments_cache.generation
+        consignments_collection = get_consignments_collection()
+        
+        # Get one page of open consignments
+        public_consignments, next_cursor, total_estimate = await paginate(
+            consignments_collection,
+            {"status": "open"},
+            limit=limit,
+            cursor=cursor
+        )
+        
+        # Convert MongoDB documents to response format
+        response_consignments = []
+        for consignment in public_consignments:
+            consignment_data = {k: v for k, v in consignment.items() if k != "_id"}
+            consignment_data["id"] = str(consignment["_id"])
+            response_consignments.append(ConsignmentResponse(**consignment_data))
+        
+        body = ConsignmentListResponse(
+            success=True,
+            consignments=response_consignments,
+            next=next_cursor,
+            totalEstimate=total_estimate
+        ).model_dump_json().encode("utf-8")
+        etag = public_consignments_cache.set(cache_key, body, generation)
+    else:
+        body, etag = cached
+    
+    headers = {"ETag": etag, "Cache-Control": "public, no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@router.get("/consolidation-plan", response_model=ConsolidationResponse)
+async def get_consolidation_plan(
+    radius_km: float = Query(200, gt=0, le=2000),
+    window_days: int = Query(DEFAULT_WINDOW_DAYS, ge=0, le=14),
+    limit: int = Query(10, ge=1, le=50),
+    current_user: dict = Depends(get_current_user)
+):
+    """Suggest truckloads of same-corridor open consignments for the current MSME's fleet"""
+    if current_user["userType"] != "msme":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only MSMEs can plan consolidated loads"
+        )
+    
+    home = user_point(current_user)
+    if not home:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Set a location on your profile to plan consolidated loads"
+        )
+    
     consignments_collection = get_consignments_collection()
     
-    # Get all open consignments
-    cursor = consignments_collection.find({"status": "open"})
-    public_consignments = await cursor.to_list(length=None)
+    # Pickups near the MSME's base via the (originCell, deadline) index
+    query = {
+        "status": "open",
+        "originCell": {"$in": origin_cells_near(home[0], home[1], radius_km)}
+    }
+    candidates = await consignments_collection.find(
+        query, CONSOLIDATION_PROJECTION
+    ).sort("deadline", 1).limit(CONSOLIDATION_MAX_CANDIDATES).to_list(length=None)
+    
+    if candidates:
+        geo = [c for c in candidates if c.get("originGeo")]
+        distances = distances_from(
+            home[0], home[1],
+            [c["originGeo"]["coordinates"][1] for c in geo],
+            [c["originGeo"]["coordinates"][0] for c in geo]
+        )
+        candidates = [c for c, distance in zip(geo, distances) if distance <= radius_km]
     
-    # Convert MongoDB documents to response format
-    response_consignments = []
-    for consignment in public_consignments:
+    # Grouping and bin packing is CPU-bound; keep it off the event loop
+    bundles = await asyncio.get_running_loop().run_in_executor(
+        None, plan_bundles, candidates, current_user.get("vehicleTypes"), window_days,
+        MIN_BUNDLE_SIZE, current_user.get("fleetSize") or 1
+    )
+    
+    response_bundles = []
+    for bundle in bundles[:limit]:
+        bundle_consignments = [
+            BundleConsignment(
+                id=str(consignment["_id"]),
+                title=consignment.get("title", ""),
+                weight=consignment["weight"],
+                budget=consignment.get("budget") or 0,
+                deadline=consignment["deadline"],
+                companyName=consignment.get("companyName")
+            )
+            for consignment in bundle["consignments"]
+        ]
+        response_bundles.append(ConsolidationBundle(**dict(bundle, consignments=bundle_consignments)))
+    
+    print(f"[ConsolidationPlan] Candidates: {len(candidates)}, Bundles: {len(bundles)}")
+    
+    return ConsolidationResponse(
+        success=True,
+        bundles=response_bundles,
+        candidates=len(candidates)
+    )
+
+@router.get("/location-recommendations")
+async def get_location_recommendations(
+    response: Response,
+    query: str,
+    limit: int = Query(5, ge=1, le=20)
+):
+    """Get location recommendations based on query"""
+    if not query or not query.strip():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Query parameter is required"
+        )
+    
+    matches = [(place, None) for place, _ in get_autocomplete().suggest(query, limit)]
+    
+    # Typos miss every prefix; offer close spellings with their similarity score.
+    # Saving a location never applies these on its own (see resolve_canonical).
+    if len(matches) < limit:
+        seen = {place.label for place, _ in matches}
+        matches += [
+            (place, score) for place, score in suggest_locations(query, limit)
+            if place.label not in seen
+        ][:limit - len(matches)]
+    
+    # Gazetteer only changes on deploy, so browsers and CDNs may reuse answers
+    response.headers["Cache-Control"] = f"public, max-age={LOCATION_SUGGESTIONS_MAX_AGE}"
+    
+    return {
+        "success": True,
+        "locations": [place.label for place, _ in matches],
+        "places": [
+            {
+                "name": place.name,
+                "state": place.state,
+                "district": place.district,
+                "kind": place.kind,
+                "latitude": place.latitude,
+                "longitude": place.longitude,
+                "score": score
+            }
+            for place, score in matches
+        ]
+    }
+
+@router.get("/search", response_model=ConsignmentSearchResponse)
+async def search_consignments(
+    q: str = Query(..., min_length=1, max_length=SEARCH_MAX_QUERY_LENGTH),
+    consignment_status: Optional[str] = Query(None, alias="status"),
+    limit: int = Query(SEARCH_DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Keyword search over consignment titles and descriptions, most relevant first"""
+    roots = search_terms(q)
+    if not roots:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Search query must contain at least one word"
+        )
+    
+    # Companies search their own consignments, MSMEs the open marketplace
+    if current_user["userType"] == "company":
+        scope = {"companyId": current_user["id"]}
+        if consignment_status:
+            scope["status"] = consignment_status
+    else:
+        scope = {"status": "open"}
+    
+    consignments_collection = get_consignments_collection()
+    
+    documents = await consignments_collection.aggregate(
+        text_search_pipeline(q, scope, limit, cursor)
+    ).to_list(length=limit + 1)
+    
+    has_more = len(documents) > limit
+    documents = documents[:limit]
+    next_cursor = encode_cursor(documents[-1], SEARCH_ORDER) if has_more and documents else None
+    
+    total_estimate = None
+    if cursor is None:
+        total_estimate = await consignments_collection.count_documents(
+            {"$text": {"$search": q}, **scope}, limit=TOTAL_ESTIMATE_CAP
+        )
+    
+    results = []
+    for consignment in documents:
         consignment_data = {k: v for k, v in consignment.items() if k != "_id"}
         consignment_data["id"] = str(consignment["_id"])
-        response_consignments.append(ConsignmentResponse(**consignment_data))
+        consignment_data["score"] = round(consignment["score"], 4)
+        consignment_data["highlights"] = search_highlights(consignment, roots)
+        results.append(ConsignmentSearchResult(**consignment_data))
     
-    return ConsignmentListResponse(
+    print(f"[SearchConsignments] '{q}' Matching (estimate): {total_estimate}, On page: {len(results)}")
+    
+    return ConsignmentSearchResponse(
         success=True,
-        consignments=response_consignments
+        results=results,
+        next=next_cursor,
+        totalEstimate=total_estimate
     )
 
-@router.get("/{consignment_id}", response_model=ConsignmentResponse)
-async def get_consignment_by_id(consignment_id: str):
-    """Get a specific consignment by ID"""
+@router.get("/{consignment_id}", response_model=OwnerConsignmentResponse)
+async def get_consignment_by_id(
+    consignment_id: str,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+):
+    """Get a specific consignment by ID (bid stats only for the owning company)"""
     consignments_collection = get_consignments_collection()
     
-    consignment = await consignments_collection.find_one({"_id": ObjectId(consignment_id)})
+    consignment = await consignments_collection.find_one(
+        {"_id": ObjectId(consignment_id)}
+    ) if ObjectId.is_valid(consignment_id) else None
     
     if not consignment:
         raise HTTPException(
@@ -282,11 +867,21 @@ async def get_consignment_by_id(consignment_id: str):
             detail="Consignment not found"
         )
     
+    # The route stays public; a valid token only decides whether bidStats is shown
+    current_user = None
+    if credentials is not None:
+        try:
+            current_user = await get_current_user(credentials)
+        except HTTPException:
+            current_user = None
+    
     # Convert MongoDB document to response format
-    consignment_data = {k: v for k, v in consignment.items() if k != "_id"}
+    consignment_data = {k: v for k, v in consignment.items() if k not in ("_id", "bidStats")}
     consignment_data["id"] = str(consignment["_id"])
+    if current_user and current_user["id"] == consignment["companyId"]:
+        consignment_data["bidStats"] = consignment.get("bidStats")
     
-    return ConsignmentResponse(**consignment_data)
+    return OwnerConsignmentResponse(**consignment_data)
 
 @router.put("/{consignment_id}/status", response_model=ConsignmentResponse)
 async def update_consignment_status(
@@ -331,6 +926,15 @@ async def update_consignment_status(
         }
     )
     
+    invalidate_public_consignments()
+    
+    if status_update.status != consignment["status"]:
+        status_change = {"status": status_update.status, "previousStatus": consignment["status"]}
+        event_hub.publish(
+            CONSIGNMENT_STATUS, consignment["companyId"], consignment_id,
+            data=status_change, public=status_change
+        )
+    
     # Get updated consignment
     updated_consignment = await consignments_collection.find_one({"_id": ObjectId(consignment_id)})
     consignment_data = {k: v for k, v in updated_consignment.items() if k != "_id"}
@@ -410,36 +1014,3 @@ async def seed_consignments():
         "message": f"Seeded {len(sample_consignments)} sample consignments",
         "consignments": sample_consignments
     }
-
-@router.get("/location-recommendations")
-async def get_location_recommendations(query: str):
-    """Get location recommendations based on query"""
-    if not query:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Query parameter is required"
-        )
-    
-    # Sample location recommendations
-    locations = [
-        "Mumbai, Maharashtra",
-        "Delhi, Delhi",
-        "Bangalore, Karnataka",
-        "Chennai, Tamil Nadu",
-        "Kolkata, West Bengal",
-        "Hyderabad, Telangana",
-        "Pune, Maharashtra",
-        "Ahmedabad, Gujarat",
-        "Jaipur, Rajasthan",
-        "Lucknow, Uttar Pradesh"
-    ]
-    
-    filtered_locations = [
-        location for location in locations
-        if query.lower() in location.lower()
-    ]
-    
-    return {
-        "success": True,
-        "locations": filtered_locations[:5]  # Limit to 5 results
-    } 
\ No newline at end of file
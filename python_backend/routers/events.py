@@ -0,0 +1,77 @@
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from typing import Optional
+from bson import ObjectId
+from db import get_consignments_collection
+from routers.auth import get_current_user
+from utils.events import event_hub, format_sse
+
+router = APIRouter()
+optional_security = HTTPBearer(auto_error=False)
+
+# Seconds between keep-alive comments on an idle stream (keeps proxies from closing it)
+HEARTBEAT_SECONDS = 15
+
+async def get_stream_user(
+    access_token: Optional[str] = Query(None),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+) -> dict:
+    """Current user from the Authorization header, or ?access_token= (EventSource can't set headers)"""
+    if credentials is None and access_token:
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=access_token)
+    if credentials is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated"
+        )
+    return await get_current_user(credentials)
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    consignment_id: Optional[str] = None,
+    current_user: dict = Depends(get_stream_user)
+):
+    """Server-Sent Events stream of bid and consignment status events"""
+    company_id = None
+    private = True
+    if consignment_id is not None:
+        consignment = None
+        if ObjectId.is_valid(consignment_id):
+            consignment = await get_consignments_collection().find_one(
+                {"_id": ObjectId(consignment_id)}, {"companyId": 1}
+            )
+        if not consignment:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Consignment not found"
+            )
+        # Other users following a consignment get its events without bidder details
+        private = consignment["companyId"] == current_user["id"]
+    elif current_user["userType"] == "company":
+        company_id = current_user["id"]
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="consignment_id is required"
+        )
+    
+    subscription = event_hub.subscribe(company_id=company_id, consignment_id=consignment_id, private=private)
+    
+    async def events():
+        try:
+            yield ": connected\n\n"
+            while True:
+                event = await subscription.next(HEARTBEAT_SECONDS)
+                if await request.is_disconnected():
+                    break
+                yield format_sse(event) if event is not None else ": keep-alive\n\n"
+        finally:
+            event_hub.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
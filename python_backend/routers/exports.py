@@ -0,0 +1,159 @@
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi.responses import StreamingResponse
+from typing import Optional, List, Dict, Any, AsyncIterator
+from datetime import datetime
+from db import get_consignments_collection, get_bids_collection, get_jobs_collection
+from routers.auth import get_current_user
+from utils.pagination import SORT_ORDER
+from utils.export import stream_export, projection_for
+
+router = APIRouter()
+
+CONSIGNMENT_FIELDS = [
+    "id", "title", "origin", "destination", "goodsType", "weight", "deadline",
+    "budget", "description", "status", "companyId", "companyName", "bidCount",
+    "createdAt", "updatedAt"
+]
+
+BID_FIELDS = [
+    "id", "consignmentId", "consignmentTitle", "bidderId", "bidderName",
+    "bidderCompany", "bidAmount", "estimatedDelivery", "notes", "status",
+    "createdAt", "awardedAt", "updatedAt"
+]
+
+JOB_FIELDS = [
+    "id", "consignmentId", "consignmentTitle", "companyId", "companyName",
+    "transporterId", "transporterName", "origin", "destination", "amount",
+    "deadline", "status", "awardedDate", "completedDate", "invoiceUploaded",
+    "invoiceUploadedAt", "createdAt", "updatedAt"
+]
+
+EXPORT_DEFAULT_BATCH = 500
+EXPORT_MAX_BATCH = 10000
+
+# Consignment ids per bids query when exporting a company's bids
+BIDS_CONSIGNMENT_CHUNK = 500
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+def parse_fields(fields: Optional[str], allowed: List[str]) -> List[str]:
+    """Parse the comma separated fields parameter"""
+    if not fields:
+        return allowed
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown export field(s): {', '.join(unknown)}"
+        )
+    return requested
+
+def export_response(
+    documents: AsyncIterator[Dict[str, Any]],
+    name: str,
+    fields: List[str],
+    file_format: str,
+    batch_size: int,
+    gzip: bool
+) -> StreamingResponse:
+    """Build a chunked streaming export response"""
+    filename = f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{file_format}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+
+    return StreamingResponse(
+        stream_export(documents, fields, file_format=file_format, batch_size=batch_size, compress=gzip),
+        media_type=MEDIA_TYPES[file_format],
+        headers=headers
+    )
+
+async def company_bids(company_id: str, projection: Dict[str, int], batch_size: int):
+    """Stream bids on a company's consignments, querying consignment ids in chunks"""
+    consignments_collection = get_consignments_collection()
+    bids_collection = get_bids_collection()
+
+    async def bids_for(consignment_ids: List[str]):
+        cursor = bids_collection.find(
+            {"consignmentId": {"$in": consignment_ids}}, projection
+        ).batch_size(batch_size)
+        async for bid in cursor:
+            yield bid
+
+    consignment_ids = []
+    cursor = consignments_collection.find({"companyId": company_id}, {"_id": 1}).batch_size(BIDS_CONSIGNMENT_CHUNK)
+    async for consignment in cursor:
+        consignment_ids.append(str(consignment["_id"]))
+        if len(consignment_ids) >= BIDS_CONSIGNMENT_CHUNK:
+            async for bid in bids_for(consignment_ids):
+                yield bid
+            consignment_ids = []
+
+    if consignment_ids:
+        async for bid in bids_for(consignment_ids):
+            yield bid
+
+@router.get("/consignments")
+async def export_consignments(
+    file_format: str = Query("ndjson", alias="format", pattern="^(csv|ndjson)$"),
+    fields: Optional[str] = None,
+    batch_size: int = Query(EXPORT_DEFAULT_BATCH, ge=1, le=EXPORT_MAX_BATCH),
+    gzip: bool = False,
+    current_user: dict = Depends(get_current_user)
+):
+    """Stream the current company's consignments as NDJSON or CSV"""
+    if current_user["userType"] != "company":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only companies can export consignments"
+        )
+
+    export_fields = parse_fields(fields, CONSIGNMENT_FIELDS)
+    cursor = get_consignments_collection().find(
+        {"companyId": current_user["id"]}, projection_for(export_fields)
+    ).sort(SORT_ORDER).batch_size(batch_size)
+
+    return export_response(cursor, "consignments", export_fields, file_format, batch_size, gzip)
+
+@router.get("/bids")
+async def export_bids(
+    file_format: str = Query("ndjson", alias="format", pattern="^(csv|ndjson)$"),
+    fields: Optional[str] = None,
+    batch_size: int = Query(EXPORT_DEFAULT_BATCH, ge=1, le=EXPORT_MAX_BATCH),
+    gzip: bool = False,
+    current_user: dict = Depends(get_current_user)
+):
+    """Stream bids (placed by an MSME, or received on a company's consignments)"""
+    export_fields = parse_fields(fields, BID_FIELDS)
+    projection = projection_for(export_fields)
+
+    if current_user["userType"] == "msme":
+        documents = get_bids_collection().find(
+            {"bidderId": current_user["id"]}, projection
+        ).sort(SORT_ORDER).batch_size(batch_size)
+    else:
+        documents = company_bids(current_user["id"], projection, batch_size)
+
+    return export_response(documents, "bids", export_fields, file_format, batch_size, gzip)
+
+@router.get("/jobs")
+async def export_jobs(
+    file_format: str = Query("ndjson", alias="format", pattern="^(csv|ndjson)$"),
+    fields: Optional[str] = None,
+    batch_size: int = Query(EXPORT_DEFAULT_BATCH, ge=1, le=EXPORT_MAX_BATCH),
+    gzip: bool = False,
+    current_user: dict = Depends(get_current_user)
+):
+    """Stream jobs for the current company or transporter"""
+    export_fields = parse_fields(fields, JOB_FIELDS)
+    owner_field = "transporterId" if current_user["userType"] == "msme" else "companyId"
+
+    cursor = get_jobs_collection().find(
+        {owner_field: current_user["id"]}, projection_for(export_fields)
+    ).sort(SORT_ORDER).batch_size(batch_size)
+
+    return export_response(cursor, "jobs", export_fields, file_format, batch_size, gzip)
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Query
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel
 from typing import Optional, List, Dict
@@ -6,8 +6,13 @@ from datetime import datetime
 import uuid
 import os
 from bson import ObjectId
+from pymongo import ReturnDocument
 from db import get_jobs_collection, get_bids_collection, get_consignments_collection, get_users_collection
-from routers.auth import decode_token
+from routers.auth import get_current_user
+from utils.pagination import paginate, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from utils.location_resolver import resolve_canonical
+from utils.backhaul import ACTIVE_JOB_STATUSES, backhaul_query, match_backhauls
+from utils.bidding import job_document
 
 router = APIRouter()
 security = HTTPBearer()
@@ -43,6 +48,8 @@ class JobResponse(BaseModel):
 class JobListResponse(BaseModel):
     success: bool
     jobs: List[JobResponse]
+    next: Optional[str] = None
+    totalEstimate: Optional[int] = None
     message: Optional[str] = None
 
 class JobUpdateResponse(BaseModel):
@@ -50,30 +57,62 @@ class JobUpdateResponse(BaseModel):
     job: JobResponse
     message: str
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Get current user from token"""
-    try:
-        token = credentials.credentials
-        payload = decode_token(token)
-        user_id = payload.get("sub")
-        
-        users_collection = get_users_collection()
-        user = await users_collection.find_one({"_id": ObjectId(user_id)})
-        
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User not found"
-            )
-        
-        user["id"] = str(user["_id"])
-        return user
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials"
-        )
+class BackhaulConsignment(BaseModel):
+    id: str
+    title: str
+    origin: str
+    destination: str
+    goodsType: Optional[str] = None
+    weight: Optional[float] = None
+    deadline: str
+    budget: Optional[float] = None
+    companyName: Optional[str] = None
+    distanceKm: float
+
+class BackhaulSuggestion(BaseModel):
+    jobId: str
+    consignmentTitle: str
+    destination: str
+    deadline: str
+    consignments: List[BackhaulConsignment]
+
+class BackhaulResponse(BaseModel):
+    success: bool
+    suggestions: List[BackhaulSuggestion]
+    message: Optional[str] = None
+
+# Upper bounds for one backhaul batch
+BACKHAUL_MAX_JOBS = 200
+BACKHAUL_MAX_CANDIDATES = 5000
+# Candidates per pickup cell (earliest deadlines first), so a dense cell can't
+# crowd out the others
+BACKHAUL_MAX_PER_CELL = 500
+# Nearest pickup cells searched per batch, and cells per aggregate round trip
+BACKHAUL_MAX_CELLS = 1000
+BACKHAUL_CELL_CHUNK = 250
+
+BACKHAUL_PROJECTION = {
+    "title": 1, "origin": 1, "destination": 1, "goodsType": 1, "weight": 1,
+    "deadline": 1, "budget": 1, "companyName": 1, "originGeo": 1
+}
+
+def backhaul_pipeline(query: dict) -> list:
+    """Aggregate returning at most BACKHAUL_MAX_PER_CELL consignments per originCell, earliest deadline first"""
+    return [
+        {"$match": query},
+        {"$project": dict(BACKHAUL_PROJECTION, originCell=1)},
+        {"$group": {
+            "_id": "$originCell",
+            "consignments": {"$topN": {
+                "n": BACKHAUL_MAX_PER_CELL,
+                "sortBy": {"deadline": 1, "_id": 1},
+                "output": "$$ROOT"
+            }}
+        }},
+        {"$unwind": "$consignments"},
+        {"$replaceWith": "$consignments"},
+        {"$unset": "originCell"}
+    ]
 
 @router.get("/awarded", response_model=JobListResponse)
 async def get_awarded_jobs(current_user: dict = Depends(get_current_user)):
@@ -101,42 +140,19 @@ async def get_awarded_jobs(current_user: dict = Depends(get_current_user)):
         if not consignment:
             continue
         
-        # Check if job already exists
-        existing_job = await jobs_collection.find_one({
-            "consignmentId": bid["consignmentId"],
-            "transporterId": current_user["id"]
-        })
-        
-        if existing_job:
-            job_data = {k: v for k, v in existing_job.items() if k != "_id"}
-            job_data["id"] = str(existing_job["_id"])
-            user_jobs.append(JobResponse(**job_data))
-        else:
-            # Create new job
-            job = {
-                "consignmentId": bid["consignmentId"],
-                "consignmentTitle": consignment["title"],
-                "companyId": consignment["companyId"],
-                "companyName": consignment["companyName"],
-                "transporterId": current_user["id"],
-                "transporterName": current_user["name"],
-                "origin": consignment["origin"],
-                "destination": consignment["destination"],
-                "amount": bid["bidAmount"],
-                "deadline": consignment["deadline"],
-                "status": "awarded" if consignment["status"] == "awarded" else consignment["status"],
-                "awardedDate": bid.get("awardedAt", datetime.now().isoformat()),
-                "completedDate": None,
-                "invoiceUploaded": False,
-                "invoiceData": None,
-                "invoiceUploadedAt": None,
-                "createdAt": datetime.now().isoformat(),
-                "updatedAt": None
-            }
-            
-            result = await jobs_collection.insert_one(job)
-            job["id"] = str(result.inserted_id)
-            user_jobs.append(JobResponse(**job))
+        # Upserted on the unique (consignmentId, transporterId) index, like apply_award,
+        # so a concurrent award or a second request can't insert a duplicate job
+        new_job = job_document(consignment, bid, bid.get("awardedAt") or datetime.now().isoformat())
+        new_job["status"] = "awarded" if consignment["status"] == "awarded" else consignment["status"]
+        job = await jobs_collection.find_one_and_update(
+            {"consignmentId": bid["consignmentId"], "transporterId": current_user["id"]},
+            {"$setOnInsert": new_job},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        job_data = {k: v for k, v in job.items() if k != "_id"}
+        job_data["id"] = str(job["_id"])
+        user_jobs.append(JobResponse(**job_data))
     
     return JobListResponse(
         success=True,
@@ -144,7 +160,11 @@ async def get_awarded_jobs(current_user: dict = Depends(get_current_user)):
     )
 
 @router.get("/company", response_model=JobListResponse)
-async def get_company_jobs(current_user: dict = Depends(get_current_user)):
+async def get_company_jobs(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
     """Get jobs for companies"""
     if current_user["userType"] != "company":
         raise HTTPException(
@@ -154,9 +174,13 @@ async def get_company_jobs(current_user: dict = Depends(get_current_user)):
     
     jobs_collection = get_jobs_collection()
     
-    # Get all jobs for consignments created by this company
-    cursor = jobs_collection.find({"companyId": current_user["id"]})
-    jobs = await cursor.to_list(length=None)
+    # Get one page of jobs for consignments created by this company
+    jobs, next_cursor, total_estimate = await paginate(
+        jobs_collection,
+        {"companyId": current_user["id"]},
+        limit=limit,
+        cursor=cursor
+    )
     
     # Convert MongoDB documents to response format
     company_jobs = []
@@ -167,7 +191,92 @@ async def get_company_jobs(current_user: dict = Depends(get_current_user)):
     
     return JobListResponse(
         success=True,
-        jobs=company_jobs
+        jobs=company_jobs,
+        next=next_cursor,
+        totalEstimate=total_estimate
+    )
+
+@router.get("/backhaul", response_model=BackhaulResponse)
+async def get_backhaul_suggestions(
+    radius_km: float = Query(100, gt=0, le=500),
+    limit: int = Query(5, ge=1, le=20),
+    current_user: dict = Depends(get_current_user)
+):
+    """Open consignments to pick up near each active job's destination (return loads)"""
+    if current_user["userType"] != "msme":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only MSMEs can view backhaul suggestions"
+        )
+    
+    jobs_collection = get_jobs_collection()
+    consignments_collection = get_consignments_collection()
+    
+    cursor = jobs_collection.find(
+        {"transporterId": current_user["id"], "status": {"$in": ACTIVE_JOB_STATUSES}},
+        {"consignmentTitle": 1, "destination": 1, "deadline": 1}
+    ).limit(BACKHAUL_MAX_JOBS)
+    active_jobs = await cursor.to_list(length=None)
+    
+    # Return legs start at each job's destination once that job is due
+    legs = []
+    for job in active_jobs:
+        place = resolve_canonical(job.get("destination") or "")
+        if place and job.get("deadline"):
+            legs.append({
+                "job": job,
+                "latitude": place["latitude"],
+                "longitude": place["longitude"],
+                "deadline": job["deadline"]
+            })
+    
+    if not legs:
+        return BackhaulResponse(
+            success=True,
+            suggestions=[],
+            message="No active jobs with a recognised destination"
+        )
+    
+    # One aggregate per chunk of the nearest cells, capped per cell, until the
+    # candidate budget is used up
+    query = backhaul_query(legs, radius_km)
+    cells = query.pop("originCell")["$in"][:BACKHAUL_MAX_CELLS]
+    candidates = []
+    for start in range(0, len(cells), BACKHAUL_CELL_CHUNK):
+        if len(candidates) >= BACKHAUL_MAX_CANDIDATES:
+            break
+        chunk = dict(query, originCell={"$in": cells[start:start + BACKHAUL_CELL_CHUNK]})
+        candidates.extend(await consignments_collection.aggregate(
+            backhaul_pipeline(chunk)
+        ).to_list(length=None))
+    candidates = [
+        consignment for consignment in candidates
+        if consignment.get("originGeo") and consignment.get("deadline")
+    ]
+    
+    matches = match_backhauls(legs, candidates, radius_km, limit)
+    
+    suggestions = []
+    for leg, leg_matches in zip(legs, matches):
+        job = leg["job"]
+        suggestions.append(BackhaulSuggestion(
+            jobId=str(job["_id"]),
+            consignmentTitle=job.get("consignmentTitle", ""),
+            destination=job["destination"],
+            deadline=job["deadline"],
+            consignments=[
+                BackhaulConsignment(
+                    **{k: v for k, v in consignment.items() if k not in ["_id", "originGeo"]},
+                    id=str(consignment["_id"]),
+                    distanceKm=distance
+                )
+                for consignment, distance in leg_matches
+            ]
+        ))
+    
+    return BackhaulResponse(
+        success=True,
+        suggestions=suggestions
     )
 
 @router.put("/{job_id}/status", response_model=JobUpdateResponse)
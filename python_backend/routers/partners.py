@@ -0,0 +1,95 @@
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from pydantic import BaseModel
+from typing import Optional, List
+from bson import ObjectId
+from db import get_consignments_collection
+from routers.auth import get_current_user
+from utils.location_matcher import find_matching_msmes, get_location_recommendations
+from utils.spatial_index import msme_index
+
+router = APIRouter()
+
+# Pydantic models
+class PartnerResponse(BaseModel):
+    id: str
+    name: Optional[str] = None
+    companyName: Optional[str] = None
+    location: Optional[str] = None
+    fleetSize: Optional[int] = None
+    vehicleTypes: Optional[list] = None
+    distanceKm: float
+
+class PartnerListResponse(BaseModel):
+    success: bool
+    partners: List[PartnerResponse]
+    message: Optional[str] = None
+
+@router.get("/nearby", response_model=PartnerListResponse)
+async def get_nearby_partners(
+    radius_km: float = Query(100, gt=0, le=1000),
+    limit: int = Query(5, ge=1, le=50),
+    current_user: dict = Depends(get_current_user)
+):
+    """Nearest other MSMEs to the current MSME's home base (potential partners)"""
+    if current_user["userType"] != "msme":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only MSMEs can look up nearby partners"
+        )
+
+    if current_user["id"] not in msme_index:
+        return PartnerListResponse(
+            success=True,
+            partners=[],
+            message="Set a recognised location on your profile to find nearby partners"
+        )
+
+    recommendations = get_location_recommendations(
+        current_user["id"], max_distance=radius_km, limit=limit
+    )
+
+    return PartnerListResponse(
+        success=True,
+        partners=[PartnerResponse(**partner) for partner in recommendations["nearbyMSMEs"]]
+    )
+
+@router.get("/consignments/{consignment_id}", response_model=PartnerListResponse)
+async def get_matching_transporters(
+    consignment_id: str,
+    radius_km: float = Query(50, gt=0, le=1000),
+    limit: int = Query(50, ge=1, le=500),
+    current_user: dict = Depends(get_current_user)
+):
+    """MSMEs based near a consignment's origin, nearest first (owner only)"""
+    consignments_collection = get_consignments_collection()
+
+    # A malformed id can't match anything; answer 404 rather than raising InvalidId
+    consignment = await consignments_collection.find_one(
+        {"_id": ObjectId(consignment_id)},
+        {"companyId": 1, "origin": 1, "originGeo": 1}
+    ) if ObjectId.is_valid(consignment_id) else None
+
+    if not consignment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Consignment not found"
+        )
+
+    if consignment["companyId"] != current_user["id"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
+        )
+
+    # Prefer the coordinates stored at write time over re-resolving the origin
+    origin = consignment.get("origin") or ""
+    if consignment.get("originGeo"):
+        longitude, latitude = consignment["originGeo"]["coordinates"][:2]
+        origin = {"coordinates": {"latitude": latitude, "longitude": longitude}}
+
+    matches = find_matching_msmes(origin, max_distance=radius_km, limit=limit)
+
+    return PartnerListResponse(
+        success=True,
+        partners=[PartnerResponse(**partner) for partner in matches]
+    )
@@ -5,8 +5,9 @@ from typing import Optional, Dict, Any
 from datetime import datetime
 import json
 import os
-from db import get_users_db, get_jobs_db, get_bids_db, get_consignments_db
-from routers.auth import decode_token
+from bson import ObjectId
+from db import get_users_db, get_jobs_db, get_bids_db, get_consignments_db, get_users_collection, get_jobs_collection
+from routers.auth import get_current_user, invalidate_user
 
 router = APIRouter()
 security = HTTPBearer()
@@ -30,30 +31,6 @@ class LinkAccountRequest(BaseModel):
     telegramUserId: str
     telegramUsername: Optional[str] = None
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Get current user from token"""
-    try:
-        token = credentials.credentials
-        payload = decode_token(token)
-        user_id = payload.get("sub")
-        
-        users_db = get_users_db()
-        if user_id not in users_db:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User not found"
-            )
-        
-        user = users_db[user_id]
-        user["id"] = user_id
-        return user
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials"
-        )
-
 @router.post("/webhook")
 async def handle_telegram_webhook(request: Request):
     """Handle Telegram webhook"""
@@ -164,16 +141,20 @@ Need help? Contact support.
     """
     print(f"[TelegramBot] Sending help message to {chat_id}: {message}")
 
+async def find_user_by_telegram_id(telegram_user_id: Any) -> Optional[Dict[str, Any]]:
+    """Find the user linked to a Telegram account (indexed on telegramUserId)"""
+    if telegram_user_id is None:
+        return None
+    users_collection = get_users_collection()
+    user_record = await users_collection.find_one({"telegramUserId": str(telegram_user_id)}, {"password": 0})
+    if user_record:
+        user_record["id"] = str(user_record["_id"])
+    return user_record
+
 async def send_status_message(chat_id: int, user: Dict[str, Any]):
     """Send status message to user"""
     # Find user in database by Telegram ID
-    users_db = get_users_db()
-    user_record = None
-    
-    for user_id, user_data in users_db.items():
-        if user_data.get("telegramUserId") == str(user.get("id")):
-            user_record = user_data
-            break
+    user_record = await find_user_by_telegram_id(user.get("id"))
     
     if user_record:
         message = f"""
@@ -192,34 +173,26 @@ Location: {user_record.get('location', 'N/A')}
 async def send_jobs_message(chat_id: int, user: Dict[str, Any]):
     """Send jobs message to user"""
     # Find user in database
-    users_db = get_users_db()
-    user_record = None
-    
-    for user_id, user_data in users_db.items():
-        if user_data.get("telegramUserId") == str(user.get("id")):
-            user_record = user_data
-            break
+    user_record = await find_user_by_telegram_id(user.get("id"))
     
     if not user_record:
         message = "❌ Account not linked. Please link your account first."
     else:
-        jobs_db = get_jobs_db()
+        jobs_collection = get_jobs_collection()
         
         if user_record["userType"] == "msme":
             # Get MSME jobs
-            user_jobs = [
-                job for job in jobs_db.values()
-                if job["transporterId"] == user_record["id"]
-            ]
+            job_filter = {"transporterId": user_record["id"]}
         else:
             # Get company jobs
-            user_jobs = [
-                job for job in jobs_db.values()
-                if job["companyId"] == user_record["id"]
-            ]
+            job_filter = {"companyId": user_record["id"]}
+        
+        job_count = await jobs_collection.count_documents(job_filter)
+        cursor = jobs_collection.find(job_filter).sort([("createdAt", -1), ("_id", -1)]).limit(5)
+        user_jobs = await cursor.to_list(length=5)
         
         if user_jobs:
-            message = f"📋 You have {len(user_jobs)} active job(s):\n\n"
+            message = f"📋 You have {job_count} active job(s):\n\n"
             for i, job in enumerate(user_jobs[:5], 1):  # Show first 5 jobs
                 message += f"{i}. {job['consignmentTitle']} - {job['status']}\n"
         else:
@@ -367,29 +340,40 @@ async def link_telegram_account(
 ):
     """Link Telegram account to user"""
     try:
-        users_db = get_users_db()
+        users_collection = get_users_collection()
         
         # Update user with Telegram information
-        if current_user["id"] in users_db:
-            users_db[current_user["id"]]["telegramUserId"] = link_request.telegramUserId
-            users_db[current_user["id"]]["telegramUsername"] = link_request.telegramUsername
-            users_db[current_user["id"]]["telegramLinkedAt"] = datetime.now().isoformat()
-            
-            print(f"[LinkAccount] Linked Telegram account {link_request.telegramUserId} to user {current_user['id']}")
-            
-            return {
-                "success": True,
-                "message": "Telegram account linked successfully"
+        result = await users_collection.update_one(
+            {"_id": ObjectId(current_user["id"])},
+            {
+                "$set": {
+                    "telegramUserId": link_request.telegramUserId,
+                    "telegramUsername": link_request.telegramUsername,
+                    "telegramLinkedAt": datetime.now().isoformat()
+                }
             }
-        else:
+        )
+        if result.matched_count == 0:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
         
+        # Cached principal no longer reflects the stored document
+        invalidate_user(current_user["id"])
+        
+        print(f"[LinkAccount] Linked Telegram account {link_request.telegramUserId} to user {current_user['id']}")
+        
+        return {
+            "success": True,
+            "message": "Telegram account linked successfully"
+        }
+        
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"[LinkAccount] Error: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error linking Telegram account"
-        ) 
\ No newline at end of file
+        )
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Build a gazetteer TSV from public Indian place datasets
+
+Sources (either or both):
+  --geonames IN.txt --admin1 admin1CodesASCII.txt
+        GeoNames country dump for India (populated places, feature class P)
+  --pincodes pincode_directory.csv
+        India Post "All India Pincode Directory" CSV (office/locality rows
+        with District, StateName, Latitude, Longitude)
+
+The output has the same columns as data/gazetteer_in.tsv and can be used
+via GAZETTEER_PATH. Bundled entries are kept and win over generated ones
+with the same name and state, so curated aliases survive rebuilds.
+
+Usage (from python_backend/):
+    python scripts/build_gazetteer.py --geonames IN.txt --admin1 admin1CodesASCII.txt \
+        --pincodes pincodes.csv --output data/gazetteer_full.tsv
+"""
+
+import argparse
+import csv
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.gazetteer import BUNDLED_GAZETTEER_PATH, load_places
+
+GEONAMES_KINDS = {
+    "PPLC": "city", "PPLA": "city", "PPLA2": "city", "PPLA3": "town",
+    "PPLA4": "town", "PPL": "town", "PPLX": "locality", "PPLL": "locality"
+}
+
+
+def read_admin1(path):
+    states = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            code, name = line.rstrip("\n").split("\t")[:2]
+            if code.startswith("IN."):
+                states[code.split(".", 1)[1]] = name
+    return states
+
+
+def read_geonames(path, states, min_population):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            columns = line.rstrip("\n").split("\t")
+            if len(columns) < 15 or columns[6] != "P" or columns[7] not in GEONAMES_KINDS:
+                continue
+            population = int(columns[14] or 0)
+            if population < min_population:
+                continue
+            aliases = [alias for alias in columns[3].split(",") if alias.isascii() and alias != columns[1]][:5]
+            yield {
+                "name": columns[1],
+                "state": states.get(columns[10], ""),
+                "district": "",
+                "kind": GEONAMES_KINDS[columns[7]],
+                "lat": columns[4],
+                "lon": columns[5],
+                "population_k": round(population / 1000, 1),
+                "aliases": aliases
+            }
+
+
+def read_pincodes(path):
+    seen = set()
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for row in csv.DictReader(f):
+            row = {key.strip().lower(): (value or "").strip() for key, value in row.items() if key}
+            name = row.get("officename", "").replace(" B.O", "").replace(" S.O", "").replace(" H.O", "").strip()
+            state = row.get("statename", "").title()
+            lat, lon = row.get("latitude", ""), row.get("longitude", "")
+            try:
+                float(lat), float(lon)
+            except ValueError:
+                continue
+            key = (name.lower(), state.lower())
+            if not name or key in seen:
+                continue
+            seen.add(key)
+            yield {
+                "name": name,
+                "state": state,
+                "district": row.get("district", row.get("districtname", "")).title(),
+                "kind": "locality",
+                "lat": lat,
+                "lon": lon,
+                "population_k": 0,
+                "aliases": [row["pincode"]] if row.get("pincode") else []
+            }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a gazetteer TSV")
+    parser.add_argument("--geonames", help="GeoNames IN.txt")
+    parser.add_argument("--admin1", help="GeoNames admin1CodesASCII.txt")
+    parser.add_argument("--pincodes", help="India Post pincode directory CSV")
+    parser.add_argument("--min-population", type=int, default=1000)
+    parser.add_argument("--output", required=True)
+    args = parser.parse_args()
+
+    rows = {}
+    for place in load_places(BUNDLED_GAZETTEER_PATH):
+        rows[(place.name.lower(), place.state.lower())] = {
+            "name": place.name, "state": place.state, "district": place.district,
+            "kind": place.kind, "lat": place.latitude, "lon": place.longitude,
+            "population_k": place.population / 1000, "aliases": list(place.aliases)
+        }
+
+    sources = []
+    if args.geonames:
+        if not args.admin1:
+            parser.error("--geonames needs --admin1 for state names")
+        sources.append(read_geonames(args.geonames, read_admin1(args.admin1), args.min_population))
+    if args.pincodes:
+        sources.append(read_pincodes(args.pincodes))
+
+    for source in sources:
+        for row in source:
+            rows.setdefault((row["name"].lower(), row["state"].lower()), row)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        f.write("# name\tstate\tdistrict\tkind\tlat\tlon\tpopulation_k\taliases\n")
+        for row in rows.values():
+            f.write("\t".join([
+                row["name"], row["state"], row["district"], row["kind"],
+                str(row["lat"]), str(row["lon"]), str(row["population_k"]),
+                "|".join(row["aliases"])
+            ]) + "\n")
+
+    print(f"✅ Wrote {len(rows)} places to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Compile the gazetteer's binary lookup file and city distance matrix
+
+The server compiles both on first use, next to the TSV or in
+GAZETTEER_CACHE_DIR. Run this as a build step instead when the deployed
+tree is read-only, so workers only ever map the prebuilt files.
+
+Usage (from python_backend/):
+    python scripts/compile_gazetteer.py [--source data/gazetteer_full.tsv]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.gazetteer import GAZETTEER_PATH
+from utils.location_resolver import ensure_compiled
+from utils.distances import ensure_city_matrix
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile the gazetteer")
+    parser.add_argument("--source", default=GAZETTEER_PATH, help="Gazetteer TSV (default: GAZETTEER_PATH)")
+    args = parser.parse_args()
+
+    print(f"Binary gazetteer: {ensure_compiled(args.source)}")
+    matrix_path = ensure_city_matrix(args.source)
+    print(f"Distance matrix: {matrix_path or 'skipped (gazetteer too large)'}")
+
+
+if __name__ == "__main__":
+    main()
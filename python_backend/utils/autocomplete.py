@@ -0,0 +1,108 @@
+from bisect import bisect_left
+from functools import lru_cache
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+from utils.gazetteer import Place, get_places, name_key
+
+# Match kinds, best first
+EXACT = 0
+NAME_PREFIX = 1
+ALIAS_PREFIX = 2
+WORD_PREFIX = 3
+
+# Queries are normalized exactly like gazetteer names
+normalize_query = name_key
+
+
+class LocationAutocomplete:
+    """
+    Prefix/infix autocomplete over the gazetteer using a sorted key array.
+
+    Every place contributes its name, its aliases and each word suffix of
+    those ("navi mumbai" also indexes "mumbai"), so a bisect finds prefix and
+    word-level infix matches in O(log n + matches). Results are ranked by
+    match kind, then population, and memoized per query.
+    """
+
+    def __init__(self, places: List[Place]):
+        self.places = places
+        entries: List[Tuple[str, int, int]] = []
+        for place_id, place in enumerate(places):
+            labels = [(place.name, NAME_PREFIX)] + [(alias, ALIAS_PREFIX) for alias in place.aliases]
+            for label, kind in labels:
+                key = normalize_query(label)
+                if not key:
+                    continue
+                entries.append((key, place_id, kind))
+                for position, char in enumerate(key):
+                    if char == " ":
+                        entries.append((key[position + 1:], place_id, WORD_PREFIX))
+        entries.sort()
+        self._keys = [entry[0] for entry in entries]
+        self._place_ids = [entry[1] for entry in entries]
+        self._kinds = [entry[2] for entry in entries]
+        self.search = lru_cache(maxsize=4096)(self._search)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _search(self, query: str, limit: int = 5, state: Optional[str] = None) -> Tuple[Tuple[Place, int], ...]:
+        """
+        Find places matching a query (memoized through ``search``)
+        Args:
+            query: Normalized query (see normalize_query)
+            limit: Maximum number of results
+            state: Optional normalized state prefix filter
+        Returns:
+            Tuple of (place, match kind) ordered best first
+        """
+        if not query:
+            return ()
+
+        best: Dict[int, int] = {}
+        index = bisect_left(self._keys, query)
+        keys = self._keys
+        while index < len(keys) and keys[index].startswith(query):
+            place_id = self._place_ids[index]
+            kind = EXACT if keys[index] == query and self._kinds[index] != WORD_PREFIX else self._kinds[index]
+            if kind < best.get(place_id, WORD_PREFIX + 1):
+                best[place_id] = kind
+            index += 1
+
+        if state:
+            best = {
+                place_id: kind for place_id, kind in best.items()
+                if normalize_query(self.places[place_id].state).startswith(state)
+            }
+
+        ranked = sorted(
+            best.items(),
+            key=lambda item: (item[1], -self.places[item[0]].population, len(self.places[item[0]].name))
+        )
+        return tuple((self.places[place_id], kind) for place_id, kind in ranked[:limit])
+
+    def suggest(self, text: str, limit: int = 5) -> List[Tuple[Place, int]]:
+        """
+        Autocomplete free text such as "mum" or "pune, maha"
+        Args:
+            text: Raw user input
+            limit: Maximum number of results
+        Returns:
+            List of (place, match kind) ordered best first
+        """
+        city, _, state = text.partition(",")
+        return list(self.search(normalize_query(city), limit, normalize_query(state) or None))
+
+
+_autocomplete: Optional[LocationAutocomplete] = None
+_autocomplete_lock = Lock()
+
+
+def get_autocomplete() -> LocationAutocomplete:
+    """Get the shared autocomplete index, building it on first use"""
+    global _autocomplete
+    if _autocomplete is None:
+        with _autocomplete_lock:
+            if _autocomplete is None:
+                _autocomplete = LocationAutocomplete(get_places())
+    return _autocomplete
@@ -0,0 +1,105 @@
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from utils.distances import distance_matrix
+from utils.spatial_index import cells_within, grid_cell
+
+# Origin cells stored on consignments (~55 km of latitude); coarse cells keep
+# the $in list short when a batch covers many jobs
+BACKHAUL_CELL_DEGREES = 0.5
+
+# Job statuses whose return leg is still ahead
+ACTIVE_JOB_STATUSES = ["awarded", "in_progress"]
+
+
+def origin_cell_key(latitude: float, longitude: float) -> str:
+    """Stored originCell key for a consignment origin ("row:column")"""
+    row, column = grid_cell(latitude, longitude, BACKHAUL_CELL_DEGREES)
+    return f"{row}:{column}"
+
+
+def origin_cell(geo: Optional[Dict[str, Any]]) -> Optional[str]:
+    """originCell for a GeoJSON point (None when the origin is unresolved)"""
+    if not geo:
+        return None
+    longitude, latitude = geo["coordinates"][:2]
+    return origin_cell_key(latitude, longitude)
+
+
+def origin_cells_near(latitude: float, longitude: float, radius_km: float) -> List[str]:
+    """originCell keys that may hold pickups within a radius of a point"""
+    return [
+        f"{row}:{column}"
+        for row, column in cells_within(latitude, longitude, radius_km, BACKHAUL_CELL_DEGREES)
+    ]
+
+
+def backhaul_query(legs: List[Dict[str, Any]], radius_km: float) -> Optional[Dict[str, Any]]:
+    """
+    One query covering the return legs of every job in a batch
+    Args:
+        legs: Return legs with latitude, longitude and deadline
+        radius_km: Pickup radius around each job's destination
+    Returns:
+        Filter on (status, originCell, deadline), or None if no leg can match.
+        The originCell $in list is ordered nearest cell first, so callers
+        that cap candidates per cell can stop before the far ones.
+    """
+    if not legs:
+        return None
+    cells = set()
+    for leg in legs:
+        cells.update(cells_within(leg["latitude"], leg["longitude"], radius_km, BACKHAUL_CELL_DEGREES))
+    cells = sorted(cells)
+    # Distance from each cell's centre to the closest leg
+    distances = distance_matrix(
+        [(row + 0.5) * BACKHAUL_CELL_DEGREES for row, _ in cells],
+        [(column + 0.5) * BACKHAUL_CELL_DEGREES for _, column in cells],
+        [leg["latitude"] for leg in legs],
+        [leg["longitude"] for leg in legs]
+    ).min(axis=1)
+    order = np.argsort(distances, kind="stable")
+    return {
+        "status": "open",
+        "originCell": {"$in": [f"{cells[i][0]}:{cells[i][1]}" for i in order]},
+        "deadline": {"$gt": min(leg["deadline"] for leg in legs)}
+    }
+
+
+def match_backhauls(
+    legs: List[Dict[str, Any]],
+    consignments: List[Dict[str, Any]],
+    radius_km: float,
+    limit: int
+) -> List[List[Tuple[Dict[str, Any], float]]]:
+    """
+    Assign candidate consignments to each return leg
+    Args:
+        legs: Return legs with latitude, longitude and deadline
+        consignments: Open consignments with originGeo and deadline
+        radius_km: Maximum distance from a leg's destination to the pickup
+        limit: Suggestions per leg
+    Returns:
+        Per leg (same order), a list of (consignment, distance km) nearest first,
+        keeping only consignments due after the leg's deadline
+    """
+    if not legs or not consignments:
+        return [[] for _ in legs]
+
+    distances = distance_matrix(
+        [leg["latitude"] for leg in legs],
+        [leg["longitude"] for leg in legs],
+        [consignment["originGeo"]["coordinates"][1] for consignment in consignments],
+        [consignment["originGeo"]["coordinates"][0] for consignment in consignments]
+    )
+    leg_deadlines = np.array([leg["deadline"] for leg in legs], dtype=str)[:, None]
+    consignment_deadlines = np.array([consignment["deadline"] for consignment in consignments], dtype=str)[None, :]
+    distances[(distances > radius_km) | (consignment_deadlines <= leg_deadlines)] = np.inf
+
+    suggestions = []
+    for row in distances:
+        nearest = np.argsort(row, kind="stable")[:limit]
+        suggestions.append([
+            (consignments[index], round(float(row[index]), 1))
+            for index in nearest if np.isfinite(row[index])
+        ])
+    return suggestions
@@ -0,0 +1,212 @@
+import math
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from bson import ObjectId
+from pymongo import UpdateOne
+
+# Bids counted in a consignment's bidStats (withdrawn and rejected bids drop out)
+LIVE_BID_STATUSES = ["pending", "awarded"]
+
+# Consignments verified per aggregation
+VERIFY_BATCH_SIZE = 500
+
+# Consignments written more recently than this may have a bid between its
+# counter update and its insert, so the verifier leaves them for the next pass
+VERIFY_SETTLE_SECONDS = 60
+
+
+def bid_hour(created_at: str) -> str:
+    """Hour bucket of a bid's createdAt ("2026-05-01T14")"""
+    return created_at[:13]
+
+
+def empty_bid_stats() -> Dict[str, Any]:
+    # lowestBid/earliestDelivery are left out rather than null: $min treats null as
+    # smaller than any number or string, so a null would never be replaced
+    return {"count": 0, "amountSum": 0, "hourly": {}}
+
+
+def bid_stats_update(bid: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Atomic operators folding one new bid into a consignment's bidStats
+    Args:
+        bid: Bid with bidAmount, estimatedDelivery and createdAt
+    Returns:
+        {"$inc": ..., "$min": ...} to merge into the consignment update
+    """
+    return {
+        "$inc": {
+            "bidStats.count": 1,
+            "bidStats.amountSum": bid["bidAmount"],
+            f"bidStats.hourly.{bid_hour(bid['createdAt'])}": 1,
+        },
+        "$min": {
+            "bidStats.lowestBid": bid["bidAmount"],
+            "bidStats.earliestDelivery": bid["estimatedDelivery"],
+        },
+    }
+
+
+def single_bid_stats(bid: Dict[str, Any]) -> Dict[str, Any]:
+    """bidStats when one bid is the only live bid (e.g. after it is awarded)"""
+    return {
+        "count": 1,
+        "amountSum": bid["bidAmount"],
+        "lowestBid": bid["bidAmount"],
+        "earliestDelivery": bid["estimatedDelivery"],
+        "hourly": {bid_hour(bid["createdAt"]): 1},
+    }
+
+
+def bid_stats_pipeline(consignment_ids: List[str]) -> List[Dict[str, Any]]:
+    """
+    Aggregation computing bidStats from scratch for a batch of consignments
+    Args:
+        consignment_ids: Consignment ids as stored on bids
+    Returns:
+        Pipeline yielding one document per consignment with live bids
+    """
+    return [
+        {"$match": {"consignmentId": {"$in": consignment_ids}, "status": {"$in": LIVE_BID_STATUSES}}},
+        {"$group": {
+            "_id": {"consignmentId": "$consignmentId", "hour": {"$substrCP": [{"$ifNull": ["$createdAt", "unknown"]}, 0, 13]}},
+            "count": {"$sum": 1},
+            "amountSum": {"$sum": "$bidAmount"},
+            "lowestBid": {"$min": "$bidAmount"},
+            "earliestDelivery": {"$min": "$estimatedDelivery"},
+        }},
+        {"$group": {
+            "_id": "$_id.consignmentId",
+            "count": {"$sum": "$count"},
+            "amountSum": {"$sum": "$amountSum"},
+            "lowestBid": {"$min": "$lowestBid"},
+            "earliestDelivery": {"$min": "$earliestDelivery"},
+            "hourly": {"$push": {"k": "$_id.hour", "v": "$count"}},
+        }},
+        {"$project": {
+            "count": 1, "amountSum": 1, "lowestBid": 1, "earliestDelivery": 1,
+            "hourly": {"$arrayToObject": "$hourly"},
+        }},
+    ]
+
+
+async def compute_bid_stats(bids_collection, consignment_ids: List[str], session: Optional[Any] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    bidStats for each consignment, computed from its bids
+    Args:
+        bids_collection: Bids collection
+        consignment_ids: Consignment ids as stored on bids
+        session: Optional session
+    Returns:
+        Consignment id -> bidStats (empty stats for consignments without live bids)
+    """
+    stats = {consignment_id: empty_bid_stats() for consignment_id in consignment_ids}
+    cursor = bids_collection.aggregate(bid_stats_pipeline(consignment_ids), session=session)
+    async for row in cursor:
+        stats[row.pop("_id")] = row
+    return stats
+
+
+def bid_stats_match(stored: Optional[Dict[str, Any]], expected: Dict[str, Any]) -> bool:
+    """Compare stored and recomputed bidStats (sums compared with a float tolerance)"""
+    stored = stored or empty_bid_stats()
+    if (stored.get("count", 0) != expected["count"] or
+            stored.get("lowestBid") != expected.get("lowestBid") or
+            stored.get("earliestDelivery") != expected.get("earliestDelivery")):
+        return False
+    if not math.isclose(stored.get("amountSum", 0), expected["amountSum"], rel_tol=1e-9, abs_tol=1e-6):
+        return False
+    hourly = {hour: count for hour, count in (stored.get("hourly") or {}).items() if count}
+    return hourly == expected["hourly"]
+
+
+async def recompute_bid_stats(
+    consignments_collection,
+    bids_collection,
+    consignment_ids: List[str],
+    session: Optional[Any] = None
+) -> None:
+    """
+    Overwrite bidStats from a full aggregation (after a bid leaves the live set)
+    Args:
+        consignments_collection: Consignments collection
+        bids_collection: Bids collection
+        consignment_ids: Consignments to recompute
+        session: Optional session
+    """
+    if not consignment_ids:
+        return
+    stats = await compute_bid_stats(bids_collection, consignment_ids, session=session)
+    await consignments_collection.bulk_write([
+        UpdateOne({"_id": ObjectId(consignment_id)}, {"$set": {"bidStats": consignment_stats}})
+        for consignment_id, consignment_stats in stats.items()
+    ], ordered=False, session=session)
+
+
+async def verify_bid_stats(
+    consignments_collection,
+    bids_collection,
+    open_only: bool = True,
+    repair: bool = True,
+    batch_size: int = VERIFY_BATCH_SIZE
+) -> Tuple[int, int]:
+    """
+    Compare consignments' bidStats with a full aggregation of their bids
+    Args:
+        consignments_collection: Consignments collection
+        bids_collection: Bids collection
+        open_only: Only check open consignments (the only ones still taking bids);
+            False checks every consignment, e.g. for a backfill
+        repair: Overwrite drifted stats with the recomputed ones
+        batch_size: Consignments per aggregation
+    Returns:
+        (consignments checked, consignments that had drifted)
+    """
+    checked = drifted = 0
+    settled = (datetime.now() - timedelta(seconds=VERIFY_SETTLE_SECONDS)).isoformat()
+    query: Dict[str, Any] = {"status": "open"} if open_only else {}
+    cursor = consignments_collection.find(query, {"bidStats": 1, "updatedAt": 1}).batch_size(batch_size)
+
+    batch: List[Dict[str, Any]] = []
+
+    async def check(batch: List[Dict[str, Any]]) -> int:
+        expected = await compute_bid_stats(bids_collection, [str(c["_id"]) for c in batch])
+        repairs = [
+            UpdateOne({"_id": c["_id"], "bidStats": c.get("bidStats")}, {"$set": {"bidStats": expected[str(c["_id"])]}})
+            for c in batch if not bid_stats_match(c.get("bidStats"), expected[str(c["_id"])])
+        ]
+        if repairs and repair:
+            # Guarded on the stats we read, so a bid placed meanwhile isn't overwritten
+            await consignments_collection.bulk_write(repairs, ordered=False)
+        return len(repairs)
+
+    async for consignment in cursor:
+        if (consignment.get("updatedAt") or "") > settled:
+            continue
+        batch.append(consignment)
+        if len(batch) >= batch_size:
+            checked += len(batch)
+            drifted += await check(batch)
+            batch = []
+    if batch:
+        checked += len(batch)
+        drifted += await check(batch)
+    return checked, drifted
+
+
+def bid_stats_summary(stats: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Public auction stats from a stored bidStats
+    Returns:
+        count, lowestBid, averageBid, earliestDelivery and bidsPerHour, or None
+    """
+    if not stats:
+        return None
+    count = stats.get("count", 0)
+    return {
+        "count": count,
+        "lowestBid": stats.get("lowestBid"),
+        "averageBid": round(stats.get("amountSum", 0) / count, 2) if count else None,
+        "earliestDelivery": stats.get("earliestDelivery"),
+        "bidsPerHour": {hour: n for hour, n in sorted((stats.get("hourly") or {}).items()) if n},
+    }
@@ -0,0 +1,243 @@
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+from bson import ObjectId
+from fastapi import HTTPException, status
+from pymongo import ReturnDocument, UpdateMany, UpdateOne
+from pymongo.errors import DuplicateKeyError
+from utils.bid_stats import LIVE_BID_STATUSES, bid_stats_update, recompute_bid_stats, single_bid_stats
+
+# Bid list orders for GET /bids/consignment/{id}, each backed by a
+# (consignmentId, key, _id) index so a page is one index range scan
+BID_SORTS = {
+    "amount": [("bidAmount", 1), ("_id", 1)],
+    "-amount": [("bidAmount", -1), ("_id", -1)],
+    "delivery": [("estimatedDelivery", 1), ("_id", 1)],
+    "-delivery": [("estimatedDelivery", -1), ("_id", -1)],
+}
+
+BID_SORT_PATTERN = "^(" + "|".join(BID_SORTS) + ")$"
+
+# Consignment fields a bid needs (validation, the denormalized title and the bid.placed event)
+BID_CONSIGNMENT_PROJECTION = {"title": 1, "companyId": 1, "status": 1, "budget": 1, "deadline": 1, "bidCount": 1}
+
+
+def parse_timestamp(value: str) -> datetime:
+    """Parse an ISO date or datetime ("Z" suffix allowed)"""
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def bad_request(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+async def _rejection(consignments_collection, consignment_id: ObjectId, bid_amount: float, session) -> HTTPException:
+    """Why the conditional bid counter update matched nothing (error path only)"""
+    consignment = await consignments_collection.find_one(
+        {"_id": consignment_id}, {"status": 1, "budget": 1}, session=session
+    )
+    if not consignment:
+        return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Consignment not found")
+    if consignment["status"] != "open":
+        return bad_request("This consignment is no longer accepting bids")
+    if bid_amount > consignment["budget"]:
+        return bad_request("Bid amount cannot exceed the maximum budget")
+    return bad_request("This consignment is no longer accepting bids")
+
+
+async def place_bid(
+    consignments_collection,
+    bids_collection,
+    bid: Dict[str, Any],
+    estimated_delivery: datetime,
+    session: Optional[Any] = None
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Count and insert a bid in two round trips
+    Args:
+        consignments_collection: Consignments collection
+        bids_collection: Bids collection (unique (consignmentId, bidderId) index)
+        bid: New bid document (not modified, so a retried transaction can reuse it)
+        estimated_delivery: Parsed bid.estimatedDelivery
+        session: Session from db.run_in_transaction, or None
+    Returns:
+        (consignment as it was before the bid, inserted bid with consignmentTitle and id)
+    Raises:
+        HTTPException: 404/400 when the consignment is missing, closed, over
+            budget or past its deadline, or the bidder has already bid.
+            Inside a transaction the caller's abort undoes the counters;
+            without one they are corrected here.
+    """
+    consignment_id = ObjectId(bid["consignmentId"])
+    bid = dict(bid)
+
+    # Round trip 1: the open/budget checks, the $inc and the bidStats $inc/$min happen in
+    # one conditional update, so concurrent bids can neither lose increments nor land on
+    # a closed consignment
+    stats_update = bid_stats_update(bid)
+    consignment = await consignments_collection.find_one_and_update(
+        {"_id": consignment_id, "status": "open", "budget": {"$gte": bid["bidAmount"]}},
+        {
+            "$inc": {"bidCount": 1, **stats_update["$inc"]},
+            "$min": stats_update["$min"],
+            "$set": {"updatedAt": datetime.now().isoformat()}
+        },
+        projection=BID_CONSIGNMENT_PROJECTION,
+        return_document=ReturnDocument.BEFORE,
+        session=session
+    )
+    if consignment is None:
+        raise await _rejection(consignments_collection, consignment_id, bid["bidAmount"], session)
+
+    async def undo_count():
+        if session is None:
+            # $min can't be reversed, so bidStats is rebuilt from the stored bids
+            await consignments_collection.update_one({"_id": consignment_id}, {"$inc": {"bidCount": -1}})
+            await recompute_bid_stats(consignments_collection, bids_collection, [bid["consignmentId"]])
+
+    try:
+        deadline = parse_timestamp(consignment["deadline"])
+        if estimated_delivery > deadline:
+            await undo_count()
+            raise bad_request("Estimated delivery cannot be after the deadline")
+    except (ValueError, TypeError):
+        await undo_count()
+        raise bad_request("Invalid date format")
+
+    # Round trip 2: the unique (consignmentId, bidderId) index rejects a second bid
+    bid["consignmentTitle"] = consignment["title"]
+    try:
+        result = await bids_collection.insert_one(bid, session=session)
+    except DuplicateKeyError:
+        await undo_count()
+        raise bad_request("You have already placed a bid on this consignment")
+    except Exception:
+        await undo_count()
+        raise
+    bid["id"] = str(result.inserted_id)
+    return consignment, bid
+
+
+def job_document(consignment: Dict[str, Any], bid: Dict[str, Any], awarded_at: str) -> Dict[str, Any]:
+    """New job for an awarded bid (same shape as the jobs created by /jobs/awarded)"""
+    return {
+        "consignmentId": bid["consignmentId"],
+        "consignmentTitle": consignment["title"],
+        "companyId": consignment["companyId"],
+        "companyName": consignment["companyName"],
+        "transporterId": bid["bidderId"],
+        "transporterName": bid["bidderName"],
+        "origin": consignment["origin"],
+        "destination": consignment["destination"],
+        "amount": bid["bidAmount"],
+        "deadline": consignment["deadline"],
+        "status": "awarded",
+        "awardedDate": awarded_at,
+        "completedDate": None,
+        "invoiceUploaded": False,
+        "invoiceData": None,
+        "invoiceUploadedAt": None,
+        "createdAt": awarded_at,
+        "updatedAt": None
+    }
+
+
+async def find_bid(bids_collection, bid_id: str, session: Optional[Any] = None) -> Dict[str, Any]:
+    """Load a bid by id or raise 404"""
+    bid = await bids_collection.find_one({"_id": ObjectId(bid_id)}, session=session) if ObjectId.is_valid(bid_id) else None
+    if not bid:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Bid not found")
+    return bid
+
+
+async def _award_rejection(consignments_collection, consignment_id: ObjectId, company_id: str, session) -> HTTPException:
+    """Why the conditional open -> awarded transition matched nothing (error path only)"""
+    consignment = await consignments_collection.find_one(
+        {"_id": consignment_id}, {"companyId": 1, "status": 1}, session=session
+    )
+    if not consignment:
+        return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Consignment not found")
+    if consignment["companyId"] != company_id:
+        return HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+    return bad_request("This consignment is no longer accepting awards")
+
+
+async def apply_award(
+    consignments_collection,
+    bids_collection,
+    jobs_collection,
+    bid: Dict[str, Any],
+    company_id: str,
+    session: Optional[Any] = None
+) -> Dict[str, Any]:
+    """
+    Award a bid in one read and three writes, independent of how many bids the consignment has
+    Args:
+        consignments_collection: Consignments collection
+        bids_collection: Bids collection
+        jobs_collection: Jobs collection
+        bid: Bid document being awarded
+        company_id: Id of the company awarding it (must own the consignment)
+        session: Session from db.run_in_transaction, or None
+    Returns:
+        The awarded bid as stored
+    Raises:
+        HTTPException: 404/403/400 when the consignment is missing, not the
+            company's, or already awarded to a different bid, and 400 when the
+            bid was withdrawn or rejected. Re-awarding the same bid is a no-op
+            that finishes any steps an earlier attempt missed.
+    """
+    consignment_id = ObjectId(bid["consignmentId"])
+    bid_id = str(bid["_id"])
+    now = datetime.now().isoformat()
+
+    # 0. Re-read inside the session: a withdrawn or rejected bid can't be awarded
+    live = await bids_collection.find_one(
+        {"_id": bid["_id"], "status": {"$in": LIVE_BID_STATUSES}}, {"_id": 1}, session=session
+    )
+    if live is None:
+        raise bad_request("Only pending bids can be awarded")
+
+    # 1. open -> awarded happens at most once, so two concurrent awards can't both win
+    consignment = await consignments_collection.find_one_and_update(
+        {
+            "_id": consignment_id,
+            "companyId": company_id,
+            "$or": [{"status": "open"}, {"status": "awarded", "awardedBidId": bid_id}]
+        },
+        {"$set": {
+            "status": "awarded",
+            "awardedBidId": bid_id,
+            "awardedBidderId": bid["bidderId"],
+            "finalAmount": bid["bidAmount"],
+            # Every other bid is rejected below, leaving the winner as the only live bid
+            "bidStats": single_bid_stats(bid),
+            "updatedAt": now
+        }},
+        return_document=ReturnDocument.AFTER,
+        session=session
+    )
+    if consignment is None:
+        raise await _award_rejection(consignments_collection, consignment_id, company_id, session)
+
+    # 2. Winner and every losing bid in one bulk write (the rejection is a single update_many)
+    awarded_at = bid.get("awardedAt") or now
+    await bids_collection.bulk_write([
+        UpdateOne(
+            {"_id": bid["_id"], "status": {"$in": LIVE_BID_STATUSES}},
+            {"$set": {"status": "awarded", "awardedAt": awarded_at, "updatedAt": now}}
+        ),
+        UpdateMany(
+            {"consignmentId": bid["consignmentId"], "_id": {"$ne": bid["_id"]}, "status": {"$in": LIVE_BID_STATUSES}},
+            {"$set": {"status": "rejected", "updatedAt": now}}
+        ),
+    ], ordered=False, session=session)
+
+    # 3. Upserted on (consignmentId, transporterId), so a retried award never duplicates the job
+    await jobs_collection.update_one(
+        {"consignmentId": bid["consignmentId"], "transporterId": bid["bidderId"]},
+        {"$setOnInsert": job_document(consignment, bid, awarded_at)},
+        upsert=True,
+        session=session
+    )
+
+    return dict(bid, status="awarded", awardedAt=awarded_at, updatedAt=now)
@@ -0,0 +1,296 @@
+from datetime import date, timedelta
+from itertools import combinations
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from fastapi import HTTPException, status
+from utils.distances import EARTH_RADIUS_KM
+from utils.pagination import SORT_ORDER, apply_cursor, decode_cursor
+
+# /available sort options; every keyset sort ends with _id to break ties.
+# "distance" is not a keyset index sort: it runs as a $geoNear aggregate on
+# the originGeo 2dsphere index (see distance_pipeline)
+SORTS: Dict[str, List[Tuple[str, int]]] = {
+    "newest": SORT_ORDER,
+    "budget": [("budget", 1), ("_id", 1)],
+    "-budget": [("budget", -1), ("_id", -1)],
+    "deadline": [("deadline", 1), ("_id", 1)],
+    "-deadline": [("deadline", -1), ("_id", -1)],
+}
+
+DISTANCE_SORT = "distance"
+
+# Keyset order of a distance-sorted page (distanceKm is computed, not stored)
+DISTANCE_ORDER = [("distanceKm", 1), ("_id", 1)]
+
+# Fields a distance-sorted page returns (everything ConsignmentResponse shows)
+DISTANCE_PROJECTION = {
+    "title": 1, "origin": 1, "destination": 1, "goodsType": 1, "weight": 1,
+    "deadline": 1, "budget": 1, "description": 1, "status": 1, "companyId": 1,
+    "companyName": 1, "bidCount": 1, "createdAt": 1, "updatedAt": 1, "distanceKm": 1
+}
+
+SORT_PATTERN = "^(" + "|".join([DISTANCE_SORT] + list(SORTS)) + ")$"
+
+
+def parse_goods_types(values: Optional[List[str]]) -> List[str]:
+    """
+    Goods types from repeated and/or comma-separated query parameters
+    Args:
+        values: Raw goods_type parameters (e.g. ["Electronics,Textiles", "Food"])
+    Returns:
+        Distinct goods types in request order
+    """
+    goods_types: List[str] = []
+    for value in values or []:
+        for goods_type in value.split(","):
+            goods_type = goods_type.strip()
+            if goods_type and goods_type not in goods_types:
+                goods_types.append(goods_type)
+    return goods_types
+
+
+def range_filter(name: str, low: Any = None, high: Any = None) -> Optional[Dict[str, Any]]:
+    """
+    Inclusive range condition for one field
+    Args:
+        name: Parameter name used in error messages
+        low: Lower bound or None
+        high: Upper bound or None
+    Returns:
+        {"$gte": low, "$lte": high} (either side optional), or None if unbounded
+    """
+    if low is not None and high is not None and low > high:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid {name} range: minimum is greater than maximum"
+        )
+    condition = {}
+    if low is not None:
+        condition["$gte"] = low
+    if high is not None:
+        condition["$lte"] = high
+    return condition or None
+
+
+def deadline_window(deadline_from: Optional[str], deadline_to: Optional[str]) -> Optional[Dict[str, str]]:
+    """
+    String range over stored deadlines ("2024-05-01" or ISO datetimes)
+    Args:
+        deadline_from: First day of the window ("YYYY-MM-DD")
+        deadline_to: Last day of the window, included in full
+    Returns:
+        {"$gte": first day, "$lt": day after the last}, or None if unbounded
+    """
+    days = []
+    for value in (deadline_from, deadline_to):
+        try:
+            days.append(date.fromisoformat(value) if value else None)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid deadline date '{value}', use YYYY-MM-DD"
+            )
+    first, last = days
+    range_filter("deadline", first, last)
+    condition = {}
+    if first:
+        condition["$gte"] = first.isoformat()
+    if last:
+        condition["$lt"] = (last + timedelta(days=1)).isoformat()
+    return condition or None
+
+
+def compile_constraints(
+    min_budget: Optional[float] = None,
+    max_budget: Optional[float] = None,
+    min_weight: Optional[float] = None,
+    max_weight: Optional[float] = None,
+    goods_types: Optional[List[str]] = None,
+    deadline_from: Optional[str] = None,
+    deadline_to: Optional[str] = None,
+    max_payload: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Compile /available filters into conditions shared by every query branch
+    Args:
+        min_budget: Lowest budget
+        max_budget: Highest budget
+        min_weight: Lightest load in kg
+        max_weight: Heaviest load in kg (capped at max_payload)
+        goods_types: Accepted goods types (any of)
+        deadline_from: Earliest deadline ("YYYY-MM-DD")
+        deadline_to: Latest deadline ("YYYY-MM-DD", the whole day is included)
+        max_payload: MSME's fleet capacity in kg
+    Returns:
+        Field conditions on budget, weight, goodsType and deadline
+    """
+    if max_payload is not None:
+        max_weight = max_payload if max_weight is None else min(max_weight, max_payload)
+
+    constraints: Dict[str, Any] = {}
+    for field, condition in [
+        ("budget", range_filter("budget", min_budget, max_budget)),
+        ("weight", range_filter("weight", min_weight, max_weight)),
+        ("deadline", deadline_window(deadline_from, deadline_to)),
+    ]:
+        if condition:
+            constraints[field] = condition
+
+    if goods_types:
+        constraints["goodsType"] = goods_types[0] if len(goods_types) == 1 else {"$in": goods_types}
+    return constraints
+
+
+def route_clause(origin_keys: Optional[Dict[str, str]], dest_keys: Optional[Dict[str, str]]) -> Dict[str, str]:
+    """
+    Equality conditions for a route filter
+    Args:
+        origin_keys: location_keys() of the requested origin, or None
+        dest_keys: location_keys() of the requested destination, or None
+    Returns:
+        Conditions on the stored originCity/originState/destCity/destState keys
+    """
+    clause = {}
+    for prefix, keys in [("origin", origin_keys), ("dest", dest_keys)]:
+        if keys and keys.get("city"):
+            clause[f"{prefix}City"] = keys["city"]
+            clause[f"{prefix}State"] = keys["state"]
+    return clause
+
+
+def compile_available_query(
+    constraints: Dict[str, Any],
+    location_clauses: Optional[List[Dict[str, str]]] = None,
+    route: Optional[Dict[str, str]] = None
+) -> Dict[str, Any]:
+    """
+    Build the /available MongoDB filter
+    Args:
+        constraints: Output of compile_constraints
+        location_clauses: location_match_query() clauses for the MSME's home
+        route: route_clause() conditions; replaces the home-location match
+    Returns:
+        Filter whose every $or branch starts with an indexed equality
+        (status, a location key or goodsType)
+    """
+    if route:
+        return {"status": "open", **route, **constraints}
+    if location_clauses:
+        # status goes inside each branch so every branch uses its own compound index
+        return {"$or": [{"status": "open", **clause, **constraints} for clause in location_clauses]}
+    return {"status": "open", **constraints}
+
+
+def within_distance(query: Dict[str, Any], latitude: float, longitude: float, max_distance: float) -> Dict[str, Any]:
+    """
+    Restrict a filter to pickups within a radius (for counts; find() can't sort by $geoNear)
+    Args:
+        query: compile_available_query() filter
+        latitude: Latitude of the MSME's base
+        longitude: Longitude of the MSME's base
+        max_distance: Radius in km
+    Returns:
+        Filter with a $geoWithin on originGeo
+    """
+    circle = [[longitude, latitude], max_distance / EARTH_RADIUS_KM]
+    return {"originGeo": {"$geoWithin": {"$centerSphere": circle}}, **query}
+
+
+def distance_pipeline(
+    query: Dict[str, Any],
+    latitude: float,
+    longitude: float,
+    max_distance: float,
+    limit: int,
+    cursor: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Aggregation for one page of /available ordered by pickup distance
+    Args:
+        query: compile_available_query() filter, applied inside $geoNear
+        latitude: Latitude of the MSME's base
+        longitude: Longitude of the MSME's base
+        max_distance: Pickup radius in km
+        limit: Page size (one extra document is fetched to detect a next page)
+        cursor: Cursor from the previous page (encoded with DISTANCE_ORDER)
+    Returns:
+        Pipeline: $geoNear on the originGeo 2dsphere index with the exact
+        distance as "distanceKm", keyset, sort, limit, DISTANCE_PROJECTION
+    """
+    near = {
+        "near": {"type": "Point", "coordinates": [longitude, latitude]},
+        "key": "originGeo",
+        "distanceField": "distanceKm",
+        # GeoJSON distances are in meters
+        "distanceMultiplier": 0.001,
+        "maxDistance": max_distance * 1000,
+        "query": query,
+        "spherical": True
+    }
+    after_cursor = None
+    if cursor:
+        after_distance, _ = decode_cursor(cursor, DISTANCE_ORDER)
+        # Compared with the computed distance; anything else is a tampered cursor
+        if isinstance(after_distance, bool) or not isinstance(after_distance, (int, float)):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid pagination cursor"
+            )
+        # Let the index skip earlier pages; a meter of slack absorbs the
+        # km/m rounding, the keyset match below is exact
+        near["minDistance"] = max(0.0, after_distance * 1000 - 1)
+        after_cursor = apply_cursor({}, cursor, DISTANCE_ORDER)
+
+    pipeline: List[Dict[str, Any]] = [{"$geoNear": near}]
+    if after_cursor:
+        pipeline.append({"$match": after_cursor})
+    pipeline += [
+        # $geoNear leaves equal distances (same pickup city) in no fixed order
+        {"$sort": {"distanceKm": 1, "_id": 1}},
+        {"$limit": limit + 1},
+        {"$project": DISTANCE_PROJECTION},
+    ]
+    return pipeline
+
+
+def filter_combinations() -> Iterator[Tuple[str, Dict[str, Any], Optional[List[Tuple[str, int]]]]]:
+    """
+    Every supported /available filter shape with placeholder values
+    Returns:
+        (name, filter, sort) for each combination of optional filters,
+        location scope and sort order, for explain-based index checks
+    """
+    optional = {
+        "budget": {"min_budget": 1000, "max_budget": 50000},
+        "weight": {"min_weight": 100, "max_weight": 5000},
+        "goods": {"goods_types": ["Electronics", "Textiles"]},
+        "deadline": {"deadline_from": "2000-01-01", "deadline_to": "2000-01-31"},
+    }
+    scopes = {
+        "nearby": {"location_clauses": [
+            {"originCity": "mumbai"}, {"destCity": "mumbai"},
+            {"originState": "maharashtra"}, {"destState": "maharashtra"}
+        ]},
+        "route": {"route": route_clause({"city": "mumbai", "state": "maharashtra"},
+                                        {"city": "pune", "state": "maharashtra"})},
+        "destination": {"route": route_clause(None, {"city": "pune", "state": "maharashtra"})},
+        "anywhere": {},
+    }
+
+    for size in range(len(optional) + 1):
+        for chosen in combinations(optional, size):
+            params: Dict[str, Any] = {"max_payload": 20000}
+            for name in chosen:
+                params.update(optional[name])
+            constraints = compile_constraints(**params)
+            label = ",".join(chosen) or "none"
+            for scope, scope_args in scopes.items():
+                query = compile_available_query(constraints, **scope_args)
+                for sort_name, sort in SORTS.items():
+                    yield f"available[{label}|{scope}|{sort_name}]", query, sort
+            # $geoNear can't be explained through find(); the same filter
+            # bounded by $geoWithin exercises the same 2dsphere index
+            yield (
+                f"available[{label}|{DISTANCE_SORT}]",
+                within_distance(compile_available_query(constraints), 19.07, 72.88, 300),
+                None
+            )
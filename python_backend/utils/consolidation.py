@@ -0,0 +1,161 @@
+from bisect import bisect_left, insort
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from utils.vehicles import VEHICLE_CAPACITY_KG, fleet_vehicles, known_vehicle_types, smallest_vehicle_for
+
+# Consignments due within this many days of each other can share a truck
+DEFAULT_WINDOW_DAYS = 2
+
+# A bundle is only worth suggesting if it combines at least this many loads
+MIN_BUNDLE_SIZE = 2
+
+
+def corridor_key(consignment: Dict[str, Any]) -> Optional[Tuple[str, str, str, str]]:
+    """Corridor of a consignment from its stored location keys (None if incomplete)"""
+    key = (
+        consignment.get("originCity"), consignment.get("originState"),
+        consignment.get("destCity"), consignment.get("destState")
+    )
+    return key if all(key) else None
+
+
+def deadline_date(deadline: Any) -> Optional[date]:
+    """Calendar date of a stored deadline ("2024-05-01" or an ISO datetime)"""
+    try:
+        return date.fromisoformat(str(deadline)[:10])
+    except ValueError:
+        return None
+
+
+def deadline_windows(items: List[Dict[str, Any]], window_days: int) -> List[List[Dict[str, Any]]]:
+    """
+    Split one corridor's consignments into deadline windows
+    Args:
+        items: Consignments with a parsed "_due" date
+        window_days: Window length; a window starts at its earliest deadline
+    Returns:
+        Windows in deadline order
+    """
+    windows: List[List[Dict[str, Any]]] = []
+    window_end = None
+    for item in sorted(items, key=lambda item: item["_due"]):
+        if window_end is None or item["_due"] > window_end:
+            windows.append([])
+            window_end = item["_due"] + timedelta(days=window_days)
+        windows[-1].append(item)
+    return windows
+
+
+def pack_bins(items: List[Dict[str, Any]], capacity: float) -> List[List[Dict[str, Any]]]:
+    """
+    Best-fit decreasing bin packing by weight
+    Args:
+        items: Consignments with a positive "weight" no larger than capacity
+        capacity: Bin (vehicle) capacity in kg
+    Returns:
+        Bins (lists of consignments)
+    """
+    bins: List[List[Dict[str, Any]]] = []
+    # Sorted (remaining capacity, bin index) so the tightest fitting bin is a bisect away
+    free: List[Tuple[float, int]] = []
+    for item in sorted(items, key=lambda item: item["weight"], reverse=True):
+        position = bisect_left(free, (item["weight"], -1))
+        if position < len(free):
+            remaining, bin_index = free.pop(position)
+        else:
+            remaining, bin_index = capacity, len(bins)
+            bins.append([])
+        bins[bin_index].append(item)
+        insort(free, (remaining - item["weight"], bin_index))
+    return bins
+
+
+def assign_fleet(bundles: List[Dict[str, Any]], vehicles: List[str]) -> List[Dict[str, Any]]:
+    """
+    Give each bundle its own vehicle from a fleet, best bundles first
+    Args:
+        bundles: Bundles ordered best first
+        vehicles: One vehicle type per vehicle in the fleet
+    Returns:
+        Bundles that got a vehicle, each on the smallest free one that can
+        carry it (vehicleType, capacityKg and utilization updated)
+    """
+    free = sorted(VEHICLE_CAPACITY_KG[vehicle_type] for vehicle_type in vehicles)
+    types = {VEHICLE_CAPACITY_KG[vehicle_type]: vehicle_type for vehicle_type in vehicles}
+    assigned = []
+    for bundle in bundles:
+        position = bisect_left(free, bundle["totalWeight"])
+        if position == len(free):
+            continue
+        capacity = free.pop(position)
+        assigned.append(dict(
+            bundle,
+            vehicleType=types[capacity],
+            capacityKg=capacity,
+            utilization=round(bundle["totalWeight"] / capacity, 3)
+        ))
+        if not free:
+            break
+    return assigned
+
+
+def plan_bundles(
+    consignments: List[Dict[str, Any]],
+    vehicle_types: Optional[List[str]],
+    window_days: int = DEFAULT_WINDOW_DAYS,
+    min_bundle_size: int = MIN_BUNDLE_SIZE,
+    fleet_size: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Group open consignments by corridor and deadline window, then pack each
+    group into truckloads for an MSME's largest vehicle type
+    Args:
+        consignments: Open consignments (location keys, weight, deadline, budget)
+        vehicle_types: MSME's vehicle types
+        window_days: Deadline window length in days
+        min_bundle_size: Smallest number of consignments per bundle
+        fleet_size: Number of vehicles; when given, only as many bundles as the
+            fleet can run at once are kept (see fleet_vehicles and assign_fleet)
+    Returns:
+        Bundles (consignments, totals, deadline, vehicle and utilization),
+        highest total budget first
+    """
+    max_capacity = VEHICLE_CAPACITY_KG[known_vehicle_types(vehicle_types)[-1]]
+
+    corridors: Dict[Tuple[str, str, str, str], List[Dict[str, Any]]] = {}
+    for consignment in consignments:
+        key = corridor_key(consignment)
+        weight = consignment.get("weight") or 0
+        due = deadline_date(consignment.get("deadline"))
+        if key is None or due is None or not 0 < weight <= max_capacity:
+            continue
+        corridors.setdefault(key, []).append(dict(consignment, _due=due))
+
+    bundles = []
+    for items in corridors.values():
+        if len(items) < min_bundle_size:
+            continue
+        for window in deadline_windows(items, window_days):
+            if len(window) < min_bundle_size:
+                continue
+            for packed in pack_bins(window, max_capacity):
+                if len(packed) < min_bundle_size:
+                    continue
+                total_weight = sum(item["weight"] for item in packed)
+                vehicle_type, capacity = smallest_vehicle_for(total_weight, vehicle_types)
+                bundles.append({
+                    "origin": packed[0].get("origin"),
+                    "destination": packed[0].get("destination"),
+                    "consignments": [{k: v for k, v in item.items() if k != "_due"} for item in packed],
+                    "totalWeight": total_weight,
+                    "totalBudget": sum(item.get("budget") or 0 for item in packed),
+                    "deadline": min(item["deadline"] for item in packed),
+                    "vehicleType": vehicle_type,
+                    "capacityKg": capacity,
+                    "utilization": round(total_weight / capacity, 3)
+                })
+
+    bundles.sort(key=lambda bundle: (-bundle["totalBudget"], -bundle["utilization"]))
+    if fleet_size is not None:
+        return assign_fleet(bundles, fleet_vehicles(fleet_size, vehicle_types))
+    return bundles
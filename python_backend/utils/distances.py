@@ -0,0 +1,147 @@
+import math
+import os
+import tempfile
+from threading import Lock
+from typing import List, Optional, Sequence, Union
+import numpy as np
+from utils.gazetteer import GAZETTEER_PATH, Place, artifact_path, load_places
+
+EARTH_RADIUS_KM = 6371.0
+
+# Largest gazetteer that gets a precomputed city-to-city matrix (N x N float32:
+# 5000 places is ~100 MB on disk, memory-mapped and shared by all workers)
+CITY_MATRIX_MAX_PLACES = int(os.getenv("CITY_DISTANCE_MATRIX_MAX_PLACES", "5000"))
+
+# Rows computed per block while compiling the matrix (bounds float64 temporaries)
+_COMPILE_BLOCK_ROWS = 256
+
+ArrayLike = Union[Sequence[float], np.ndarray]
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def distances_from(latitude: float, longitude: float, latitudes: ArrayLike, longitudes: ArrayLike) -> np.ndarray:
+    """
+    Distances from one point to many points in a single vectorized pass
+    Args:
+        latitude: Latitude of the origin
+        longitude: Longitude of the origin
+        latitudes: Latitudes of the targets
+        longitudes: Longitudes of the targets
+    Returns:
+        Array of distances in km, in target order
+    """
+    phi = np.radians(np.asarray(latitudes, dtype=np.float64))
+    lam = np.radians(np.asarray(longitudes, dtype=np.float64))
+    phi0 = math.radians(latitude)
+    a = np.sin((phi - phi0) / 2) ** 2 + math.cos(phi0) * np.cos(phi) * np.sin((lam - math.radians(longitude)) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def distance_matrix(
+    latitudes: ArrayLike,
+    longitudes: ArrayLike,
+    other_latitudes: Optional[ArrayLike] = None,
+    other_longitudes: Optional[ArrayLike] = None
+) -> np.ndarray:
+    """
+    N x M matrix of distances between two point sets (N x N if only one is given)
+    Args:
+        latitudes: Latitudes of the row points
+        longitudes: Longitudes of the row points
+        other_latitudes: Latitudes of the column points
+        other_longitudes: Longitudes of the column points
+    Returns:
+        Array of shape (N, M) with distances in km
+    """
+    if other_latitudes is None or other_longitudes is None:
+        other_latitudes, other_longitudes = latitudes, longitudes
+    phi1 = np.radians(np.asarray(latitudes, dtype=np.float64))[:, None]
+    lam1 = np.radians(np.asarray(longitudes, dtype=np.float64))[:, None]
+    phi2 = np.radians(np.asarray(other_latitudes, dtype=np.float64))[None, :]
+    lam2 = np.radians(np.asarray(other_longitudes, dtype=np.float64))[None, :]
+    a = np.sin((phi2 - phi1) / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin((lam2 - lam1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def compile_city_matrix(places: List[Place], output_path: str) -> None:
+    """
+    Write the gazetteer's city-to-city distances as a float32 .npy file
+    Args:
+        places: Places in gazetteer order (row/column i is place i)
+        output_path: Destination file (written atomically)
+    """
+    latitudes = np.array([place.latitude for place in places], dtype=np.float64)
+    longitudes = np.array([place.longitude for place in places], dtype=np.float64)
+
+    directory = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".npy.tmp")
+    os.close(fd)
+    try:
+        matrix = np.lib.format.open_memmap(temp_path, mode="w+", dtype=np.float32, shape=(len(places), len(places)))
+        for start in range(0, len(places), _COMPILE_BLOCK_ROWS):
+            stop = start + _COMPILE_BLOCK_ROWS
+            matrix[start:stop] = distance_matrix(latitudes[start:stop], longitudes[start:stop], latitudes, longitudes)
+        matrix.flush()
+        del matrix
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, output_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+def city_matrix_path(source_path: str = GAZETTEER_PATH) -> str:
+    """Location of the compiled distance matrix for a gazetteer TSV"""
+    return artifact_path(source_path, ".distances.npy")
+
+
+def ensure_city_matrix(source_path: str = GAZETTEER_PATH) -> Optional[str]:
+    """
+    Compile the distance matrix if it is missing or older than the TSV
+    Returns:
+        Path of the compiled file, or None if the gazetteer exceeds
+        CITY_MATRIX_MAX_PLACES
+    """
+    output_path = city_matrix_path(source_path)
+    if (not os.path.exists(output_path) or
+            os.path.getmtime(output_path) < os.path.getmtime(source_path)):
+        places = load_places(source_path)
+        if len(places) > CITY_MATRIX_MAX_PLACES:
+            # Never serve a stale matrix whose rows no longer line up with the gazetteer
+            return None
+        compile_city_matrix(places, output_path)
+        print(f"📍 Compiled {len(places)}x{len(places)} distance matrix to {output_path}")
+    return output_path
+
+
+_matrix: Optional[np.ndarray] = None
+_matrix_loaded = False
+_matrix_lock = Lock()
+
+
+def get_city_distance_matrix(source_path: str = GAZETTEER_PATH) -> Optional[np.ndarray]:
+    """
+    Get the memory-mapped city-to-city matrix, compiling it on first use
+    Returns:
+        Read-only float32 (N, N) array, or None if the gazetteer exceeds
+        CITY_MATRIX_MAX_PLACES (callers then compute distances directly)
+    """
+    global _matrix, _matrix_loaded
+    if not _matrix_loaded:
+        with _matrix_lock:
+            if not _matrix_loaded:
+                output_path = ensure_city_matrix(source_path)
+                if output_path:
+                    _matrix = np.load(output_path, mmap_mode="r")
+                _matrix_loaded = True
+    return _matrix
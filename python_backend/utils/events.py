@@ -0,0 +1,176 @@
+import asyncio
+import itertools
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional, Set
+
+# Events buffered per connection; a client that falls further behind is told to resync
+SUBSCRIBER_QUEUE_SIZE = 100
+
+# Event types pushed to dashboards
+BID_PLACED = "bid.placed"
+BID_AWARDED = "bid.awarded"
+CONSIGNMENT_STATUS = "consignment.status"
+
+
+class Subscription:
+    """
+    One stream's bounded queue and filter.
+
+    Companies see full event data for their own consignments; anyone
+    following a single consignment without owning it only sees its public
+    fields (no bidder identities or amounts).
+    """
+
+    __slots__ = ("company_id", "consignment_id", "private", "queue", "overflowed", "dropped")
+
+    def __init__(self, company_id: Optional[str], consignment_id: Optional[str], private: bool, queue_size: int):
+        self.company_id = company_id
+        self.consignment_id = consignment_id
+        self.private = private
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+        self.dropped = 0
+
+    def offer(self, event: Dict[str, Any]) -> None:
+        """Queue an event without blocking the publisher; a full queue drops it"""
+        if self.overflowed:
+            self.dropped += 1
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Stop queueing until the client has drained and been told to refetch
+            self.overflowed = True
+            self.dropped += 1
+
+    async def next(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        Wait for the next event
+        Args:
+            timeout: Seconds to wait before returning None (time for a heartbeat)
+        Returns:
+            Event, a resync event after an overflow, or None on timeout
+        """
+        if self.overflowed and self.queue.empty():
+            self.overflowed = False
+            return {"type": "resync", "data": {"dropped": self.dropped}}
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventHub:
+    """
+    In-process pub/sub for dashboard events.
+
+    Subscribers are indexed by company and by consignment, so publishing
+    only touches the connections an event is for, however many idle
+    streams the worker holds. Publishing never awaits: each subscriber
+    has a bounded queue and a slow client loses events (and gets a resync)
+    instead of holding up the request that published them.
+    """
+
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._by_company: Dict[str, Set[Subscription]] = {}
+        self._by_consignment: Dict[str, Set[Subscription]] = {}
+        self._ids = itertools.count(1)
+        self.published = 0
+
+    def __len__(self) -> int:
+        return sum(len(subs) for subs in self._by_company.values()) + sum(
+            len(subs) for subs in self._by_consignment.values()
+        )
+
+    def subscribe(
+        self,
+        company_id: Optional[str] = None,
+        consignment_id: Optional[str] = None,
+        private: bool = True
+    ) -> Subscription:
+        """
+        Register a stream
+        Args:
+            company_id: Receive every event for this company's consignments
+            consignment_id: Receive events for one consignment (takes precedence)
+            private: Include bidder details (only for the owning company)
+        Returns:
+            Subscription to read from and later pass to unsubscribe
+        """
+        subscription = Subscription(company_id, consignment_id, private, self.queue_size)
+        if consignment_id:
+            self._by_consignment.setdefault(consignment_id, set()).add(subscription)
+        else:
+            self._by_company.setdefault(company_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        index, key = (
+            (self._by_consignment, subscription.consignment_id) if subscription.consignment_id
+            else (self._by_company, subscription.company_id)
+        )
+        subscribers = index.get(key)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del index[key]
+
+    def publish(
+        self,
+        event_type: str,
+        company_id: str,
+        consignment_id: str,
+        data: Dict[str, Any],
+        public: Optional[Dict[str, Any]] = None
+    ) -> int:
+        """
+        Fan an event out to the matching streams
+        Args:
+            event_type: BID_PLACED, BID_AWARDED or CONSIGNMENT_STATUS
+            company_id: Company that owns the consignment
+            consignment_id: Consignment the event is about
+            data: Payload for the owning company
+            public: Payload for other followers of the consignment (None: not sent to them)
+        Returns:
+            Number of streams the event was queued for
+        """
+        base = {"id": next(self._ids), "type": event_type, "at": datetime.now().isoformat(),
+                "companyId": company_id, "consignmentId": consignment_id}
+        private_event = dict(base, data=data)
+        public_event = dict(base, data=public) if public is not None else None
+
+        delivered = 0
+        for subscription in self._by_company.get(company_id, ()):
+            subscription.offer(private_event)
+            delivered += 1
+        for subscription in self._by_consignment.get(consignment_id, ()):
+            event = private_event if subscription.private else public_event
+            if event is not None:
+                subscription.offer(event)
+                delivered += 1
+        self.published += 1
+        return delivered
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self),
+            "companies": len(self._by_company),
+            "consignments": len(self._by_consignment),
+            "published": self.published
+        }
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """Serialize an event as a Server-Sent Events message"""
+    lines = []
+    if "id" in event:
+        lines.append(f"id: {event['id']}")
+    lines.append(f"event: {event['type']}")
+    lines.append("data: " + json.dumps(event, separators=(",", ":"), default=str))
+    return "\n".join(lines) + "\n\n"
+
+
+# Shared by the publishing routers and the /api/events stream
+event_hub = EventHub()
@@ -0,0 +1,95 @@
+import csv
+import io
+import json
+import zlib
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+
+def export_row(document: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+    """
+    Flatten a MongoDB document into an export row
+    Args:
+        document: MongoDB document
+        fields: Fields to keep ("id" is taken from _id)
+    Returns:
+        Row with only the requested fields
+    """
+    row = {}
+    for field in fields:
+        if field == "id":
+            row["id"] = str(document.get("_id", ""))
+        else:
+            row[field] = document.get(field)
+    return row
+
+
+def projection_for(fields: List[str]) -> Dict[str, int]:
+    """
+    MongoDB projection returning only the exported fields
+    Args:
+        fields: Export fields
+    Returns:
+        Projection dict (_id is always included by MongoDB)
+    """
+    return {field: 1 for field in fields if field != "id"}
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str)
+    return value
+
+
+async def stream_export(
+    documents: AsyncIterator[Dict[str, Any]],
+    fields: List[str],
+    file_format: str = "ndjson",
+    batch_size: int = 500,
+    compress: bool = False
+) -> AsyncIterator[bytes]:
+    """
+    Encode documents as NDJSON or CSV chunks, one chunk per batch
+    Args:
+        documents: Async iterator of MongoDB documents (e.g. a Motor cursor)
+        fields: Fields written for every row
+        file_format: "ndjson" or "csv"
+        batch_size: Rows per emitted chunk
+        compress: Gzip the stream
+    Returns:
+        Async iterator of byte chunks (memory bounded by one batch)
+    """
+    compressor: Optional[Any] = zlib.compressobj(wbits=31) if compress else None
+    buffer = io.StringIO()
+    writer = None
+    if file_format == "csv":
+        writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+
+    rows_in_buffer = 0
+
+    def take_chunk() -> bytes:
+        data = buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate(0)
+        return compressor.compress(data) if compressor else data
+
+    async for document in documents:
+        row = export_row(document, fields)
+        if writer:
+            writer.writerow({key: _csv_value(value) for key, value in row.items()})
+        else:
+            buffer.write(json.dumps(row, default=str))
+            buffer.write("\n")
+        rows_in_buffer += 1
+
+        if rows_in_buffer >= batch_size:
+            chunk = take_chunk()
+            rows_in_buffer = 0
+            if chunk:
+                yield chunk
+
+    chunk = take_chunk()
+    if compressor:
+        chunk += compressor.flush()
+    if chunk:
+        yield chunk
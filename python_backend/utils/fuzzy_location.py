@@ -0,0 +1,289 @@
+import math
+import os
+from threading import Lock
+from typing import Dict, FrozenSet, List, Optional, Tuple
+from utils.gazetteer import Place, get_places, name_key
+
+# Minimum Dice similarity (0-1) for a fuzzy match to be offered as a suggestion
+FUZZY_MIN_SCORE = float(os.getenv("LOCATION_FUZZY_MIN_SCORE", "0.6"))
+
+# Minimum similarity for a fuzzy match to replace what the user typed; the
+# names must also agree once generic words are dropped (see is_canonical_match)
+CANONICAL_MIN_SCORE = float(os.getenv("LOCATION_CANONICAL_MIN_SCORE", "0.9"))
+
+# Below that score, a one- or two-typo spelling ("Ahmdabad", "Vishakapatnam")
+# is still applied when it is unambiguous: typos allowed by name length
+TYPO_EDITS = ((8, 2), (5, 1))
+# Candidates compared when checking that only one place is within reach
+TYPO_CANDIDATES = 5
+
+# Words that describe a kind of place rather than name one ("Foo Industrial
+# Area" must not become "Peenya Industrial Area" on the strength of them)
+GENERIC_WORDS = frozenset({
+    "industrial", "area", "estate", "zone", "park", "sector", "phase", "block",
+    "road", "city", "town", "district", "port", "midc", "gidc", "sidcul", "sez", "imt"
+})
+
+# State abbreviations and old names shippers still type
+STATE_ALIASES = {
+    "ap": "Andhra Pradesh", "ar": "Arunachal Pradesh", "as": "Assam", "br": "Bihar",
+    "cg": "Chhattisgarh", "ct": "Chhattisgarh", "dl": "Delhi", "ncr": "Delhi",
+    "new delhi": "Delhi", "nct": "Delhi", "ga": "Goa", "gj": "Gujarat", "hr": "Haryana",
+    "hp": "Himachal Pradesh", "jk": "Jammu and Kashmir", "j k": "Jammu and Kashmir",
+    "jh": "Jharkhand", "ka": "Karnataka", "kar": "Karnataka", "kl": "Kerala",
+    "mp": "Madhya Pradesh", "mh": "Maharashtra", "od": "Odisha", "or": "Odisha",
+    "orissa": "Odisha", "pb": "Punjab", "py": "Puducherry", "pondicherry": "Puducherry",
+    "rj": "Rajasthan", "tn": "Tamil Nadu", "ts": "Telangana", "tg": "Telangana",
+    "up": "Uttar Pradesh", "uk": "Uttarakhand", "uttaranchal": "Uttarakhand",
+    "wb": "West Bengal", "bengal": "West Bengal"
+}
+
+
+def trigrams(key: str) -> FrozenSet[str]:
+    """Padded character trigrams of a normalized key ("pune" -> "  p", " pu", ...)"""
+    padded = f"  {key} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def dice(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    """Dice coefficient of two trigram sets"""
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+def distinctive_words(key: str) -> str:
+    """A normalized key without its generic words ("okhla industrial area" -> "okhla")"""
+    return " ".join(word for word in key.split() if word not in GENERIC_WORDS)
+
+
+def is_canonical_match(query: str, key: str, score: float) -> bool:
+    """
+    Check whether a fuzzy match is safe to store in place of the query
+    Args:
+        query: Normalized text the user typed
+        key: Normalized gazetteer name or alias it matched
+        score: Dice similarity of the two
+    Returns:
+        True if the score reaches CANONICAL_MIN_SCORE and the distinctive
+        words also match: same word count, similar length and similarity
+        at the same cutoff
+    """
+    if score < CANONICAL_MIN_SCORE:
+        return False
+    query_words, key_words = distinctive_words(query), distinctive_words(key)
+    if not query_words or not key_words or len(query_words.split()) != len(key_words.split()):
+        return False
+    if abs(len(query_words) - len(key_words)) > max(1, len(key_words) // 5):
+        return False
+    return dice(trigrams(query_words), trigrams(key_words)) >= CANONICAL_MIN_SCORE
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Edit distance with adjacent transpositions (optimal string alignment)
+    Args:
+        a: First string
+        b: Second string
+        limit: Stop early once the distance must exceed this
+    Returns:
+        The distance, or limit + 1 if it is larger than limit
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous, current = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before, previous, current = previous, current, [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+    return current[-1]
+
+
+def typo_budget(key: str) -> int:
+    """Typos tolerated in a name of this length (0 for short names)"""
+    for length, edits in TYPO_EDITS:
+        if len(key) >= length:
+            return edits
+    return 0
+
+
+def is_typo_of(query: str, key: str) -> bool:
+    """Check whether the query's distinctive words are a small misspelling of the key's"""
+    query_words, key_words = distinctive_words(query), distinctive_words(key)
+    if not query_words or not key_words:
+        return False
+    budget = typo_budget(key_words)
+    return budget > 0 and edit_distance(query_words, key_words, budget) <= budget
+
+
+class TrigramIndex:
+    """
+    Fuzzy place-name lookup over a trigram inverted index.
+
+    Every gazetteer name and alias is a key; each key is posted under its
+    trigrams, partitioned by the key's trigram count. For a query only
+    lengths that can still reach the minimum score are visited, and within
+    each length only the posting lists of the query's rarest trigrams
+    (prefix filtering: a key sharing none of them cannot reach the score).
+    The few remaining candidates are verified with an exact Dice score.
+    """
+
+    def __init__(self, places: List[Place]):
+        self.places = places
+        self._keys: List[str] = []
+        self._key_places: List[int] = []
+        self._key_grams: List[FrozenSet[str]] = []
+        self._postings: Dict[Tuple[int, str], List[int]] = {}
+        self._gram_counts: Dict[str, int] = {}
+        self._states = sorted({place.state for place in places if place.state})
+        self._state_keys = {name_key(state): state for state in self._states}
+
+        for place_id, place in enumerate(places):
+            for label in (place.name,) + place.aliases:
+                key = name_key(label)
+                if not key:
+                    continue
+                key_id = len(self._keys)
+                grams = trigrams(key)
+                self._keys.append(key)
+                self._key_places.append(place_id)
+                self._key_grams.append(grams)
+                for gram in grams:
+                    self._postings.setdefault((len(grams), gram), []).append(key_id)
+                    self._gram_counts[gram] = self._gram_counts.get(gram, 0) + 1
+        self._lengths = sorted({length for length, _ in self._postings})
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def resolve_state(self, text: str) -> Optional[str]:
+        """
+        Map a state name, abbreviation or misspelling to a gazetteer state
+        Args:
+            text: Normalized state text ("mh", "maharastra", "orissa")
+        Returns:
+            Canonical state name or None
+        """
+        if not text:
+            return None
+        if text in self._state_keys:
+            return self._state_keys[text]
+        if text in STATE_ALIASES:
+            return STATE_ALIASES[text]
+        grams = trigrams(text)
+        best, best_score = None, FUZZY_MIN_SCORE
+        for key, state in self._state_keys.items():
+            score = dice(grams, trigrams(key))
+            if score >= best_score:
+                best, best_score = state, score
+        return best
+
+    def _rank(self, query: str, limit: int, state: Optional[str], min_score: float) -> List[Tuple[int, float, str]]:
+        grams = trigrams(query) if query else frozenset()
+        if not grams:
+            return []
+
+        size = len(grams)
+        rare_first = sorted(grams, key=lambda gram: self._gram_counts.get(gram, 0))
+        min_length = math.ceil(size * min_score / (2 - min_score))
+        max_length = math.floor(size * (2 - min_score) / min_score)
+        # Lengths closest to the query usually hold the best matches; visiting
+        # them first lets the score floor rise and prune the remaining lengths
+        lengths = sorted(
+            (length for length in self._lengths if min_length <= length <= max_length),
+            key=lambda length: abs(length - size)
+        )
+
+        best: Dict[int, float] = {}
+        best_keys: Dict[int, int] = {}
+        floor = min_score
+        postings = self._postings
+        key_grams = self._key_grams
+        key_places = self._key_places
+        for length in lengths:
+            # Dice >= floor needs this many shared trigrams with a key of this length
+            min_shared = math.ceil(floor * (size + length) / 2 - 1e-9)
+            if min_shared > min(size, length):
+                continue
+            candidates = set()
+            for gram in rare_first[:size - min_shared + 1]:
+                candidates.update(postings.get((length, gram), ()))
+
+            for key_id in candidates:
+                shared = len(grams & key_grams[key_id])
+                if shared < min_shared:
+                    continue
+                place_id = key_places[key_id]
+                if state and self.places[place_id].state != state:
+                    continue
+                score = 2 * shared / (size + length)
+                if score > best.get(place_id, 0):
+                    best[place_id] = score
+                    best_keys[place_id] = key_id
+
+            if len(best) >= limit:
+                floor = max(floor, sorted(best.values(), reverse=True)[limit - 1])
+
+        ranked = sorted(best.items(), key=lambda item: (-item[1], -self.places[item[0]].population))
+        return [(place_id, round(score, 3), self._keys[best_keys[place_id]]) for place_id, score in ranked[:limit]]
+
+    def search(
+        self,
+        query: str,
+        limit: int = 5,
+        state: Optional[str] = None,
+        min_score: float = FUZZY_MIN_SCORE
+    ) -> List[Tuple[Place, float]]:
+        """
+        Find places whose name or alias is similar to a query
+        Args:
+            query: Normalized query (see gazetteer.name_key)
+            limit: Maximum number of results
+            state: Optional canonical state to restrict results to
+            min_score: Minimum Dice similarity
+        Returns:
+            List of (place, score) ordered best first
+        """
+        return [(self.places[place_id], score) for place_id, score, _ in self._rank(query, limit, state, min_score)]
+
+    def best(self, query: str, state_text: str = "") -> Optional[Tuple[int, float, bool]]:
+        """
+        Best fuzzy match for a city, honouring an (also fuzzy) state qualifier
+        Args:
+            query: Normalized city text
+            state_text: Normalized state text, may be empty
+        Returns:
+            (place index in gazetteer order, score, canonical) or None. canonical
+            is True when the match may replace the query: it passes
+            is_canonical_match, or it is within typo_budget edits and either no
+            other candidate place is, or the given state confirms it.
+        """
+        # An unknown qualifier (district, locality) leaves the city unrestricted
+        state = self.resolve_state(state_text)
+        matches = self._rank(query, TYPO_CANDIDATES, state, FUZZY_MIN_SCORE)
+        if not matches:
+            return None
+        place_id, score, key = matches[0]
+        if is_canonical_match(query, key, score):
+            return place_id, score, True
+        if not is_typo_of(query, key):
+            return place_id, score, False
+        unique = not any(is_typo_of(query, other_key) for _, _, other_key in matches[1:])
+        return place_id, score, unique or state is not None
+
+
+_index: Optional[TrigramIndex] = None
+_index_lock = Lock()
+
+
+def get_trigram_index() -> TrigramIndex:
+    """Get the shared trigram index, building it on first use"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = TrigramIndex(get_places())
+    return _index
@@ -0,0 +1,97 @@
+import os
+import re
+from threading import Lock
+from typing import List, NamedTuple, Optional
+
+# Bundled gazetteer of Indian places (override with GAZETTEER_PATH, e.g. a file
+# built from a full GeoNames / PIN-code dump with scripts/build_gazetteer.py)
+BUNDLED_GAZETTEER_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "gazetteer_in.tsv"
+)
+GAZETTEER_PATH = os.getenv("GAZETTEER_PATH", BUNDLED_GAZETTEER_PATH)
+
+# Directory for compiled copies (binary gazetteer, distance matrix); defaults to
+# the TSV's directory. Read-only deploys either point this at a writable path or
+# run scripts/compile_gazetteer.py at build time.
+GAZETTEER_CACHE_DIR = os.getenv("GAZETTEER_CACHE_DIR", "")
+
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def name_key(text: str) -> str:
+    """Lowercase a place name and reduce punctuation/whitespace to single spaces"""
+    return _NON_ALNUM.sub(" ", text.lower()).strip()
+
+
+def artifact_path(source_path: str, suffix: str) -> str:
+    """
+    Location of a file compiled from a gazetteer TSV
+    Args:
+        source_path: Gazetteer TSV
+        suffix: Artifact suffix (".bin", ".distances.npy")
+    Returns:
+        Path in GAZETTEER_CACHE_DIR, or next to the TSV if unset
+    """
+    directory = GAZETTEER_CACHE_DIR or os.path.dirname(os.path.abspath(source_path))
+    return os.path.join(directory, os.path.splitext(os.path.basename(source_path))[0] + suffix)
+
+
+class Place(NamedTuple):
+    name: str
+    state: str
+    district: str
+    kind: str
+    latitude: float
+    longitude: float
+    population: int
+    aliases: tuple
+
+    @property
+    def label(self) -> str:
+        """Display form used across the app ('City, State')"""
+        return f"{self.name}, {self.state}"
+
+
+def load_places(path: str = GAZETTEER_PATH) -> List[Place]:
+    """
+    Load places from a gazetteer TSV file
+    Args:
+        path: TSV with name, state, district, kind, lat, lon, population (thousands), aliases
+    Returns:
+        List of places in file order
+    """
+    places = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip() or line.startswith("#"):
+                continue
+            columns = line.rstrip("\n").split("\t")
+            columns += [""] * (8 - len(columns))
+            name, state, district, kind, lat, lon, population, aliases = columns[:8]
+            places.append(Place(
+                name=name.strip(),
+                state=state.strip(),
+                district=district.strip(),
+                kind=kind.strip() or "city",
+                latitude=float(lat),
+                longitude=float(lon),
+                population=int(float(population or 0) * 1000),
+                aliases=tuple(alias.strip() for alias in aliases.split("|") if alias.strip())
+            ))
+    return places
+
+
+_places: Optional[List[Place]] = None
+_places_lock = Lock()
+
+
+def get_places() -> List[Place]:
+    """Get the gazetteer, loading it on first use (shared by the whole process)"""
+    global _places
+    if _places is None:
+        with _places_lock:
+            if _places is None:
+                _places = load_places()
+                print(f"📍 Loaded {len(_places)} places from gazetteer")
+    return _places
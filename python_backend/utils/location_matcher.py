@@ -1,5 +1,10 @@
 import math
 from typing import Dict, List, Optional, Union, Any
+import numpy as np
+from utils.distances import distances_from, get_city_distance_matrix
+from utils.location_resolver import resolve_location, resolve_canonical
+from utils.backhaul import origin_cell
+from utils.spatial_index import GeoGrid, msme_index
 
 
 def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
@@ -25,6 +30,90 @@ def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     return R * c
 
 
+def city_distances(origin: str, destinations: List[str]) -> List[Optional[float]]:
+    """
+    Straight-line distances from one location to many in a single call
+    Args:
+        origin: Origin location string
+        destinations: Destination location strings
+    Returns:
+        Distance in km per destination (None where a location can't be resolved)
+    """
+    source = resolve_canonical(origin)
+    if not source:
+        return [None] * len(destinations)
+
+    targets = [resolve_canonical(destination) for destination in destinations]
+    resolved = [target for target in targets if target]
+    if not resolved:
+        return [None] * len(destinations)
+
+    matrix = get_city_distance_matrix()
+    if matrix is not None:
+        # Precomputed gazetteer row, gathered with one fancy-index
+        row = matrix[source["placeIndex"], [target["placeIndex"] for target in resolved]]
+    else:
+        row = distances_from(
+            source["latitude"], source["longitude"],
+            [target["latitude"] for target in resolved],
+            [target["longitude"] for target in resolved]
+        )
+
+    values = iter(np.round(np.asarray(row, dtype=np.float64), 1).tolist())
+    return [next(values) if target else None for target in targets]
+
+
+def city_distance(origin: str, destination: str) -> Optional[float]:
+    """
+    Straight-line distance between two locations
+    Args:
+        origin: Origin location string
+        destination: Destination location string
+    Returns:
+        Distance in km, or None if either location can't be resolved
+    """
+    return city_distances(origin, [destination])[0]
+
+
+COMMON_CITIES = {
+    "Mumbai": "Mumbai, Maharashtra",
+    "Delhi": "Delhi, Delhi",
+    "Bangalore": "Bangalore, Karnataka",
+    "Chennai": "Chennai, Tamil Nadu",
+    "Kolkata": "Kolkata, West Bengal",
+    "Hyderabad": "Hyderabad, Telangana",
+    "Pune": "Pune, Maharashtra",
+    "Ahmedabad": "Ahmedabad, Gujarat",
+    "Jaipur": "Jaipur, Rajasthan",
+    "Lucknow": "Lucknow, Uttar Pradesh"
+}
+
+
+def format_location(location: str) -> str:
+    """
+    Normalize location format to 'City, State'
+    Args:
+        location: Free-form location string
+    Returns:
+        Location string in 'City, State' format
+    """
+    location = location.strip()
+    
+    # Known place (name, alias or "City, State") -> canonical gazetteer label;
+    # a low-confidence fuzzy match never replaces what the user typed
+    resolved = resolve_canonical(location)
+    if resolved:
+        return resolved["label"]
+    
+    if ',' not in location:
+        # Try to add state if not present
+        for city, full_location in COMMON_CITIES.items():
+            if city.lower() in location.lower():
+                return full_location
+        return f"{location}, India"
+    return location
+
+
 def normalize_location(location_string: str) -> Optional[Dict[str, str]]:
     """
     Normalize location string to extract city and state
@@ -36,6 +125,18 @@ def normalize_location(location_string: str) -> Optional[Dict[str, str]]:
     if not location_string:
         return None
 
+    resolved = resolve_canonical(location_string)
+    if resolved:
+        return {
+            "city": resolved["city"],
+            "state": resolved["state"],
+            "fullAddress": location_string,
+            "coordinates": {
+                "latitude": resolved["latitude"],
+                "longitude": resolved["longitude"]
+            }
+        }
+
     parts = [part.strip() for part in location_string.split(',')]
     
     if len(parts) >= 2:
@@ -54,6 +155,127 @@ def normalize_location(location_string: str) -> Optional[Dict[str, str]]:
     return None
 
 
+def location_key_part(part: str) -> str:
+    """
+    Canonical form of a city or state name used for indexed matching
+    Args:
+        part: City or state name
+    Returns:
+        Lowercased name with whitespace collapsed
+    """
+    return " ".join(part.lower().split())
+
+
+def location_keys(location_string: str) -> Dict[str, str]:
+    """
+    Extract indexed city/state keys from a "City, State" location string
+    Args:
+        location_string: Normalized location string
+    Returns:
+        Dict with "city" and "state" keys (empty strings if unknown)
+    """
+    if not location_string:
+        return {"city": "", "state": ""}
+
+    parts = [location_key_part(part) for part in location_string.split(',') if part.strip()]
+    if not parts:
+        return {"city": "", "state": ""}
+
+    return {"city": parts[0], "state": parts[-1]}
+
+
+def geo_point(location: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    GeoJSON point for a location, if it resolves confidently to a gazetteer place
+    Args:
+        location: Location string
+    Returns:
+        {"type": "Point", "coordinates": [longitude, latitude]} or None
+    """
+    resolved = resolve_canonical(location) if location else None
+    if not resolved:
+        return None
+    return {"type": "Point", "coordinates": [resolved["longitude"], resolved["latitude"]]}
+
+
+def location_match(location: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    Best gazetteer match for a stored location string
+    Args:
+        location: Location string as saved
+    Returns:
+        {"label", "score", "canonical"} or None. A non-canonical match was not
+        applied to the saved text and is only a suggestion.
+    """
+    resolved = resolve_location(location) if location else None
+    if not resolved:
+        return None
+    return {"label": resolved["label"], "score": resolved["score"], "canonical": resolved["canonical"]}
+
+
+def consignment_location_fields(origin: str, destination: str) -> Dict[str, Any]:
+    """
+    Pre-normalized location fields stored on a consignment at write time
+    Args:
+        origin: Normalized origin string
+        destination: Normalized destination string
+    Returns:
+        originCity/originState/destCity/destState keys, originGeo/destGeo points,
+        originMatch/destMatch gazetteer matches and the originCell used by
+        backhaul matching
+    """
+    origin_keys = location_keys(origin)
+    dest_keys = location_keys(destination)
+    origin_geo = geo_point(origin)
+    return {
+        "originCity": origin_keys["city"],
+        "originState": origin_keys["state"],
+        "destCity": dest_keys["city"],
+        "destState": dest_keys["state"],
+        "originGeo": origin_geo,
+        "destGeo": geo_point(destination),
+        "originMatch": location_match(origin),
+        "destMatch": location_match(destination),
+        "originCell": origin_cell(origin_geo)
+    }
+
+
+def user_location_fields(location: Optional[str]) -> Dict[str, Any]:
+    """
+    Pre-normalized location fields stored on a user at write time
+    Args:
+        location: Normalized user location string
+    Returns:
+        locationCity/locationState keys, locationGeo point and locationMatch
+    """
+    keys = location_keys(location or "")
+    return {
+        "locationCity": keys["city"],
+        "locationState": keys["state"],
+        "locationGeo": geo_point(location),
+        "locationMatch": location_match(location)
+    }
+
+
+def location_match_query(city: str, state: str) -> List[Dict[str, str]]:
+    """
+    MongoDB $or clauses matching consignments whose origin or destination
+    shares the given city or state (same rule as locations_match in the
+    consignments router, evaluated on indexed keys)
+    Args:
+        city: Canonical city key
+        state: Canonical state key
+    Returns:
+        List of clauses for an $or query
+    """
+    clauses = []
+    if city:
+        clauses += [{"originCity": city}, {"destCity": city}]
+    if state:
+        clauses += [{"originState": state}, {"destState": state}]
+    return clauses
+
+
 def locations_match(location1: Union[Dict, str], location2: Union[Dict, str], max_distance: float = 50) -> bool:
     """
     Check if two locations match (same city and state, or within specified radius)
@@ -95,26 +317,34 @@ def locations_match(location1: Union[Dict, str], location2: Union[Dict, str], ma
     return False
 
 
-def find_matching_msmes(consignment_origin: Union[Dict, str], users: List[Dict], max_distance: float = 50) -> List[Dict]:
+def find_matching_msmes(
+    consignment_origin: Union[Dict, str],
+    index: GeoGrid = msme_index,
+    max_distance: float = 50,
+    limit: Optional[int] = None
+) -> List[Dict]:
     """
-    Find MSMEs that match the consignment's origin location
+    Find MSMEs whose home base is near the consignment's origin
     Args:
         consignment_origin: Origin location of the consignment
-        users: Array of users from in-memory storage
+        index: Spatial index of MSME home bases
         max_distance: Maximum distance in km for matching
+        limit: Optional maximum number of MSMEs
     Returns:
-        Array of matching MSME users
+        Array of matching MSMEs (payload plus distanceKm), nearest first
     """
     try:
-        # Get all MSME users from the provided users array
-        msme_users = [user for user in users if user.get("userType") == "msme"]
-        
-        matching_msmes = [
-            user for user in msme_users 
-            if user.get("location") and locations_match(consignment_origin, user["location"], max_distance)
-        ]
-
-        return matching_msmes
+        origin = normalize_location(consignment_origin) if isinstance(consignment_origin, str) else consignment_origin
+        if not origin or not origin.get("coordinates"):
+            return []
+
+        matches = index.within(
+            origin["coordinates"]["latitude"],
+            origin["coordinates"]["longitude"],
+            max_distance,
+            limit=limit
+        )
+        return [dict(payload, distanceKm=distance) for _, distance, payload in matches]
     except Exception as error:
         print(f"Error finding matching MSMEs: {error}")
         return []
@@ -139,37 +369,34 @@ def get_matching_consignments(msme_location: Union[Dict, str], consignments: Lis
     ]
 
 
-def get_location_recommendations(msme_id: str, users: List[Dict]) -> Dict[str, List]:
+def get_location_recommendations(
+    msme_id: str,
+    index: GeoGrid = msme_index,
+    max_distance: float = 100,
+    limit: int = 5
+) -> Dict[str, List]:
     """
     Get location-based recommendations for MSMEs
     Args:
         msme_id: MSME user ID
-        users: Array of users from in-memory storage
+        index: Spatial index of MSME home bases
+        max_distance: Partnership radius in km
+        limit: Number of nearby partners
     Returns:
         Recommendations object
     """
     try:
-        msme = next((user for user in users if user.get("id") == msme_id), None)
-        if not msme or msme.get("userType") != "msme" or not msme.get("location"):
+        msme = index.get(msme_id)
+        if not msme:
             return {"matchingConsignments": [], "nearbyMSMEs": []}
 
-        # Find nearby MSMEs (for potential partnerships)
-        nearby_msmes = [
-            user for user in users
-            if user.get("userType") == "msme" and 
-            user.get("id") != msme_id and 
-            user.get("location")
-        ]
-
-        nearby_partners = [
-            user for user in nearby_msmes
-            if locations_match(msme["location"], user["location"], 100)  # 100km radius for partnerships
-        ]
+        latitude, longitude, _ = msme
+        nearby_partners = index.nearest(latitude, longitude, limit, max_distance_km=max_distance, exclude=msme_id)
 
         return {
             "matchingConsignments": [],  # Will be populated by the calling function
-            "nearbyMSMEs": nearby_partners[:5]  # Top 5 nearby partners
+            "nearbyMSMEs": [dict(payload, distanceKm=distance) for _, distance, payload in nearby_partners]
         }
     except Exception as error:
         print(f"Error getting location recommendations: {error}")
-        return {"matchingConsignments": [], "nearbyMSMEs": []} 
\ No newline at end of file
+        return {"matchingConsignments": [], "nearbyMSMEs": []}
@@ -0,0 +1,319 @@
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+from functools import lru_cache
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+from utils.gazetteer import GAZETTEER_PATH, Place, artifact_path, load_places, name_key
+from utils.fuzzy_location import STATE_ALIASES, get_trigram_index
+
+# Binary gazetteer layout (little-endian):
+#   header  | slots (hash -> place index, open addressing) | records | string pool
+# Records are fixed size so a place is read straight out of the mapping; every
+# worker maps the same file, so the OS page cache holds one shared copy.
+# States are keyed as "|state" and point at that state's largest place.
+MAGIC = b"LLGZ"
+VERSION = 2
+HEADER = struct.Struct("<4sHHIII")   # magic, version, reserved, place count, slot count, strings size
+SLOT = struct.Struct("<QI")          # key hash (0 = empty), place index
+RECORD = struct.Struct("<ffIIIHH")   # lat, lon, population, name offset, state offset, name len, state len
+
+# Lookup keys are normalized gazetteer names
+location_key = name_key
+
+
+def key_hash(key: str) -> int:
+    """Stable 64-bit hash of a lookup key (0 is reserved for empty slots)"""
+    value = int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+    return value or 1
+
+
+def place_keys(place: Place) -> List[str]:
+    """Lookup keys for a place: name and aliases, alone and qualified by state"""
+    state = location_key(place.state)
+    keys = []
+    for label in (place.name,) + place.aliases:
+        key = location_key(label)
+        if key:
+            keys += [key, f"{key}|{state}"]
+    return keys
+
+
+def compile_gazetteer(places: List[Place], output_path: str) -> None:
+    """
+    Write places to the binary gazetteer format
+    Args:
+        places: Places to index
+        output_path: Destination file (written atomically)
+    """
+    # Bigger places claim ambiguous names first (e.g. "Aurangabad")
+    order = sorted(range(len(places)), key=lambda i: -places[i].population)
+
+    pool = bytearray()
+    offsets = {}
+
+    def intern(text: str):
+        if text not in offsets:
+            data = text.encode("utf-8")
+            offsets[text] = (len(pool), len(data))
+            pool.extend(data)
+        return offsets[text]
+
+    records = bytearray()
+    for place in places:
+        name_offset, name_length = intern(place.name)
+        state_offset, state_length = intern(place.state)
+        records += RECORD.pack(
+            place.latitude, place.longitude, place.population,
+            name_offset, state_offset, name_length, state_length
+        )
+
+    entries = {}
+    for place_index in order:
+        for key in place_keys(places[place_index]):
+            entries.setdefault(key_hash(key), place_index)
+        if places[place_index].state:
+            entries.setdefault(key_hash(f"|{location_key(places[place_index].state)}"), place_index)
+
+    slot_count = 1
+    while slot_count < len(entries) * 2:
+        slot_count *= 2
+    slots = [(0, 0)] * slot_count
+    for hashed, place_index in entries.items():
+        slot = hashed & (slot_count - 1)
+        while slots[slot][0]:
+            slot = (slot + 1) & (slot_count - 1)
+        slots[slot] = (hashed, place_index)
+
+    directory = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, 0, len(places), slot_count, len(pool)))
+            for hashed, place_index in slots:
+                f.write(SLOT.pack(hashed, place_index))
+            f.write(records)
+            f.write(pool)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, output_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+class MappedGazetteer:
+    """Read-only, memory-mapped view of a compiled gazetteer"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, self.place_count, self.slot_count, _ = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Unsupported gazetteer file: {path}")
+        self._slots_offset = HEADER.size
+        self._records_offset = self._slots_offset + self.slot_count * SLOT.size
+        self._strings_offset = self._records_offset + self.place_count * RECORD.size
+
+    def __len__(self) -> int:
+        return self.place_count
+
+    def find(self, key: str) -> Optional[int]:
+        """
+        Find the place index for a lookup key
+        Args:
+            key: Key built with location_key (optionally "city|state")
+        Returns:
+            Place index or None
+        """
+        hashed = key_hash(key)
+        mask = self.slot_count - 1
+        slot = hashed & mask
+        while True:
+            stored, place_index = SLOT.unpack_from(self._map, self._slots_offset + slot * SLOT.size)
+            if stored == hashed:
+                return place_index
+            if stored == 0:
+                return None
+            slot = (slot + 1) & mask
+
+    def state(self, state_key: str) -> Optional[str]:
+        """
+        Canonical name of a state given its exact normalized name
+        Args:
+            state_key: Key built with location_key ("maharashtra")
+        Returns:
+            State name or None
+        """
+        place_index = self.find(f"|{state_key}")
+        return None if place_index is None else self.place(place_index)["state"]
+
+    def _string(self, offset: int, length: int) -> str:
+        start = self._strings_offset + offset
+        return self._map[start:start + length].decode("utf-8")
+
+    def place(self, place_index: int) -> Dict[str, Any]:
+        """
+        Read one place record
+        Args:
+            place_index: Index returned by find
+        Returns:
+            Dict with placeIndex, city, state, latitude, longitude, population and label
+        """
+        lat, lon, population, name_offset, state_offset, name_length, state_length = RECORD.unpack_from(
+            self._map, self._records_offset + place_index * RECORD.size
+        )
+        city = self._string(name_offset, name_length)
+        state = self._string(state_offset, state_length)
+        return {
+            "placeIndex": place_index,
+            "city": city,
+            "state": state,
+            "label": f"{city}, {state}",
+            "latitude": round(lat, 5),
+            "longitude": round(lon, 5),
+            "population": population
+        }
+
+
+def compiled_path(source_path: str = GAZETTEER_PATH) -> str:
+    """Location of the compiled gazetteer for a TSV source"""
+    return artifact_path(source_path, ".bin")
+
+
+def _compiled_version(path: str) -> Optional[int]:
+    try:
+        with open(path, "rb") as f:
+            magic, version = HEADER.unpack(f.read(HEADER.size))[:2]
+    except (OSError, struct.error):
+        return None
+    return version if magic == MAGIC else None
+
+
+def ensure_compiled(source_path: str = GAZETTEER_PATH) -> str:
+    """
+    Compile the gazetteer if the binary is missing, older than the TSV or
+    in an older format
+    Returns:
+        Path of the compiled file
+    """
+    output_path = compiled_path(source_path)
+    if (not os.path.exists(output_path) or
+            os.path.getmtime(output_path) < os.path.getmtime(source_path) or
+            _compiled_version(output_path) != VERSION):
+        compile_gazetteer(load_places(source_path), output_path)
+        print(f"📍 Compiled gazetteer to {output_path}")
+    return output_path
+
+
+_gazetteer: Optional[MappedGazetteer] = None
+_gazetteer_lock = Lock()
+
+
+def get_mapped_gazetteer() -> MappedGazetteer:
+    """Get the shared memory-mapped gazetteer, compiling it on first use"""
+    global _gazetteer
+    if _gazetteer is None:
+        with _gazetteer_lock:
+            if _gazetteer is None:
+                _gazetteer = MappedGazetteer(ensure_compiled())
+    return _gazetteer
+
+
+@lru_cache(maxsize=1024)
+def resolve_state(state_key: str) -> Optional[str]:
+    """
+    Map a state name, abbreviation or misspelling to a gazetteer state
+    Args:
+        state_key: Normalized state text ("maharashtra", "mh", "maharastra")
+    Returns:
+        Canonical state name or None
+    """
+    if not state_key:
+        return None
+    state = get_mapped_gazetteer().state(state_key) or STATE_ALIASES.get(state_key)
+    # Only misspellings need the trigram index (built on first use)
+    return state or get_trigram_index().resolve_state(state_key)
+
+
+@lru_cache(maxsize=8192)
+def _resolve(city_key: str, state_key: str) -> Optional[Dict[str, Any]]:
+    gazetteer = get_mapped_gazetteer()
+    if state_key:
+        place_index = gazetteer.find(f"{city_key}|{state_key}")
+        if place_index is not None:
+            return dict(gazetteer.place(place_index), score=1.0, canonical=True)
+
+    place_index = gazetteer.find(city_key)
+    if place_index is not None:
+        place = gazetteer.place(place_index)
+        # A city-only hit must not contradict an explicitly given state ("MH" is fine)
+        if not state_key or location_key(place["state"]) == state_key:
+            return dict(place, score=1.0, canonical=True)
+        state = resolve_state(state_key)
+        if state == place["state"]:
+            return dict(place, score=1.0, canonical=True)
+        if state:
+            return None
+
+    # Misspellings ("Ahmdabad", "Vishakapatnam") fall back to trigram similarity
+    match = get_trigram_index().best(city_key, state_key)
+    if not match:
+        return None
+    place_index, score, canonical = match
+    return dict(gazetteer.place(place_index), score=score, canonical=canonical)
+
+
+def resolve_location(location: str) -> Optional[Dict[str, Any]]:
+    """
+    Resolve a free-form location ("Bombay", "Pune, MH", "Ahmdabad") to a gazetteer place
+    Args:
+        location: Location string
+    Returns:
+        Copy of the place dict (placeIndex, city, state, label, latitude, longitude, score,
+        canonical) or None; score is 1.0 for exact name/alias hits and the trigram
+        similarity otherwise. Only canonical matches may replace the input when saving;
+        the rest are suggestions (see resolve_canonical).
+    """
+    if not location:
+        return None
+    parts = [part for part in location.split(",") if location_key(part) not in ("", "india")]
+    if not parts:
+        return None
+    state_key = location_key(parts[-1]) if len(parts) > 1 else ""
+    # "Gurgaon/Gurugram": try each spelling, best score wins
+    best = None
+    for city in parts[0].split("/"):
+        city_key = location_key(city)
+        resolved = _resolve(city_key, state_key) if city_key else None
+        if resolved and (not best or resolved["score"] > best["score"]):
+            best = resolved
+    return dict(best) if best else None
+
+
+def resolve_canonical(location: str) -> Optional[Dict[str, Any]]:
+    """
+    Resolve a location only if the match is safe to store in its place
+    Args:
+        location: Location string
+    Returns:
+        Place dict for exact hits and near-certain fuzzy ones, otherwise None
+    """
+    resolved = resolve_location(location)
+    return resolved if resolved and resolved["canonical"] else None
+
+
+def suggest_locations(text: str, limit: int = 5) -> List[Tuple[Place, float]]:
+    """
+    Close spellings for text that misses every exact name and prefix
+    Args:
+        text: Raw user input ("ahmdabad", "vishakapatnam, ap")
+        limit: Maximum number of results
+    Returns:
+        List of (place, score) ordered best first
+    """
+    city, _, state = text.partition(",")
+    return get_trigram_index().search(location_key(city), limit, resolve_state(location_key(state)))
@@ -0,0 +1,120 @@
+import base64
+import json
+from typing import Any, Dict, List, Optional, Tuple
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException, status
+
+# List endpoints return newest first; _id breaks ties between equal timestamps
+SORT_ORDER = [("createdAt", -1), ("_id", -1)]
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# totalEstimate stops counting here so it never turns into a full count
+TOTAL_ESTIMATE_CAP = 10000
+
+# Cursor values end up in query clauses; anything else (e.g. {"$ne": null}) is rejected
+CURSOR_VALUE_TYPES = (str, int, float, bool, type(None))
+
+
+def encode_cursor(document: Dict[str, Any], sort: List[Tuple[str, int]] = SORT_ORDER) -> str:
+    """
+    Encode the keyset position of a document as an opaque cursor
+    Args:
+        document: Last document of the current page
+        sort: Sort order of the page, ending with _id
+    Returns:
+        URL-safe cursor string
+    """
+    values = [document.get(field) for field, _ in sort[:-1]]
+    raw = json.dumps(values + [str(document["_id"])], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: List[Tuple[str, int]] = SORT_ORDER) -> Tuple[Any, ...]:
+    """
+    Decode a cursor produced by encode_cursor
+    Args:
+        cursor: Opaque cursor from a previous page
+        sort: Sort order the cursor was encoded with
+    Returns:
+        Sort key values of the last document on the previous page, _id last
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != len(sort):
+            raise ValueError("cursor does not match the sort order")
+        if not all(isinstance(value, CURSOR_VALUE_TYPES) for value in values):
+            raise ValueError("cursor values must be scalars")
+        return tuple(values[:-1]) + (ObjectId(values[-1]),)
+    except (ValueError, TypeError, InvalidId):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+def apply_cursor(
+    query: Dict[str, Any],
+    cursor: Optional[str],
+    sort: List[Tuple[str, int]] = SORT_ORDER
+) -> Dict[str, Any]:
+    """
+    Restrict a query to documents after the cursor position
+    Args:
+        query: Base MongoDB filter
+        cursor: Opaque cursor or None for the first page
+        sort: Sort order of the pages, ending with _id
+    Returns:
+        Filter for the requested page
+    """
+    if not cursor:
+        return query
+
+    values = decode_cursor(cursor, sort)
+    # (a, b, _id) > (x, y, z) expands to: a > x, or a = x and b > y, or ...
+    branches = []
+    for position, (field, direction) in enumerate(sort):
+        branch = {sort[i][0]: values[i] for i in range(position)}
+        branch[field] = {"$lt" if direction < 0 else "$gt": values[position]}
+        branches.append(branch)
+    after_cursor = {"$or": branches}
+    return {"$and": [query, after_cursor]} if query else after_cursor
+
+
+async def paginate(
+    collection,
+    query: Dict[str, Any],
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    projection: Optional[Dict[str, Any]] = None,
+    sort: List[Tuple[str, int]] = SORT_ORDER
+) -> Tuple[List[Dict[str, Any]], Optional[str], Optional[int]]:
+    """
+    Fetch one page of documents in keyset order (newest first by default)
+    Args:
+        collection: Motor collection
+        query: MongoDB filter
+        limit: Page size
+        cursor: Cursor returned with the previous page
+        projection: Optional MongoDB projection
+        sort: Sort order ending with _id (every field must be present on the documents)
+    Returns:
+        (documents, next cursor or None, totalEstimate on the first page)
+    """
+    find_cursor = collection.find(apply_cursor(query, cursor, sort), projection).sort(sort)
+
+    # Fetch one extra document to know whether another page exists
+    documents = await find_cursor.limit(limit + 1).to_list(length=limit + 1)
+
+    has_more = len(documents) > limit
+    documents = documents[:limit]
+    next_cursor = encode_cursor(documents[-1], sort) if has_more and documents else None
+
+    total_estimate = None
+    if cursor is None:
+        total_estimate = await collection.count_documents(query, limit=TOTAL_ESTIMATE_CAP)
+
+    return documents, next_cursor, total_estimate
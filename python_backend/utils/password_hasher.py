@@ -0,0 +1,118 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+import bcrypt
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt hashing and verification on a bounded thread pool.
+
+    bcrypt releases the GIL while it works, so a small thread pool keeps the
+    event loop responsive during login bursts without the start-up and
+    pickling cost of a process pool. A semaphore caps how many hashes run at
+    once; callers above the cap queue up and are counted in ``queued``.
+    """
+
+    def __init__(self, rounds: int = 12, max_concurrency: int = 4):
+        """
+        Args:
+            rounds: bcrypt work factor used for new hashes; stored hashes
+                with a different factor are upgraded on the next login
+            max_concurrency: Maximum number of hashes computed at once
+        """
+        if not 4 <= rounds <= 31:
+            raise ValueError("bcrypt rounds must be between 4 and 31")
+        self.rounds = rounds
+        self.max_concurrency = max_concurrency
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.rehashed = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrency,
+                thread_name_prefix="bcrypt"
+            )
+        return self._executor
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    def hash_sync(self, password: str) -> str:
+        """Hash a password using bcrypt (blocking)"""
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
+        return hashed.decode('utf-8')
+
+    def verify_sync(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password against its hash (blocking)"""
+        return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """
+        Check whether a stored hash uses a different work factor
+        Args:
+            hashed_password: Stored bcrypt hash ("$2b$<cost>$...")
+        Returns:
+            True if the hash should be recomputed with the current rounds
+        """
+        try:
+            return int(hashed_password.split("$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    async def _run(self, func, *args) -> Any:
+        self.queued += 1
+        waiting = True
+        try:
+            async with self._get_semaphore():
+                self.queued -= 1
+                waiting = False
+                self.running += 1
+                try:
+                    loop = asyncio.get_running_loop()
+                    return await loop.run_in_executor(self._get_executor(), func, *args)
+                finally:
+                    self.running -= 1
+                    self.completed += 1
+        finally:
+            # Cancelled while still waiting for a slot
+            if waiting:
+                self.queued -= 1
+
+    async def hash(self, password: str) -> str:
+        """Hash a password without blocking the event loop"""
+        return await self._run(self.hash_sync, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password without blocking the event loop"""
+        return await self._run(self.verify_sync, plain_password, hashed_password)
+
+    def shutdown(self) -> None:
+        """Stop the worker threads"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get executor statistics
+        Returns:
+            Work factor, concurrency cap and queue depth
+        """
+        return {
+            "rounds": self.rounds,
+            "maxConcurrency": self.max_concurrency,
+            "queued": self.queued,
+            "running": self.running,
+            "completed": self.completed,
+            "rehashed": self.rehashed
+        }
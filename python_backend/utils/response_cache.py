@@ -0,0 +1,86 @@
+import hashlib
+from typing import Any, Dict, Hashable, Optional, Tuple
+from utils.cache import TTLCache
+
+
+class ResponseCache:
+    """
+    Cache of pre-serialized response bodies with strong ETags.
+
+    Writers call ``invalidate()`` whenever the underlying data changes. Each
+    invalidation bumps a generation counter, so a body built from data read
+    before the invalidation is never stored. The TTL bounds staleness for
+    changes made by other worker processes, which this cache can't observe.
+    """
+
+    def __init__(self, max_size: int = 256, ttl: float = 30, name: str = "responses"):
+        """
+        Args:
+            max_size: Maximum number of cached bodies
+            ttl: Seconds a body may be served without an invalidation
+            name: Name used when reporting stats
+        """
+        self._cache = TTLCache(max_size=max_size, ttl=ttl, name=name)
+        self.generation = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_etag(body: bytes) -> str:
+        """Strong ETag derived from the body bytes"""
+        return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+    def get(self, key: Hashable) -> Optional[Tuple[bytes, str]]:
+        """
+        Get a cached body
+        Args:
+            key: Cache key (e.g. query parameters)
+        Returns:
+            (body, etag) or None on a miss
+        """
+        return self._cache.get(key)
+
+    def set(self, key: Hashable, body: bytes, generation: int) -> str:
+        """
+        Store a body unless the data changed while it was being built
+        Args:
+            key: Cache key
+            body: Serialized response body
+            generation: Value of ``generation`` read before querying the data
+        Returns:
+            ETag of the body
+        """
+        etag = self.make_etag(body)
+        if generation == self.generation:
+            self._cache.set(key, (body, etag))
+        return etag
+
+    def invalidate(self) -> None:
+        """Drop every cached body"""
+        self.generation += 1
+        self.invalidations += 1
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+        Returns:
+            Hit/miss counters and invalidation count
+        """
+        stats = self._cache.stats()
+        stats["invalidations"] = self.invalidations
+        return stats
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag
+    Args:
+        if_none_match: Raw header value (may list several tags or be "*")
+        etag: Current strong ETag
+    Returns:
+        True if the client already has this representation
+    """
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
@@ -0,0 +1,282 @@
+import math
+from threading import Lock
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from utils.distances import EARTH_RADIUS_KM, distances_from
+
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+# Grid cell size in degrees (~28 km of latitude), roughly a geohash-5 cell
+DEFAULT_CELL_DEGREES = 0.25
+
+
+def grid_cell(latitude: float, longitude: float, cell_degrees: float = DEFAULT_CELL_DEGREES) -> Tuple[int, int]:
+    """Grid cell (row, column) containing a point"""
+    return (math.floor(latitude / cell_degrees), math.floor(longitude / cell_degrees))
+
+
+def cells_within(
+    latitude: float,
+    longitude: float,
+    radius_km: float,
+    cell_degrees: float = DEFAULT_CELL_DEGREES
+) -> List[Tuple[int, int]]:
+    """
+    Grid cells overlapping the bounding box of a circle
+    Args:
+        latitude: Circle centre latitude
+        longitude: Circle centre longitude
+        radius_km: Circle radius in km
+        cell_degrees: Grid cell size
+    Returns:
+        List of (row, column) cells
+    """
+    lat_span = radius_km / KM_PER_DEGREE
+    max_lat = min(89.9, abs(latitude) + lat_span)
+    lon_span = min(180.0, radius_km / (KM_PER_DEGREE * math.cos(math.radians(max_lat))))
+    min_i, min_j = grid_cell(latitude - lat_span, longitude - lon_span, cell_degrees)
+    max_i, max_j = grid_cell(latitude + lat_span, longitude + lon_span, cell_degrees)
+    return [(i, j) for i in range(min_i, max_i + 1) for j in range(min_j, max_j + 1)]
+
+
+class GeoGrid:
+    """
+    In-memory spatial index over points on a uniform lat/lon grid.
+
+    Points are bucketed by cell, so a radius query only measures points in
+    the cells overlapping the query's bounding box, and a k-nearest query
+    walks rings of cells outwards until no unvisited cell can hold a closer
+    point. Upserts and removals are O(1), which keeps the index current as
+    users register or move.
+    """
+
+    def __init__(self, cell_degrees: float = DEFAULT_CELL_DEGREES):
+        self.cell_degrees = cell_degrees
+        self._cells: Dict[Tuple[int, int], Dict[str, Tuple[float, float]]] = {}
+        self._items: Dict[str, Tuple[float, float, Any]] = {}
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._items
+
+    def _cell(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        return grid_cell(latitude, longitude, self.cell_degrees)
+
+    def get(self, item_id: str) -> Optional[Tuple[float, float, Any]]:
+        """Stored (latitude, longitude, payload) for an item"""
+        return self._items.get(item_id)
+
+    def upsert(self, item_id: str, latitude: float, longitude: float, payload: Any = None) -> None:
+        """
+        Add an item or move it to a new position
+        Args:
+            item_id: Unique item id (e.g. user id)
+            latitude: Latitude in degrees
+            longitude: Longitude in degrees
+            payload: Data returned with query results
+        """
+        with self._lock:
+            self._remove(item_id)
+            self._items[item_id] = (latitude, longitude, payload)
+            self._cells.setdefault(self._cell(latitude, longitude), {})[item_id] = (latitude, longitude)
+
+    def remove(self, item_id: str) -> bool:
+        """Remove an item; returns True if it was indexed"""
+        with self._lock:
+            return self._remove(item_id)
+
+    def _remove(self, item_id: str) -> bool:
+        existing = self._items.pop(item_id, None)
+        if existing is None:
+            return False
+        cell = self._cell(existing[0], existing[1])
+        bucket = self._cells.get(cell)
+        if bucket is not None:
+            bucket.pop(item_id, None)
+            if not bucket:
+                del self._cells[cell]
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cells.clear()
+            self._items.clear()
+
+    def _measure(self, cells: Iterator[Tuple[int, int]], latitude: float, longitude: float) -> List[Tuple[float, str]]:
+        item_ids, latitudes, longitudes = [], [], []
+        with self._lock:
+            for cell in cells:
+                bucket = self._cells.get(cell)
+                if bucket:
+                    for item_id, (lat, lon) in bucket.items():
+                        item_ids.append(item_id)
+                        latitudes.append(lat)
+                        longitudes.append(lon)
+        if not item_ids:
+            return []
+        # One vectorized haversine over every candidate in the visited cells
+        distances = distances_from(latitude, longitude, latitudes, longitudes).tolist()
+        return list(zip(distances, item_ids))
+
+    def _results(self, found: List[Tuple[float, str]]) -> List[Tuple[str, float, Any]]:
+        results = []
+        for distance, item_id in found:
+            item = self._items.get(item_id)
+            if item is not None:
+                results.append((item_id, round(distance, 2), item[2]))
+        return results
+
+    def within(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_km: float,
+        limit: Optional[int] = None
+    ) -> List[Tuple[str, float, Any]]:
+        """
+        Items within a radius, nearest first
+        Args:
+            latitude: Query latitude
+            longitude: Query longitude
+            radius_km: Search radius in km
+            limit: Optional maximum number of results
+        Returns:
+            List of (item id, distance km, payload)
+        """
+        cells = cells_within(latitude, longitude, radius_km, self.cell_degrees)
+        found = [entry for entry in self._measure(iter(cells), latitude, longitude) if entry[0] <= radius_km]
+        found.sort()
+        return self._results(found[:limit] if limit else found)
+
+    def nearest(
+        self,
+        latitude: float,
+        longitude: float,
+        k: int,
+        max_distance_km: Optional[float] = None,
+        exclude: Optional[str] = None
+    ) -> List[Tuple[str, float, Any]]:
+        """
+        k nearest items, optionally capped by distance
+        Args:
+            latitude: Query latitude
+            longitude: Query longitude
+            k: Number of items
+            max_distance_km: Optional distance cap
+            exclude: Optional item id to skip (e.g. the querying user)
+        Returns:
+            List of (item id, distance km, payload), nearest first
+        """
+        if not self._items or k <= 0:
+            return []
+
+        center_i, center_j = self._cell(latitude, longitude)
+        max_ring = int(360 / self.cell_degrees)
+        found: List[Tuple[float, str]] = []
+        ring = 0
+        while ring <= max_ring:
+            if ring == 0:
+                cells = iter([(center_i, center_j)])
+            else:
+                cells = (
+                    (i, j)
+                    for i in range(center_i - ring, center_i + ring + 1)
+                    for j in range(center_j - ring, center_j + ring + 1)
+                    if abs(i - center_i) == ring or abs(j - center_j) == ring
+                )
+            found.extend(entry for entry in self._measure(cells, latitude, longitude) if entry[1] != exclude)
+            found.sort()
+
+            # Anything outside the rings visited so far is at least this far away
+            edge_lat = min(89.9, abs(latitude) + (ring + 1) * self.cell_degrees)
+            reach = ring * self.cell_degrees * KM_PER_DEGREE * math.cos(math.radians(edge_lat))
+            if len(found) >= k and found[k - 1][0] <= reach:
+                break
+            if max_distance_km is not None and reach > max_distance_km:
+                break
+            if len(found) >= len(self._items) - (1 if exclude in self._items else 0):
+                break
+            ring += 1
+
+        if max_distance_km is not None:
+            found = [entry for entry in found if entry[0] <= max_distance_km]
+        return self._results(found[:k])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "items": len(self._items),
+            "cells": len(self._cells),
+            "cellDegrees": self.cell_degrees
+        }
+
+
+def user_point(user: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+    """(latitude, longitude) from a user's locationGeo point, if present"""
+    geo = user.get("locationGeo")
+    if not geo or not geo.get("coordinates"):
+        return None
+    longitude, latitude = geo["coordinates"][:2]
+    return latitude, longitude
+
+
+def msme_payload(user: Dict[str, Any]) -> Dict[str, Any]:
+    """Public fields returned for an indexed MSME"""
+    return {
+        "id": str(user.get("_id", user.get("id"))),
+        "name": user.get("name"),
+        "companyName": user.get("companyName"),
+        "location": user.get("location"),
+        "fleetSize": user.get("fleetSize"),
+        "vehicleTypes": user.get("vehicleTypes") or []
+    }
+
+
+# Projection for loading MSMEs into the index
+MSME_INDEX_PROJECTION = {
+    "name": 1, "companyName": 1, "location": 1, "fleetSize": 1,
+    "vehicleTypes": 1, "locationGeo": 1, "userType": 1, "updatedAt": 1, "createdAt": 1
+}
+
+# MSME home bases, shared by the matching and nearby-partner endpoints
+msme_index = GeoGrid()
+
+
+def index_user(user: Dict[str, Any], index: GeoGrid = msme_index) -> None:
+    """
+    Add, move or drop a user in the MSME index after a write
+    Args:
+        user: User document (needs _id or id, userType and locationGeo)
+        index: Index to update
+    """
+    user_id = str(user.get("_id", user.get("id")))
+    point = user_point(user)
+    if user.get("userType") != "msme" or not point:
+        index.remove(user_id)
+        return
+    index.upsert(user_id, point[0], point[1], msme_payload(user))
+
+
+async def sync_msme_index(users_collection, since: Optional[str] = None, index: GeoGrid = msme_index) -> Optional[str]:
+    """
+    Load MSMEs into the index (all of them, or only those changed since a timestamp)
+    Args:
+        users_collection: Users collection
+        since: ISO timestamp of the previous sync, None for a full load
+        index: Index to update
+    Returns:
+        Newest updatedAt/createdAt seen, to pass as ``since`` next time
+    """
+    query: Dict[str, Any] = {"userType": "msme"}
+    if since:
+        query["updatedAt"] = {"$gte": since}
+
+    latest = since
+    cursor = users_collection.find(query, MSME_INDEX_PROJECTION).batch_size(1000)
+    async for user in cursor:
+        index_user(user, index)
+        stamp = user.get("updatedAt") or user.get("createdAt")
+        if isinstance(stamp, str) and (latest is None or stamp > latest):
+            latest = stamp
+    return latest
@@ -0,0 +1,165 @@
+import html
+import re
+from typing import Any, Dict, List, Optional, Tuple
+from utils.pagination import apply_cursor
+
+# Relative weight of each field in the consignment text index (title hits rank higher)
+TEXT_WEIGHTS = {"title": 10, "description": 2}
+
+TEXT_LANGUAGE = "english"
+
+# Keyset order of search pages: most relevant first, _id breaks ties
+SEARCH_ORDER = [("score", -1), ("_id", -1)]
+
+# Characters of context kept around each highlighted description match
+FRAGMENT_CHARS = 120
+MAX_FRAGMENTS = 2
+
+_TOKEN = re.compile(r"\w+")
+_QUERY_PART = re.compile(r'"([^"]*)"|(\S+)')
+
+# Suffixes dropped before prefix matching, a rough stand-in for the index's stemmer
+_SUFFIXES = ("ing", "ies", "es", "ed", "ly", "s")
+
+
+def term_root(term: str) -> str:
+    """Lowercased term with a common English suffix removed (kept if that leaves < 3 letters)"""
+    term = term.lower()
+    for suffix in _SUFFIXES:
+        if term.endswith(suffix) and len(term) - len(suffix) >= 3:
+            return term[:-len(suffix)]
+    return term
+
+
+def search_terms(query: str) -> List[str]:
+    """
+    Roots of the words a $text query matches on
+    Args:
+        query: Search string ("fragile electronics", quoted phrases, -negations)
+    Returns:
+        Distinct term roots, negated words excluded
+    """
+    roots: List[str] = []
+    for phrase, word in _QUERY_PART.findall(query):
+        if word.startswith("-"):
+            continue
+        for token in _TOKEN.findall(phrase or word):
+            root = term_root(token)
+            if root not in roots:
+                roots.append(root)
+    return roots
+
+
+def _matches(text: str, roots: List[str]) -> List[Tuple[int, int]]:
+    return [
+        match.span() for match in _TOKEN.finditer(text)
+        if any(match.group().lower().startswith(root) for root in roots)
+    ]
+
+
+def mark_terms(text: str, roots: List[str], spans: Optional[List[Tuple[int, int]]] = None) -> str:
+    """
+    HTML-escape text and wrap every matching word in <mark>
+    Args:
+        text: Field value
+        roots: Roots from search_terms
+        spans: Precomputed match spans (offsets into text)
+    Returns:
+        Escaped text with highlighted matches
+    """
+    parts = []
+    position = 0
+    for start, end in (_matches(text, roots) if spans is None else spans):
+        parts.append(html.escape(text[position:start]))
+        parts.append(f"<mark>{html.escape(text[start:end])}</mark>")
+        position = end
+    parts.append(html.escape(text[position:]))
+    return "".join(parts)
+
+
+def highlight(
+    text: str,
+    roots: List[str],
+    fragment_chars: int = FRAGMENT_CHARS,
+    max_fragments: int = MAX_FRAGMENTS
+) -> List[str]:
+    """
+    Short highlighted fragments around the matches in a long field
+    Args:
+        text: Field value
+        roots: Roots from search_terms
+        fragment_chars: Approximate fragment length
+        max_fragments: Maximum fragments returned
+    Returns:
+        Escaped fragments with <mark> tags ("…" where text was cut), empty if nothing matched
+    """
+    spans = _matches(text or "", roots)
+    fragments = []
+    covered_until = -1
+    for start, end in spans:
+        if start < covered_until:
+            continue
+        if len(fragments) == max_fragments:
+            break
+        begin = max(0, start - fragment_chars // 3)
+        finish = min(len(text), begin + fragment_chars)
+        # Snap to word boundaries so fragments don't open or close mid-word
+        if begin > 0:
+            space = text.find(" ", begin, start)
+            begin = space + 1 if space != -1 else begin
+        if finish < len(text):
+            space = text.rfind(" ", end, finish)
+            finish = space if space != -1 else finish
+        inner = [(s - begin, e - begin) for s, e in spans if s >= begin and e <= finish]
+        fragment = mark_terms(text[begin:finish], roots, inner)
+        fragments.append(("…" if begin > 0 else "") + fragment + ("…" if finish < len(text) else ""))
+        covered_until = finish
+    return fragments
+
+
+def search_highlights(document: Dict[str, Any], roots: List[str]) -> Dict[str, List[str]]:
+    """
+    Highlights for a consignment search result
+    Args:
+        document: Consignment with title and description
+        roots: Roots from search_terms
+    Returns:
+        Field name -> highlighted fragments, for fields that matched
+    """
+    highlights = {}
+    title = document.get("title") or ""
+    if _matches(title, roots):
+        highlights["title"] = [mark_terms(title, roots)]
+    fragments = highlight(document.get("description") or "", roots)
+    if fragments:
+        highlights["description"] = fragments
+    return highlights
+
+
+def text_search_pipeline(
+    query: str,
+    scope: Dict[str, Any],
+    limit: int,
+    cursor: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Aggregation for one page of ranked text search results
+    Args:
+        query: $text search string
+        scope: Extra equality filters (companyId, status)
+        limit: Page size (one extra document is fetched to detect a next page)
+        cursor: Cursor from the previous page (encoded with SEARCH_ORDER)
+    Returns:
+        Pipeline: text match, textScore as "score", keyset, sort, limit
+    """
+    pipeline: List[Dict[str, Any]] = [
+        {"$match": {"$text": {"$search": query}, **scope}},
+        {"$addFields": {"score": {"$meta": "textScore"}}},
+    ]
+    if cursor:
+        pipeline.append({"$match": apply_cursor({}, cursor, SEARCH_ORDER)})
+    pipeline += [
+        {"$sort": {"score": -1, "_id": -1}},
+        {"$limit": limit + 1},
+    ]
+    return pipeline
@@ -0,0 +1,68 @@
+import hashlib
+import time
+from typing import Any, Callable, Dict
+from utils.cache import TTLCache
+
+
+class VerifiedTokenCache:
+    """
+    Caches the payloads of tokens that already passed signature verification.
+
+    Entries are keyed by the SHA-256 digest of the raw token (the token itself
+    is never stored) and expire exactly at the token's ``exp`` claim, so a
+    cached token can never outlive its signature check. Decode times on misses
+    are tracked to estimate how much CPU the hits saved.
+    """
+
+    def __init__(self, decode: Callable[[str], Dict[str, Any]], max_size: int = 10000):
+        """
+        Args:
+            decode: Function that fully verifies a token and returns its payload
+            max_size: Maximum number of verified tokens kept in memory
+        """
+        self._decode = decode
+        self._cache = TTLCache(max_size=max_size, name="tokens")
+        self._decode_seconds = 0.0
+        self._decode_count = 0
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        """
+        Decode a token, verifying it only if it is not already cached
+        Args:
+            token: Encoded JWT
+        Returns:
+            Copy of the verified payload
+        """
+        key = self._digest(token)
+        payload = self._cache.get(key)
+        if payload is None:
+            started = time.perf_counter()
+            payload = self._decode(token)
+            self._decode_seconds += time.perf_counter() - started
+            self._decode_count += 1
+
+            exp = payload.get("exp")
+            if isinstance(exp, (int, float)):
+                self._cache.set(key, payload, expires_at=float(exp))
+
+        return dict(payload)
+
+    def clear(self) -> None:
+        """Forget every verified token"""
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+        Returns:
+            Hit/miss counters plus the estimated CPU time saved by hits
+        """
+        stats = self._cache.stats()
+        avg_decode = self._decode_seconds / self._decode_count if self._decode_count else 0.0
+        stats["avgDecodeMicros"] = round(avg_decode * 1e6, 2)
+        stats["cpuSecondsSaved"] = round(avg_decode * stats["hits"], 6)
+        return stats
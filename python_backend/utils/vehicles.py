@@ -0,0 +1,75 @@
+from typing import List, Optional, Tuple
+
+# Typical rated payload per vehicle type offered at registration (kg)
+VEHICLE_CAPACITY_KG = {
+    "pickup": 1500,
+    "tempo": 2500,
+    "truck": 10000,
+    "container": 20000,
+    "trailer": 30000
+}
+
+# Assumed when an MSME has not listed any (known) vehicle types
+DEFAULT_VEHICLE_TYPE = "truck"
+
+
+def known_vehicle_types(vehicle_types: Optional[List[str]]) -> List[str]:
+    """Recognised vehicle types, smallest first (falls back to DEFAULT_VEHICLE_TYPE)"""
+    types = {vehicle_type.strip().lower() for vehicle_type in vehicle_types or []}
+    known = sorted((t for t in types if t in VEHICLE_CAPACITY_KG), key=VEHICLE_CAPACITY_KG.get)
+    return known or [DEFAULT_VEHICLE_TYPE]
+
+
+def fleet_vehicles(fleet_size: Optional[int], vehicle_types: Optional[List[str]]) -> List[str]:
+    """
+    Vehicle types making up an MSME's fleet, smallest first
+    Args:
+        fleet_size: Number of vehicles
+        vehicle_types: Vehicle types the MSME operates
+    Returns:
+        One entry per vehicle, assuming one vehicle of each listed type and the
+        rest of the fleet at the smallest type's capacity (a conservative mix)
+    """
+    types = known_vehicle_types(vehicle_types)
+    vehicles = max(1, fleet_size or 1)
+    # With fewer vehicles than types listed, count the biggest ones
+    listed = types[-vehicles:]
+    return [types[0]] * (vehicles - len(listed)) + listed
+
+
+def fleet_payload(fleet_size: Optional[int], vehicle_types: Optional[List[str]]) -> float:
+    """
+    Heaviest load an MSME's fleet can move in one dispatch (stored as maxPayload)
+    Args:
+        fleet_size: Number of vehicles
+        vehicle_types: Vehicle types the MSME operates
+    Returns:
+        Payload in kg of the fleet described by fleet_vehicles
+    """
+    return sum(VEHICLE_CAPACITY_KG[t] for t in fleet_vehicles(fleet_size, vehicle_types))
+
+
+def user_capacity_fields(user: dict) -> dict:
+    """
+    Derived capacity fields stored on an MSME at write time
+    Args:
+        user: User document (fleetSize, vehicleTypes)
+    Returns:
+        maxPayload field
+    """
+    return {"maxPayload": fleet_payload(user.get("fleetSize"), user.get("vehicleTypes"))}
+
+
+def smallest_vehicle_for(weight: float, vehicle_types: Optional[List[str]]) -> Optional[Tuple[str, float]]:
+    """
+    Smallest of an MSME's vehicle types that can carry a load
+    Args:
+        weight: Load weight in kg
+        vehicle_types: MSME's vehicle types
+    Returns:
+        (vehicle type, capacity kg) or None if the load is too heavy for all of them
+    """
+    for vehicle_type in known_vehicle_types(vehicle_types):
+        if weight <= VEHICLE_CAPACITY_KG[vehicle_type]:
+            return vehicle_type, VEHICLE_CAPACITY_KG[vehicle_type]
+    return None